@@ -2,6 +2,7 @@ from pathlib import Path
 import os
 
 BLOCK_TIME = 12  # Seconds per block
+CHAIN_POLL_INTERVAL = BLOCK_TIME / 4  # Seconds between block height polls
 
 MAIN_PATH = Path(__file__).parent.parent.parent
 
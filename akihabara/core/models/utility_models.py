@@ -48,6 +48,10 @@ class QueryResult(BaseModel):
     status_code: Optional[int]
     success: bool
     created_at: datetime = Field(default_factory=datetime.now)
+    completion_tokens: Optional[int] = None
+    completion_characters: Optional[int] = None
+    volume: Optional[float] = None
+    num_tokens: Optional[float] = None
 
 
 class ImageHashes(BaseModel):
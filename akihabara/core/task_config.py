@@ -28,40 +28,78 @@ DREAMSHAPER_IMAGE_TO_IMAGE = "dreamshaper-image-to-image"
 _task_configs_cache: Optional[Dict[str, Any]] = None
 _last_cache_update: float = 0
 _cache_ttl: float = 300
+_task_config_client = None
+_refresh_task = None
 
 def _get_task_config_client():
+    global _task_config_client
+    if _task_config_client is not None:
+        return _task_config_client
     try:
         from akihabara.validator.task_config_client import TaskConfigClient
         central_server_url = os.getenv('CONFIG_SERVER_URL', 'http://config.akihabara.media:8000')
         central_server_token = os.getenv('VALIDATOR_TOKEN')
         validator_hotkey = os.getenv('VALIDATOR_HOTKEY', 'test_validator')
-        return TaskConfigClient(central_server_url, validator_hotkey, central_server_token)
+        _task_config_client = TaskConfigClient(central_server_url, validator_hotkey, central_server_token,
+                                               cache_ttl=_cache_ttl)
+        return _task_config_client
     except ImportError:
         logger.error("TaskConfigClient not available")
         return None
 
+def _select_enabled_config(all_configs: Dict[str, Dict[str, Any]], task: str) -> Optional[Dict[str, Any]]:
+    if not all_configs:
+        logger.warning(f"No task configs available, using fallback for task: {task}")
+        return _get_fallback_config(task)
+
+    task_config = all_configs.get(task)
+    if task_config and task_config.get('enabled', False):
+        logger.debug(f"Found enabled task config for {task}")
+        return task_config
+    else:
+        logger.warning(f"Task {task} not found or not enabled")
+        return None
+
 def get_enabled_task_config(task: str) -> Optional[Dict[str, Any]]:
+    all_configs = get_task_configs()
     try:
-        all_configs = get_task_configs()
-        if not all_configs:
-            logger.warning(f"No task configs available, using fallback for task: {task}")
-            return _get_fallback_config(task)
-        
-        task_config = all_configs.get(task)
-        if task_config and task_config.get('enabled', False):
-            logger.debug(f"Found enabled task config for {task}")
-            return task_config
-        else:
-            logger.warning(f"Task {task} not found or not enabled")
-            return None
-            
+        return _select_enabled_config(all_configs, task)
     except Exception as e:
         logger.error(f"Error getting task config for {task}: {e}")
         return _get_fallback_config(task)
 
-def get_task_configs() -> Dict[str, Dict[str, Any]]:
+async def get_enabled_task_config_async(task: str) -> Optional[Dict[str, Any]]:
+    all_configs = await get_task_configs_async()
+    try:
+        return _select_enabled_config(all_configs, task)
+    except Exception as e:
+        logger.error(f"Error getting task config for {task}: {e}")
+        return _get_fallback_config(task)
+
+def _store_task_configs(configs: Dict[str, Dict[str, Any]]):
     global _task_configs_cache, _last_cache_update
+    import time
+    _task_configs_cache = configs
+    _last_cache_update = time.time()
+
+async def get_task_configs_async() -> Dict[str, Dict[str, Any]]:
+    client = _get_task_config_client()
+    if client is None:
+        logger.error("TaskConfigClient not available, using fallback configs")
+        return _get_fallback_configs()
+
+    configs = await client.get_task_configs_with_cache()
+    if configs:
+        _store_task_configs(configs)
+        return configs
+
+    logger.warning("No task configs received from central server, using fallback")
+    return _task_configs_cache or _get_fallback_configs()
+
+def get_task_configs() -> Dict[str, Dict[str, Any]]:
+    global _refresh_task
     
+    import asyncio
     import time
     current_time = time.time()
     
@@ -69,6 +107,20 @@ def get_task_configs() -> Dict[str, Dict[str, Any]]:
         current_time - _last_cache_update < _cache_ttl):
         logger.debug("Using cached task configs")
         return _task_configs_cache
+
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        loop = None
+
+    if loop is not None:
+        # Never block a running event loop. Stale configs are served while the async client refreshes
+        # them, but with nothing loaded yet the fallbacks would be served as if they were real
+        if _task_configs_cache is None:
+            raise RuntimeError("Task configs not loaded; await get_task_configs_async() from async code")
+        if _refresh_task is None or _refresh_task.done():
+            _refresh_task = loop.create_task(get_task_configs_async())
+        return _task_configs_cache
     
     try:
         client = _get_task_config_client()
@@ -78,17 +130,16 @@ def get_task_configs() -> Dict[str, Dict[str, Any]]:
         
         configs = _get_task_configs_sync(client)
         if configs:
-            _task_configs_cache = configs
-            _last_cache_update = current_time
+            _store_task_configs(configs)
             logger.info(f"Successfully loaded {len(configs)} task configs from central server")
             return configs
         else:
             logger.warning("No task configs received from central server, using fallback")
-            return _get_fallback_configs()
+            return _task_configs_cache or _get_fallback_configs()
             
     except Exception as e:
         logger.error(f"Error loading task configs from central server: {e}")
-        return _get_fallback_configs()
+        return _task_configs_cache or _get_fallback_configs()
 
 def _get_task_configs_sync(client) -> Dict[str, Dict[str, Any]]:
     try:
@@ -132,10 +183,26 @@ def get_public_task_configs() -> list[dict]:
         if config and config.get("enabled", False)
     ]
 
+async def warm_task_configs():
+    """Load task configs once at startup so sync lookups inside the event loop have a value to serve."""
+    configs = await get_task_configs_async()
+    logger.info(f"Loaded {len(configs)} task configs")
+
+async def close():
+    global _task_config_client, _refresh_task
+    if _refresh_task is not None and not _refresh_task.done():
+        _refresh_task.cancel()
+    _refresh_task = None
+    if _task_config_client is not None:
+        await _task_config_client.close()
+        _task_config_client = None
+
 def clear_cache():
     global _task_configs_cache, _last_cache_update
     _task_configs_cache = None
     _last_cache_update = 0
+    if _task_config_client is not None:
+        _task_config_client.clear_cache()
     logger.info("Task config cache cleared")
 
 def _get_fallback_config(task: str) -> Optional[Dict[str, Any]]:
@@ -0,0 +1,86 @@
+import json
+from typing import Any, List, Optional, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+SSE_DATA_PREFIX = b"data:"
+SSE_DONE = b"[DONE]"
+
+
+def loads_json(data: Union[bytes, str]) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def inject_usage(event: bytes, prompt_tokens: int, completion_tokens: int) -> bytes:
+    # Splices the usage object into the raw event instead of a loads/dumps round trip; a later key wins on parse
+    usage = (
+        b'"usage":{"prompt_tokens":%d,"completion_tokens":%d,"total_tokens":%d}'
+        % (prompt_tokens, completion_tokens, prompt_tokens + completion_tokens)
+    )
+    body = event.rstrip()
+    if not body.endswith(b"}"):
+        return event
+    if body[:-1].rstrip().endswith(b"{"):
+        return body[:-1] + usage + b"}"
+    return body[:-1] + b"," + usage + b"}"
+
+
+class SSEFramer:
+    """Incremental SSE framer: feed raw chunks, get back complete `data:` payloads as bytes."""
+
+    def __init__(self):
+        self._buffer = bytearray()
+        self.done = False
+
+    def feed(self, chunk: Union[bytes, bytearray, str]) -> List[bytes]:
+        if isinstance(chunk, str):
+            chunk = chunk.encode()
+        self._buffer += chunk
+
+        end = self._buffer.rfind(b"\n")
+        if end < 0:
+            return []
+
+        complete = bytes(self._buffer[:end])
+        del self._buffer[:end + 1]
+        return self._parse_lines(complete.split(b"\n"))
+
+    def close(self) -> List[bytes]:
+        if not self._buffer:
+            return []
+        remaining = bytes(self._buffer)
+        self._buffer.clear()
+        return self._parse_lines([remaining])
+
+    def _parse_lines(self, lines: List[bytes]) -> List[bytes]:
+        events = []
+        for line in lines:
+            if not line.startswith(SSE_DATA_PREFIX):
+                continue
+            data = line[len(SSE_DATA_PREFIX):].strip()
+            if not data:
+                continue
+            if data == SSE_DONE:
+                self.done = True
+                continue
+            events.append(data)
+        return events
+
+
+def get_chunk_content(text_json: Any, completion: bool) -> Optional[str]:
+    """Content of one streamed chunk, or None when the chunk is not a valid text delta."""
+    if not isinstance(text_json, dict):
+        return None
+    try:
+        if completion:
+            content = text_json["choices"][0]["text"]
+        else:
+            content = text_json["choices"][0]["delta"]["content"]
+    except (KeyError, IndexError, TypeError):
+        return None
+    return content if isinstance(content, str) else ""
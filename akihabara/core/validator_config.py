@@ -57,6 +57,52 @@ class ValidatorConfig:
     check_max_blocks: bool = False
     bt_logging_info: str = "INFO"
 
+    queue_max_concurrent_tasks: int = 64
+    queue_chat_concurrency: int = 32
+    queue_text_to_image_concurrency: int = 8
+    queue_image_to_image_concurrency: int = 8
+    queue_avatar_concurrency: int = 4
+    queue_max_pending_tasks: int = 32
+    queue_refill_low_watermark: int = 20
+    queue_refill_batch_size: int = 40
+    queue_backend: str = "list"
+    queue_stream_group: str = "cognify-validators"
+    queue_stream_consumer: Optional[str] = None
+    queue_stream_read_count: int = 32
+    queue_stream_reclaim_idle_ms: int = 300000
+
+    contender_fan_out: bool = True
+    contender_fan_out_concurrency: int = 16
+    contender_required_successes: int = 0
+
+    query_http2: bool = True
+    query_max_connections: int = 500
+    query_max_keepalive_connections: int = 100
+
+    task_report_batching: bool = True
+    task_report_flush_interval_ms: int = 250
+    task_report_max_batch_size: int = 100
+    task_report_journal_path: Optional[str] = None
+
+    reward_sink_enabled: bool = True
+    reward_sink_max_queue_size: int = 10000
+    reward_sink_batch_size: int = 200
+    reward_sink_flush_interval_ms: int = 1000
+    reward_sink_spill_path: Optional[str] = None
+
+    scoring_results_ring_size: int = 256
+
+    handshake_key_max_age: int = 3600
+    handshake_check_interval: int = 60
+    handshake_concurrency: int = 32
+    handshake_persist_path: Optional[str] = None
+
+    result_publish_flush_interval_ms: int = 10
+    result_publish_max_batch_size: int = 64
+
+    supervisor_drain_timeout: float = 30.0
+    supervisor_blocking_workers: int = 4
+
 
 def load_hotkey_keypair_from_seed(secret_seed: str) -> Keypair:
     try:
@@ -146,6 +192,52 @@ def load_validator_config() -> ValidatorConfig:
     public_key_path = os.getenv("PUBLIC_KEY_PATH", "keys/cognify_pub.pem")
     check_max_blocks = bool(os.getenv("CHECK_MAX_BLOCKS", "false").lower() == "true")
     bt_logging_info = os.getenv("BT_LOGGING_INFO", "INFO")
+
+    queue_max_concurrent_tasks = int(os.getenv("QUEUE_MAX_CONCURRENT_TASKS", "64"))
+    queue_chat_concurrency = int(os.getenv("QUEUE_CHAT_CONCURRENCY", "32"))
+    queue_text_to_image_concurrency = int(os.getenv("QUEUE_TEXT_TO_IMAGE_CONCURRENCY", "8"))
+    queue_image_to_image_concurrency = int(os.getenv("QUEUE_IMAGE_TO_IMAGE_CONCURRENCY", "8"))
+    queue_avatar_concurrency = int(os.getenv("QUEUE_AVATAR_CONCURRENCY", "4"))
+    queue_max_pending_tasks = int(os.getenv("QUEUE_MAX_PENDING_TASKS", "32"))
+    queue_refill_low_watermark = int(os.getenv("QUEUE_REFILL_LOW_WATERMARK", "20"))
+    queue_refill_batch_size = int(os.getenv("QUEUE_REFILL_BATCH_SIZE", "40"))
+    queue_backend = os.getenv("QUEUE_BACKEND", "list").lower()
+    queue_stream_group = os.getenv("QUEUE_STREAM_GROUP", "cognify-validators")
+    queue_stream_consumer = os.getenv("QUEUE_STREAM_CONSUMER") or None
+    queue_stream_read_count = int(os.getenv("QUEUE_STREAM_READ_COUNT", "32"))
+    queue_stream_reclaim_idle_ms = int(os.getenv("QUEUE_STREAM_RECLAIM_IDLE_MS", "300000"))
+
+    contender_fan_out = bool(os.getenv("CONTENDER_FAN_OUT", "true").lower() == "true")
+    contender_fan_out_concurrency = int(os.getenv("CONTENDER_FAN_OUT_CONCURRENCY", "16"))
+    contender_required_successes = int(os.getenv("CONTENDER_REQUIRED_SUCCESSES", "0"))
+
+    query_http2 = bool(os.getenv("QUERY_HTTP2", "true").lower() == "true")
+    query_max_connections = int(os.getenv("QUERY_MAX_CONNECTIONS", "500"))
+    query_max_keepalive_connections = int(os.getenv("QUERY_MAX_KEEPALIVE_CONNECTIONS", "100"))
+
+    task_report_batching = bool(os.getenv("TASK_REPORT_BATCHING", "true").lower() == "true")
+    task_report_flush_interval_ms = int(os.getenv("TASK_REPORT_FLUSH_INTERVAL_MS", "250"))
+    task_report_max_batch_size = int(os.getenv("TASK_REPORT_MAX_BATCH_SIZE", "100"))
+    task_report_journal_path = os.getenv("TASK_REPORT_JOURNAL_PATH") or None
+
+    reward_sink_enabled = bool(os.getenv("REWARD_SINK_ENABLED", "true").lower() == "true")
+    reward_sink_max_queue_size = int(os.getenv("REWARD_SINK_MAX_QUEUE_SIZE", "10000"))
+    reward_sink_batch_size = int(os.getenv("REWARD_SINK_BATCH_SIZE", "200"))
+    reward_sink_flush_interval_ms = int(os.getenv("REWARD_SINK_FLUSH_INTERVAL_MS", "1000"))
+    reward_sink_spill_path = os.getenv("REWARD_SINK_SPILL_PATH") or None
+
+    scoring_results_ring_size = int(os.getenv("SCORING_RESULTS_RING_SIZE", "256"))
+
+    handshake_key_max_age = int(os.getenv("HANDSHAKE_KEY_MAX_AGE", "3600"))
+    handshake_check_interval = int(os.getenv("HANDSHAKE_CHECK_INTERVAL", "60"))
+    handshake_concurrency = int(os.getenv("HANDSHAKE_CONCURRENCY", "32"))
+    handshake_persist_path = os.getenv("HANDSHAKE_PERSIST_PATH") or None
+
+    result_publish_flush_interval_ms = int(os.getenv("RESULT_PUBLISH_FLUSH_INTERVAL_MS", "10"))
+    result_publish_max_batch_size = int(os.getenv("RESULT_PUBLISH_MAX_BATCH_SIZE", "64"))
+
+    supervisor_drain_timeout = float(os.getenv("SUPERVISOR_DRAIN_TIMEOUT", "30"))
+    supervisor_blocking_workers = int(os.getenv("SUPERVISOR_BLOCKING_WORKERS", "4"))
     
     if "://" in redis_host:
         pool = ConnectionPool.from_url(
@@ -199,7 +291,44 @@ def load_validator_config() -> ValidatorConfig:
         config_server_url=config_server_url,
         public_key_path=public_key_path,
         check_max_blocks=check_max_blocks,
-        bt_logging_info=bt_logging_info
+        bt_logging_info=bt_logging_info,
+        queue_max_concurrent_tasks=queue_max_concurrent_tasks,
+        queue_chat_concurrency=queue_chat_concurrency,
+        queue_text_to_image_concurrency=queue_text_to_image_concurrency,
+        queue_image_to_image_concurrency=queue_image_to_image_concurrency,
+        queue_avatar_concurrency=queue_avatar_concurrency,
+        queue_max_pending_tasks=queue_max_pending_tasks,
+        queue_refill_low_watermark=queue_refill_low_watermark,
+        queue_refill_batch_size=queue_refill_batch_size,
+        queue_backend=queue_backend,
+        queue_stream_group=queue_stream_group,
+        queue_stream_consumer=queue_stream_consumer,
+        queue_stream_read_count=queue_stream_read_count,
+        queue_stream_reclaim_idle_ms=queue_stream_reclaim_idle_ms,
+        contender_fan_out=contender_fan_out,
+        contender_fan_out_concurrency=contender_fan_out_concurrency,
+        contender_required_successes=contender_required_successes,
+        query_http2=query_http2,
+        query_max_connections=query_max_connections,
+        query_max_keepalive_connections=query_max_keepalive_connections,
+        task_report_batching=task_report_batching,
+        task_report_flush_interval_ms=task_report_flush_interval_ms,
+        task_report_max_batch_size=task_report_max_batch_size,
+        task_report_journal_path=task_report_journal_path,
+        reward_sink_enabled=reward_sink_enabled,
+        reward_sink_max_queue_size=reward_sink_max_queue_size,
+        reward_sink_batch_size=reward_sink_batch_size,
+        reward_sink_flush_interval_ms=reward_sink_flush_interval_ms,
+        reward_sink_spill_path=reward_sink_spill_path,
+        scoring_results_ring_size=scoring_results_ring_size,
+        handshake_key_max_age=handshake_key_max_age,
+        handshake_check_interval=handshake_check_interval,
+        handshake_concurrency=handshake_concurrency,
+        handshake_persist_path=handshake_persist_path,
+        result_publish_flush_interval_ms=result_publish_flush_interval_ms,
+        result_publish_max_batch_size=result_publish_max_batch_size,
+        supervisor_drain_timeout=supervisor_drain_timeout,
+        supervisor_blocking_workers=supervisor_blocking_workers
     )
 
 
@@ -304,4 +433,41 @@ def print_config_summary(config: ValidatorConfig):
     logger.info(f"Public Key Path: {config.public_key_path}")
     logger.info(f"Check Max Blocks: {config.check_max_blocks}")
     logger.info(f"BT Logging Info: {config.bt_logging_info}")
+    logger.info(f"Queue Max Concurrent Tasks: {config.queue_max_concurrent_tasks}")
+    logger.info(
+        f"Queue Concurrency (chat/t2i/i2i/avatar): {config.queue_chat_concurrency}/"
+        f"{config.queue_text_to_image_concurrency}/{config.queue_image_to_image_concurrency}/"
+        f"{config.queue_avatar_concurrency}"
+    )
+    logger.info(
+        f"Queue Backend: {config.queue_backend} "
+        f"(group {config.queue_stream_group}, read {config.queue_stream_read_count}, "
+        f"reclaim after {config.queue_stream_reclaim_idle_ms}ms)"
+    )
+    logger.info(
+        f"Contender Fan-out: {config.contender_fan_out} "
+        f"(concurrency {config.contender_fan_out_concurrency}, required successes {config.contender_required_successes})"
+    )
+    logger.info(
+        f"Task Report Batching: {config.task_report_batching} "
+        f"(flush {config.task_report_flush_interval_ms}ms / {config.task_report_max_batch_size} items)"
+    )
+    logger.info(
+        f"Reward Sink: {config.reward_sink_enabled} "
+        f"(batch {config.reward_sink_batch_size}, flush {config.reward_sink_flush_interval_ms}ms, "
+        f"queue {config.reward_sink_max_queue_size})"
+    )
+    logger.info(f"Scoring Results Ring Size: {config.scoring_results_ring_size}")
+    logger.info(
+        f"Handshake: key max age {config.handshake_key_max_age}s, check every {config.handshake_check_interval}s, "
+        f"concurrency {config.handshake_concurrency}"
+    )
+    logger.info(
+        f"Result Publishing: flush {config.result_publish_flush_interval_ms}ms / "
+        f"{config.result_publish_max_batch_size} events"
+    )
+    logger.info(
+        f"Supervisor: drain timeout {config.supervisor_drain_timeout}s, "
+        f"{config.supervisor_blocking_workers} blocking workers"
+    )
     logger.info("=============================================") 
\ No newline at end of file
@@ -42,6 +42,14 @@ def calculate_work(
         return out, out
     elif task_type == cmodels.TaskType.TEXT.value:
 
+        completion_characters = result.get("completion_characters")
+        if completion_characters is not None:
+            # Streamed results carry their counts instead of every chunk; chat chunks were never counted here
+            character_count = completion_characters if '-comp' in task else 0
+            if character_count == 0:
+                return 1, 1
+            return _calculate_work_text(inp_character_count, character_count), result.get("completion_tokens") or 0
+
         formatted_response = (
             json.loads(raw_formatted_response) if isinstance(raw_formatted_response, str) else raw_formatted_response
         )
@@ -70,4 +78,46 @@ def calculate_work(
 
         return _calculate_work_text(inp_character_count, character_count), len(formatted_response)
     else:
-        raise ValueError(f"Task {task} not found for work bonus calculation")
\ No newline at end of file
+        raise ValueError(f"Task {task} not found for work bonus calculation")
+
+
+def count_input_characters(payload: dict) -> int:
+    if payload.get("prompt"):
+        return len(payload["prompt"])
+
+    total_chars = 0
+    for message in payload.get("messages") or []:
+        content = message.get("content", "")
+        if isinstance(content, str):
+            total_chars += len(content)
+        elif isinstance(content, list):
+            for item in content:
+                if isinstance(item, dict) and item.get("type") == "text":
+                    total_chars += len(item.get("text", ""))
+    return total_chars
+
+
+def calculate_result_work(task_config: dict, query_result, payload: dict) -> tuple[float, float]:
+    """Work and token count for a QueryResult, computed once and cached on the result."""
+    if query_result.volume is not None and query_result.num_tokens is not None:
+        return query_result.volume, query_result.num_tokens
+
+    formatted_response = query_result.formatted_response
+    if task_config.get("task_type") == cmodels.TaskType.TEXT.value and hasattr(formatted_response, "model_dump"):
+        # Text responses are small; image payloads are never dumped since only their presence matters
+        formatted_response = formatted_response.model_dump()
+
+    volume, num_tokens = calculate_work(
+        task_config=task_config,
+        result={
+            "formatted_response": formatted_response,
+            "completion_tokens": query_result.completion_tokens,
+            "completion_characters": query_result.completion_characters,
+        },
+        inp_character_count=count_input_characters(payload),
+        steps=payload.get("steps"),
+        img_resolution=(payload.get("width"), payload.get("height")),
+    )
+    query_result.volume = volume
+    query_result.num_tokens = num_tokens
+    return volume, num_tokens
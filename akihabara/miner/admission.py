@@ -0,0 +1,268 @@
+import asyncio
+import heapq
+import itertools
+import math
+import time
+from typing import AsyncGenerator, AsyncIterator, Dict, List, Optional, Set, Tuple
+
+from fastapi import Depends, Header, HTTPException
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
+from fiber import constants as fcst
+from fiber.encrypted.miner.core.configuration import Config
+from fiber.encrypted.miner.dependencies import get_config
+from fiber.logging_utils import get_logger
+
+from akihabara.miner.config import MultimodalConfig
+from akihabara.miner.dependencies import get_multimodal_config
+from akihabara.miner.shared_state import SharedSlots
+
+logger = get_logger(__name__)
+
+ADMISSION_POOL_TEXT = "text"
+ADMISSION_POOL_IMAGE = "image"
+
+# Service time assumed until the first request of a pool completes
+INITIAL_SERVICE_TIME = {
+    ADMISSION_POOL_TEXT: 5.0,
+    ADMISSION_POOL_IMAGE: 15.0,
+}
+SERVICE_TIME_EWMA_ALPHA = 0.2
+
+
+class AdmissionRejected(Exception):
+
+    def __init__(self, retry_after: int, reason: str):
+        super().__init__(reason)
+        self.retry_after = retry_after
+        self.reason = reason
+
+
+class AdmissionController:
+    """Concurrency slots with a bounded, stake-ordered wait queue for one pool of endpoints."""
+
+    def __init__(self, name: str, max_concurrency: int, max_queue: int, max_wait: float,
+                 initial_service_time: float = 5.0, shared_slots: Optional[SharedSlots] = None):
+        self.name = name
+        self.shared_slots = shared_slots
+        self._shared_releases: Set[asyncio.Task] = set()
+        self.max_concurrency = max(max_concurrency, 1)
+        self.max_queue = max(max_queue, 0)
+        self.max_wait = max_wait
+        self.service_time = initial_service_time
+
+        self.in_flight = 0
+        self._waiters: List[Tuple[float, int, asyncio.Future]] = []
+        self._seq = itertools.count()
+        self.stats = {
+            'admitted': 0,
+            'queued': 0,
+            'rejected': 0,
+            'evicted': 0,
+            'timed_out': 0,
+        }
+
+    def retry_after(self, queue_depth: Optional[int] = None) -> int:
+        depth = len(self._waiters) if queue_depth is None else queue_depth
+        return max(1, math.ceil(self.service_time * (depth + 1) / self.max_concurrency))
+
+    def _estimated_wait(self, queue_depth: int) -> float:
+        return self.service_time * (queue_depth + 1) / self.max_concurrency
+
+    def _reject(self, reason: str) -> AdmissionRejected:
+        self.stats['rejected'] += 1
+        return AdmissionRejected(self.retry_after(), reason)
+
+    async def acquire(self, priority: float = 0.0) -> Optional[str]:
+        """Take a local slot, then the pool-wide one when workers share slots; returns its lease token."""
+        started = time.monotonic()
+        await self._acquire_local(priority)
+        if self.shared_slots is None:
+            return None
+
+        try:
+            token = await self.shared_slots.acquire(max(self.max_wait - (time.monotonic() - started), 0.0))
+        except asyncio.CancelledError:
+            self.release()
+            raise
+        except Exception as e:
+            logger.error(f"Shared {self.name} slots unavailable, admitting on this worker's limit: {e}")
+            return None
+
+        if token is None:
+            self.release()
+            self.stats['timed_out'] += 1
+            raise self._reject(f"Timed out waiting for a {self.name} slot")
+        return token
+
+    async def _acquire_local(self, priority: float):
+        if self.in_flight < self.max_concurrency and not self._waiters:
+            self.in_flight += 1
+            self.stats['admitted'] += 1
+            return
+
+        if self._estimated_wait(len(self._waiters)) > self.max_wait:
+            raise self._reject(f"{self.name} pool would not start this request within {self.max_wait}s")
+
+        if len(self._waiters) >= self.max_queue:
+            # The heap is keyed on -stake, so the largest entry is the lowest-stake waiter
+            lowest = max(self._waiters) if self._waiters else None
+            if lowest is None or -priority >= lowest[0]:
+                raise self._reject(f"{self.name} pool queue is full")
+            self._waiters.remove(lowest)
+            heapq.heapify(self._waiters)
+            if not lowest[2].done():
+                lowest[2].set_exception(self._reject(f"{self.name} pool queue is full"))
+            self.stats['evicted'] += 1
+
+        future = asyncio.get_running_loop().create_future()
+        entry = (-priority, next(self._seq), future)
+        heapq.heappush(self._waiters, entry)
+        self.stats['queued'] += 1
+
+        try:
+            await asyncio.wait_for(asyncio.shield(future), timeout=self.max_wait)
+        except asyncio.TimeoutError:
+            self._drop_waiter(entry)
+            if future.done() and not future.cancelled() and future.exception() is None:
+                # The slot was handed over just as the wait expired
+                self.stats['admitted'] += 1
+                return
+            self.stats['timed_out'] += 1
+            raise self._reject(f"Timed out waiting for a {self.name} slot")
+        except asyncio.CancelledError:
+            self._drop_waiter(entry)
+            if future.done() and not future.cancelled() and future.exception() is None:
+                self.release()
+            raise
+
+        self.stats['admitted'] += 1
+
+    def _drop_waiter(self, entry: Tuple[float, int, asyncio.Future]):
+        if entry in self._waiters:
+            self._waiters.remove(entry)
+            heapq.heapify(self._waiters)
+
+    def release(self, service_time: Optional[float] = None, token: Optional[str] = None):
+        if service_time is not None:
+            self.service_time += SERVICE_TIME_EWMA_ALPHA * (service_time - self.service_time)
+        if token is not None:
+            task = asyncio.get_running_loop().create_task(self._release_shared(token))
+            self._shared_releases.add(task)
+            task.add_done_callback(self._shared_releases.discard)
+
+        while self._waiters:
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                # The slot passes straight to the waiter, so in_flight stays the same
+                future.set_result(None)
+                return
+        self.in_flight = max(self.in_flight - 1, 0)
+
+    async def _release_shared(self, token: str):
+        try:
+            await self.shared_slots.release(token)
+        except Exception as e:
+            # The lease expires on its own
+            logger.error(f"Failed to release shared {self.name} slot: {e}")
+
+    def get_stats(self) -> Dict[str, float]:
+        return {
+            **self.stats,
+            'in_flight': self.in_flight,
+            'queued_now': len(self._waiters),
+            'max_concurrency': self.max_concurrency,
+            'service_time': round(self.service_time, 3),
+        }
+
+
+class AdmissionTicket:
+
+    def __init__(self, controller: AdmissionController, token: Optional[str] = None):
+        self.controller = controller
+        self.token = token
+        self.started = time.monotonic()
+        self.detached = False
+        self.released = False
+
+    def release(self):
+        if self.released:
+            return
+        self.released = True
+        self.controller.release(time.monotonic() - self.started, self.token)
+
+    async def _release_after_response(self):
+        self.release()
+
+    async def hold(self, generator: AsyncIterator) -> AsyncGenerator:
+        try:
+            async for chunk in generator:
+                yield chunk
+        finally:
+            self.release()
+
+    def streaming_response(self, generator: AsyncIterator, media_type: str) -> StreamingResponse:
+        """Keep the slot until a streamed response has been fully sent, or the client went away."""
+        self.detached = True
+        return StreamingResponse(self.hold(generator), media_type=media_type, background=BackgroundTask(self._release_after_response))
+
+
+_controllers: Dict[str, AdmissionController] = {}
+
+
+def get_admission_controller(pool: str, multimodal_config: MultimodalConfig) -> AdmissionController:
+    controller = _controllers.get(pool)
+    if controller is None:
+        concurrency = (multimodal_config.admission_image_concurrency if pool == ADMISSION_POOL_IMAGE
+                       else multimodal_config.admission_text_concurrency)
+        workers = max(multimodal_config.workers, 1)
+        # With several workers the concurrency limit is enforced pool-wide in Redis and the queue is split
+        shared_slots = (SharedSlots.from_env(pool, concurrency, multimodal_config.admission_slot_lease)
+                        if workers > 1 else None)
+        controller = AdmissionController(
+            pool,
+            max_concurrency=concurrency,
+            max_queue=math.ceil(multimodal_config.admission_max_queue / workers),
+            max_wait=multimodal_config.admission_max_wait,
+            initial_service_time=INITIAL_SERVICE_TIME.get(pool, 5.0),
+            shared_slots=shared_slots,
+        )
+        _controllers[pool] = controller
+    return controller
+
+
+def get_admission_stats() -> Dict[str, Dict[str, float]]:
+    return {pool: controller.get_stats() for pool, controller in _controllers.items()}
+
+
+def _validator_stake(config: Config, validator_hotkey: Optional[str]) -> float:
+    try:
+        node = config.metagraph.nodes.get(validator_hotkey)
+        return float(node.stake) if node is not None else 0.0
+    except Exception:
+        return 0.0
+
+
+def admit(pool: str):
+    """FastAPI dependency holding a slot of `pool` for the request; streams extend it with ticket.hold()."""
+
+    async def dependency(
+        validator_hotkey: Optional[str] = Header(None, alias=fcst.VALIDATOR_HOTKEY),
+        config: Config = Depends(get_config),
+        multimodal_config: MultimodalConfig = Depends(get_multimodal_config),
+    ) -> AsyncGenerator[AdmissionTicket, None]:
+        controller = get_admission_controller(pool, multimodal_config)
+        try:
+            token = await controller.acquire(_validator_stake(config, validator_hotkey))
+        except AdmissionRejected as e:
+            logger.warning(f"Rejecting request from {validator_hotkey}: {e.reason}")
+            raise HTTPException(status_code=429, detail=e.reason, headers={"Retry-After": str(e.retry_after)})
+
+        ticket = AdmissionTicket(controller, token)
+        try:
+            yield ticket
+        finally:
+            if not ticket.detached:
+                ticket.release()
+
+    return dependency
@@ -0,0 +1,295 @@
+import asyncio
+import os
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, Deque, Dict, Optional, Set, Tuple
+
+import httpx
+from fastapi import FastAPI
+from fiber.encrypted.miner.dependencies import get_config
+from fiber.logging_utils import get_logger
+
+from akihabara.core.constants import IMG_WORK_WINDOW
+from akihabara.core.models import payload_models
+from akihabara.miner import constants as cst
+from akihabara.miner.config import MultimodalConfig
+from akihabara.miner.dependencies import get_multimodal_config
+
+logger = get_logger(__name__)
+
+CHAT_ENDPOINT = "chat/completions"
+COMPLETIONS_ENDPOINT = "completions"
+
+THROUGHPUT_EWMA_ALPHA = 0.2
+THROUGHPUT_WINDOW_SECONDS = 300.0
+CAPACITY_SNAPSHOT_MAX_AGE = 600.0
+CAPACITY_PUBLISH_INTERVAL = 10.0
+
+BENCHMARK_PROMPT = "A lighthouse on a rocky coast at sunset"
+BENCHMARK_STEPS = 10
+BENCHMARK_RESOLUTION = (512, 512)
+BENCHMARK_MAX_TOKENS = 64
+
+
+def normalize_endpoint(endpoint: Optional[str]) -> str:
+    return (endpoint or "").strip().strip("/")
+
+
+def image_work(steps: int, width: int, height: int) -> float:
+    """Same work units the validator scores image results in."""
+    return steps * width / IMG_WORK_WINDOW[0] * height / IMG_WORK_WINDOW[1]
+
+
+class ThroughputTracker:
+    """Work per second for one endpoint: steps x resolution for images, completion tokens for text."""
+
+    def __init__(self, window: float = THROUGHPUT_WINDOW_SECONDS):
+        self.window = window
+        self.per_request: Optional[float] = None
+        self.concurrency = 1.0
+        self.samples = 0
+        self._completed: Deque[Tuple[float, float, float]] = deque()  # (finished_at, work, duration)
+
+    def _expire(self, now: float):
+        while self._completed and now - self._completed[0][0] > self.window:
+            self._completed.popleft()
+
+    def record(self, work: float, duration: float):
+        if work <= 0 or duration <= 0:
+            return
+        rate = work / duration
+        if self.per_request is None:
+            self.per_request = rate
+        else:
+            self.per_request += THROUGHPUT_EWMA_ALPHA * (rate - self.per_request)
+        self.samples += 1
+
+        now = time.monotonic()
+        self._completed.append((now, work, duration))
+        self._expire(now)
+
+    def windowed(self) -> float:
+        self._expire(time.monotonic())
+        return sum(work for _, work, _ in self._completed) / self.window
+
+    def observed_concurrency(self) -> float:
+        """Average requests in flight while the endpoint was busy, over the recent window."""
+        self._expire(time.monotonic())
+        if not self._completed:
+            return self.concurrency
+
+        intervals = sorted((finished - duration, finished) for finished, _, duration in self._completed)
+        busy = 0.0
+        span_start, span_end = intervals[0]
+        for start, end in intervals[1:]:
+            if start > span_end:
+                busy += span_end - span_start
+                span_start, span_end = start, end
+            else:
+                span_end = max(span_end, end)
+        busy += span_end - span_start
+        if busy > 0:
+            self.concurrency = max(sum(duration for _, _, duration in self._completed) / busy, 1.0)
+        return self.concurrency
+
+    def throughput(self) -> Optional[float]:
+        # Both figures were actually served: the per-request rate at the concurrency seen while busy, and the
+        # work completed over the window, so neither claims batching headroom that was never measured
+        if self.per_request is None:
+            return None
+        return max(self.per_request * self.observed_concurrency(), self.windowed())
+
+
+class CapacityEstimator:
+
+    def __init__(self, scoring_period: float = cst.SCORING_PERIOD_TIME):
+        self.scoring_period = scoring_period
+        self.trackers: Dict[str, ThroughputTracker] = {}
+        self._snapshot: Dict[str, float] = {}
+        self._snapshot_key: Optional[Tuple] = None
+        self._snapshot_at = 0.0
+        self._total_stake = 0.0
+        self.shared = None
+        self._published_at = 0.0
+        self._publishing: Set[asyncio.Task] = set()
+
+    def share(self, store):
+        """Publish to and read from a shared store; samples taken before this belong to the parent process."""
+        self.trackers.clear()
+        self._snapshot_key = None
+        self.shared = store
+
+    async def publish(self):
+        if self.shared is None:
+            return
+        self._published_at = time.monotonic()
+        try:
+            await self.shared.publish(str(os.getpid()), self.get_stats())
+        except Exception as e:
+            logger.error(f"Failed to publish capacity figures: {e}")
+
+    def _publish_in_background(self):
+        if self._publishing:
+            return
+        try:
+            task = asyncio.get_running_loop().create_task(self.publish())
+        except RuntimeError:
+            return
+        self._publishing.add(task)
+        task.add_done_callback(self._publishing.discard)
+
+    def record(self, endpoint: str, work: float, duration: float):
+        endpoint = normalize_endpoint(endpoint)
+        tracker = self.trackers.get(endpoint)
+        if tracker is None:
+            tracker = self.trackers[endpoint] = ThroughputTracker()
+        tracker.record(work, duration)
+        if self.shared is not None and time.monotonic() - self._published_at > CAPACITY_PUBLISH_INTERVAL:
+            # Recorded from request handlers, which should not wait on Redis
+            self._publish_in_background()
+
+    def throughput(self, endpoint: str) -> Optional[float]:
+        endpoint = normalize_endpoint(endpoint)
+        tracker = self.trackers.get(endpoint)
+        return tracker.throughput() if tracker is not None else None
+
+    async def _throughputs(self) -> Dict[str, float]:
+        local = {endpoint: tracker.throughput() for endpoint, tracker in self.trackers.items()}
+        if self.shared is None:
+            return local
+
+        await self.publish()
+        try:
+            sources = await self.shared.read()
+        except Exception as e:
+            logger.error(f"Failed to read shared capacity figures, using this worker's only: {e}")
+            return local
+
+        # Each worker's busy-time rate was served by the shared hardware on its own; served work adds up
+        busy: Dict[str, float] = {}
+        windowed: Dict[str, float] = {}
+        now = time.time()
+        for source in sources.values():
+            fresh = now - source.get('at', 0.0) <= THROUGHPUT_WINDOW_SECONDS
+            for endpoint, stats in source.get('endpoints', {}).items():
+                if stats.get('per_request'):
+                    rate = stats['per_request'] * stats.get('concurrency', 1.0)
+                    busy[endpoint] = max(busy.get(endpoint, 0.0), rate)
+                if fresh:
+                    windowed[endpoint] = windowed.get(endpoint, 0.0) + stats.get('windowed', 0.0)
+        return {endpoint: max(rate, windowed.get(endpoint, 0.0)) for endpoint, rate in busy.items()}
+
+    def _sync_key(self, metagraph) -> Tuple:
+        nodes = metagraph.nodes
+        return (id(nodes), len(nodes))
+
+    async def sync(self, metagraph) -> Tuple[float, Dict[str, float]]:
+        """Total stake and per-endpoint work capacity, recomputed only when the metagraph changes."""
+        key = self._sync_key(metagraph)
+        if key != self._snapshot_key or time.monotonic() - self._snapshot_at > CAPACITY_SNAPSHOT_MAX_AGE:
+            self._total_stake = sum(node.stake for node in metagraph.nodes.values())
+            self._snapshot = {
+                endpoint: throughput * self.scoring_period
+                for endpoint, throughput in (await self._throughputs()).items()
+                if throughput
+            }
+            self._snapshot_key = key
+            self._snapshot_at = time.monotonic()
+            logger.info(f"Measured capacity per scoring period: {self._snapshot}")
+        return self._total_stake, self._snapshot
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            endpoint: {
+                'per_request': tracker.per_request,
+                'windowed': tracker.windowed(),
+                'concurrency': tracker.observed_concurrency(),
+                'samples': tracker.samples,
+            }
+            for endpoint, tracker in self.trackers.items()
+        }
+
+
+capacity_estimator = CapacityEstimator()
+
+
+async def run_startup_benchmark(httpx_client: httpx.AsyncClient, multimodal_config: MultimodalConfig,
+                                miner_type: Optional[str]):
+    """One small request against the local backend so /capacity has a measured figure before live traffic."""
+    # Imported here to avoid a cycle: the logic modules record into capacity_estimator
+    from akihabara.miner.logic.chat import chat_no_stream
+    from akihabara.miner.logic.image import get_image_from_server
+
+    try:
+        if (miner_type or "").upper() == "IMAGE":
+            width, height = BENCHMARK_RESOLUTION
+            payload = payload_models.TextToImagePayload(
+                prompt=BENCHMARK_PROMPT, steps=BENCHMARK_STEPS, width=width, height=height
+            )
+            started = time.monotonic()
+            response = await get_image_from_server(
+                httpx_client=httpx_client,
+                body=payload,
+                post_endpoint=cst.TEXT_TO_IMAGE_SERVER_ENDPOINT,
+                multimodal_config=multimodal_config,
+                timeout=multimodal_config.image_request_timeout,
+            )
+            if response is None:
+                logger.warning("Startup image benchmark failed, capacity stays at the configured maximum")
+                return
+            duration = time.monotonic() - started
+            capacity_estimator.record(cst.TEXT_TO_IMAGE_SERVER_ENDPOINT, image_work(BENCHMARK_STEPS, width, height), duration)
+        else:
+            payload = payload_models.ChatPayload(
+                model=multimodal_config.multimodal_model_name or "",
+                messages=[{"role": "user", "content": BENCHMARK_PROMPT}],
+                stream=False,
+                max_tokens=BENCHMARK_MAX_TOKENS,
+            )
+            started = time.monotonic()
+            response = await chat_no_stream(httpx_client, payload, multimodal_config)
+            duration = time.monotonic() - started
+            tokens = ((response or {}).get("usage") or {}).get("completion_tokens") or BENCHMARK_MAX_TOKENS
+            capacity_estimator.record(CHAT_ENDPOINT, tokens, duration)
+            capacity_estimator.record(COMPLETIONS_ENDPOINT, tokens, duration)
+
+        logger.info(f"Startup benchmark finished in {duration:.2f}s: {capacity_estimator.get_stats()}")
+    except Exception as e:
+        logger.warning(f"Startup benchmark failed, capacity stays at the configured maximum: {e}")
+
+
+def install_startup_benchmark(app: FastAPI, miner_type: Optional[str]):
+    """Run the startup benchmark in the background once the app's own lifespan has started."""
+    app_lifespan = app.router.lifespan_context
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        async with app_lifespan(app) as state:
+            benchmark = asyncio.create_task(
+                run_startup_benchmark(get_config().httpx_client, get_multimodal_config(), miner_type)
+            )
+            try:
+                yield state
+            finally:
+                benchmark.cancel()
+
+    app.router.lifespan_context = lifespan
+
+
+def run_master_benchmark(miner_type: Optional[str], store):
+    """Benchmark once in the gunicorn master before it forks; workers read the figure through the shared store.
+
+    Runs to completion on the calling thread so no thread, event loop or connection is alive at fork time.
+    """
+    capacity_estimator.share(store)
+
+    async def benchmark():
+        try:
+            async with httpx.AsyncClient() as httpx_client:
+                await run_startup_benchmark(httpx_client, MultimodalConfig(), miner_type)
+            await capacity_estimator.publish()
+        finally:
+            await store.client.aclose()
+
+    asyncio.run(benchmark())
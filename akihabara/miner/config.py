@@ -19,6 +19,16 @@ class MultimodalConfig(BaseModel):
     max_concurrent_requests: int = int(os.getenv("MULTIMODAL_MAX_CONCURRENT_REQUESTS", "10"))
     
     request_timeout: float = float(os.getenv("MULTIMODAL_REQUEST_TIMEOUT", "60.0"))
+
+    stream_relay_mode: str = os.getenv("MULTIMODAL_STREAM_RELAY_MODE", "raw").lower()
+    image_request_timeout: float = float(os.getenv("MULTIMODAL_IMAGE_REQUEST_TIMEOUT", "180.0"))
+
+    admission_text_concurrency: int = int(os.getenv("MINER_TEXT_CONCURRENCY", "16"))
+    admission_image_concurrency: int = int(os.getenv("MINER_IMAGE_CONCURRENCY", "1"))
+    admission_max_queue: int = int(os.getenv("MINER_ADMISSION_MAX_QUEUE", "32"))
+    admission_max_wait: float = float(os.getenv("MINER_ADMISSION_MAX_WAIT", "60.0"))
+    admission_slot_lease: float = float(os.getenv("MINER_ADMISSION_SLOT_LEASE", "600.0"))
+    workers: int = int(os.getenv("MINER_WORKERS", "1"))
     
     log_level: str = os.getenv("MULTIMODAL_LOG_LEVEL", "INFO")
     
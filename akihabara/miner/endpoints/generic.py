@@ -9,6 +9,7 @@ from fastapi import Depends, Header
 from fiber.encrypted.miner.core.configuration import Config
 from fiber import constants as fcst
 from akihabara.miner import constants as cst
+from akihabara.miner.capacity import capacity_estimator, normalize_endpoint
 
 logger = get_logger(__name__)
 
@@ -24,7 +25,7 @@ async def capacity(
 
     metagraph = config.metagraph
     validator_node = metagraph.nodes.get(validator_hotkey)
-    total_stake = sum(node.stake for node in metagraph.nodes.values())
+    total_stake, measured_capacities = await capacity_estimator.sync(metagraph)
 
     capacities = {cst.MINER_TYPE: my_miner_type}
     for task_config in configs.task_configs:
@@ -32,7 +33,7 @@ async def capacity(
         max_capacity = task_config[cst.MAX_CAPACITY]
         task_type = task_config[cst.TASK_TYPE]  # noqa
         model_config = task_config[cst.MODEL_CONFIG]  # noqa
-        endpoint = task_config[cst.ENDPOINT]  # noqa
+        endpoint = task_config[cst.ENDPOINT]
         weight = task_config[cst.WEIGHT]
 
         if my_miner_type.lower() != task_type:
@@ -41,6 +42,10 @@ async def capacity(
         if os.getenv("ENV", "prod").lower() == "dev":
             capacities[task] = max_capacity * 0.1
         elif weight > 0:
+            # Never report more than the hardware has been measured to do
+            measured = measured_capacities.get(normalize_endpoint(endpoint))
+            if measured is not None:
+                max_capacity = min(max_capacity, measured)
             capacities[task] = max_capacity * validator_node.stake / total_stake
 
     logger.debug(f"Returning capacities: {capacities}")
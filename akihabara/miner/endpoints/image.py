@@ -1,3 +1,4 @@
+import time
 from functools import partial
 from fastapi import Depends, HTTPException
 from fiber.encrypted.miner.security.encryption import decrypt_general_payload
@@ -8,6 +9,8 @@ from akihabara.miner import constants as mcst
 from akihabara.miner import task_config as tcfg
 from akihabara.miner.config import MultimodalConfig
 from akihabara.miner.dependencies import get_multimodal_config
+from akihabara.miner.admission import ADMISSION_POOL_IMAGE, admit
+from akihabara.miner.capacity import capacity_estimator, image_work
 from akihabara.miner.logic.image import get_image_from_server
 from fiber.encrypted.miner.core.configuration import Config
 from fiber.encrypted.miner.dependencies import blacklist_low_stake, get_config as get_fiber_config, verify_request
@@ -26,16 +29,21 @@ async def _process_image_request(
     assert hasattr(decrypted_payload, "model"), "The image request payload must have a 'model' attribute"
 
 
+    started = time.monotonic()
     image_response = await get_image_from_server(
         httpx_client=fiber_config.httpx_client,
         body=decrypted_payload,
         post_endpoint=post_endpoint,
         multimodal_config=multimodal_config,
-        timeout=180,
+        timeout=multimodal_config.image_request_timeout,
     )
     if image_response is None or (image_response.get("image_b64") is None and image_response.get("is_nsfw") is None):
         # logger.debug(f"Image response: {image_response}")
         raise HTTPException(status_code=500, detail="Image generation failed")
+
+    steps, width, height = (getattr(decrypted_payload, name, None) for name in ("steps", "width", "height"))
+    if steps and width and height:
+        capacity_estimator.record(post_endpoint, image_work(steps, width, height), time.monotonic() - started)
     return payload_models.ImageResponse(**image_response)
 
 
@@ -65,13 +73,13 @@ def factory_router() -> APIRouter:
         text_to_image,
         tags=["Cognify Subnet"],
         methods=["POST"],
-        dependencies=[Depends(blacklist_low_stake), Depends(verify_request)],
+        dependencies=[Depends(blacklist_low_stake), Depends(verify_request), Depends(admit(ADMISSION_POOL_IMAGE))],
     )
     router.add_api_route(
         "/image-to-image",
         image_to_image,
         tags=["Cognify Subnet"],
         methods=["POST"],
-        dependencies=[Depends(blacklist_low_stake), Depends(verify_request)],
+        dependencies=[Depends(blacklist_low_stake), Depends(verify_request), Depends(admit(ADMISSION_POOL_IMAGE))],
     )
     return router
\ No newline at end of file
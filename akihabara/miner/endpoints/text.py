@@ -1,3 +1,4 @@
+import time
 from functools import partial
 from fastapi import Depends, HTTPException
 from fastapi.responses import StreamingResponse, JSONResponse, Response
@@ -12,6 +13,9 @@ from fiber.encrypted.miner.dependencies import blacklist_low_stake, get_config,
 from akihabara.miner.config import MultimodalConfig
 from akihabara.miner.dependencies import get_multimodal_config
 from akihabara.core.utils.generic_utils import async_chain
+from akihabara.miner.admission import ADMISSION_POOL_TEXT, AdmissionTicket, admit
+from akihabara.miner.capacity import CHAT_ENDPOINT, COMPLETIONS_ENDPOINT, capacity_estimator
+from akihabara.miner.constants import CHARACTER_TO_TOKEN_CONVERSION
 
 logger = get_logger(__name__)
 
@@ -20,15 +24,19 @@ async def chat_completions(
     decrypted_payload: payload_models.ChatPayload = Depends(partial(decrypt_general_payload, payload_models.ChatPayload)),
     config: Config = Depends(get_config),
     multimodal_config: MultimodalConfig = Depends(get_multimodal_config),
+    ticket: AdmissionTicket = Depends(admit(ADMISSION_POOL_TEXT)),
 ) -> Response:
     try:
         logger.info(f"chat_completions: {decrypted_payload}")
         if decrypted_payload.stream:
             generator = chat_stream(config.httpx_client, decrypted_payload, multimodal_config)
-            return StreamingResponse(generator, media_type="text/event-stream")
+            return ticket.streaming_response(generator, media_type="text/event-stream")
         else:
             try:
+                started = time.monotonic()
                 text_response = await chat_no_stream(config.httpx_client, decrypted_payload, multimodal_config)
+                completion_tokens = ((text_response or {}).get("usage") or {}).get("completion_tokens") or 0
+                capacity_estimator.record(CHAT_ENDPOINT, completion_tokens, time.monotonic() - started)
 
                 return JSONResponse(content=text_response)
             except Exception as e:
@@ -47,15 +55,20 @@ async def completions(
     decrypted_payload: payload_models.CompletionPayload = Depends(partial(decrypt_general_payload, payload_models.CompletionPayload)),
     config: Config = Depends(get_config),
     multimodal_config: MultimodalConfig = Depends(get_multimodal_config),
+    ticket: AdmissionTicket = Depends(admit(ADMISSION_POOL_TEXT)),
 ) -> Response:
     try:
         logger.info(f"completions: {decrypted_payload}")
         if decrypted_payload.stream:
             generator = completion_stream(config.httpx_client, decrypted_payload, multimodal_config)
-            return StreamingResponse(generator, media_type="text/event-stream")
+            return ticket.streaming_response(generator, media_type="text/event-stream")
         else:
             try:
+                started = time.monotonic()
                 text_response = await completion_no_stream(config.httpx_client, decrypted_payload, multimodal_config)
+                capacity_estimator.record(
+                    COMPLETIONS_ENDPOINT, len(text_response or "") / CHARACTER_TO_TOKEN_CONVERSION, time.monotonic() - started
+                )
                 response_data = {
                     "choices": [
                         {
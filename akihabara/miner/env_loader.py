@@ -55,12 +55,14 @@ def print_environment_info():
 
     host = os.getenv("MINER_HOST", "127.0.0.1")
     port = os.getenv("MINER_PORT", "8091")
-    reload = os.getenv("MINER_RELOAD", "true")
+    reload = os.getenv("MINER_RELOAD", "false")
+    workers = os.getenv("MINER_WORKERS", "1")
     
     logger.info(f"Server Configuration:")
     logger.info(f"  MINER_HOST: {host}")
     logger.info(f"  MINER_PORT: {port}")
     logger.info(f"  MINER_RELOAD: {reload}")
+    logger.info(f"  MINER_WORKERS: {workers}")
     
     multimodal_host = os.getenv("MULTIMODAL_SERVER_HOST", "127.0.0.1")
     multimodal_port = os.getenv("MULTIMODAL_SERVER_PORT", "6919")
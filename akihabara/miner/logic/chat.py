@@ -1,19 +1,151 @@
 import json
 import asyncio
-from typing import AsyncGenerator, Optional
+import re
+import time
+from typing import AsyncGenerator, Dict, List, Optional
 import httpx
 from akihabara.core.models import payload_models
+from akihabara.core.utils.sse import SSEFramer, SSE_DATA_PREFIX
+from akihabara.miner.capacity import CHAT_ENDPOINT, COMPLETIONS_ENDPOINT, capacity_estimator
 from akihabara.miner.config import MultimodalConfig
 from fiber.logging_utils import get_logger
 
 logger = get_logger(__name__)
 
+STREAM_RELAY_RAW = "raw"
+STREAM_RELAY_REFRAME = "reframe"
+
+# A `data:` that directly follows the closing brace of the previous JSON event
+SSE_EVENT_BOUNDARY = re.compile(rb"(?<=\})\s*data:")
+
+
+class StreamTimings:
+    """Running time-to-first-token and stream duration figures for relayed streams."""
+
+    def __init__(self):
+        self.streams = 0
+        self.bytes_relayed = 0
+        self.ttft_total = 0.0
+        self.ttft_max = 0.0
+        self.last_ttft: Optional[float] = None
+        self.duration_total = 0.0
+
+    def record(self, ttft: Optional[float], duration: float, bytes_relayed: int):
+        self.streams += 1
+        self.bytes_relayed += bytes_relayed
+        self.duration_total += duration
+        if ttft is not None:
+            self.last_ttft = ttft
+            self.ttft_total += ttft
+            self.ttft_max = max(self.ttft_max, ttft)
+
+    def get_stats(self) -> Dict[str, float]:
+        streams = max(self.streams, 1)
+        return {
+            'streams': self.streams,
+            'bytes_relayed': self.bytes_relayed,
+            'avg_ttft': self.ttft_total / streams,
+            'max_ttft': self.ttft_max,
+            'last_ttft': self.last_ttft,
+            'avg_duration': self.duration_total / streams,
+        }
+
+
+stream_timings = StreamTimings()
+
+
+def _reframe(events: List[bytes]) -> List[bytes]:
+    # Some backends put several `data:` events on one line; split them back into separate frames at
+    # event boundaries only, so a `data:` inside the content (e.g. a data URI) stays where it is
+    frames = []
+    for event in events:
+        parts = [event]
+        if SSE_EVENT_BOUNDARY.search(event):
+            try:
+                json.loads(event)
+            except ValueError:
+                parts = SSE_EVENT_BOUNDARY.split(event)
+        for part in parts:
+            part = part.strip()
+            if part:
+                frames.append(SSE_DATA_PREFIX + b" " + part + b"\n\n")
+    return frames
+
+
+async def _relay_stream(
+    httpx_client: httpx.AsyncClient,
+    url: str,
+    headers: Dict[str, str],
+    request_body: Dict,
+    multimodal_config: MultimodalConfig,
+    endpoint: str,
+) -> AsyncGenerator[bytes, None]:
+    relay_mode = multimodal_config.stream_relay_mode
+    started = time.monotonic()
+    ttft = None
+    bytes_relayed = 0
+    # One data: frame per generated token is close enough for throughput tracking
+    frames = 0
+    completed = False
+
+    try:
+        async with httpx_client.stream(
+            "POST",
+            url,
+            headers=headers,
+            json=request_body,
+            timeout=multimodal_config.request_timeout,
+        ) as response:
+            response.raise_for_status()
+
+            # aiter_raw skips content decoding, so compressed upstream bodies still go through aiter_bytes
+            encoding = response.headers.get("content-encoding", "identity").lower()
+            chunks = response.aiter_raw() if encoding == "identity" else response.aiter_bytes()
+
+            if relay_mode == STREAM_RELAY_REFRAME:
+                framer = SSEFramer()
+                async for chunk in chunks:
+                    for frame in _reframe(framer.feed(chunk)):
+                        if ttft is None:
+                            ttft = time.monotonic() - started
+                        bytes_relayed += len(frame)
+                        frames += 1
+                        yield frame
+                for frame in _reframe(framer.close()):
+                    bytes_relayed += len(frame)
+                    frames += 1
+                    yield frame
+                if framer.done:
+                    yield b"data: [DONE]\n\n"
+            else:
+                async for chunk in chunks:
+                    if not chunk:
+                        continue
+                    if ttft is None:
+                        ttft = time.monotonic() - started
+                    bytes_relayed += len(chunk)
+                    frames += chunk.count(SSE_DATA_PREFIX)
+                    yield chunk
+                if frames:
+                    # Raw mode counted the [DONE] marker as a frame
+                    frames -= 1
+            completed = True
+    finally:
+        duration = time.monotonic() - started
+        stream_timings.record(ttft, duration, bytes_relayed)
+        if completed:
+            capacity_estimator.record(endpoint, frames, duration)
+        logger.debug(
+            f"Relayed {bytes_relayed} bytes from {url} in {duration:.3f}s "
+            f"(ttft {ttft if ttft is None else round(ttft, 3)}s)"
+        )
+
 
 async def chat_stream(
     httpx_client: httpx.AsyncClient,
     payload: payload_models.ChatPayload,
     multimodal_config: MultimodalConfig,
-) -> AsyncGenerator[Optional[str], None]:
+) -> AsyncGenerator[Optional[bytes], None]:
 
     try:
         url = f"http://{multimodal_config.server_host}:{multimodal_config.server_port}/chat/completions"
@@ -34,26 +166,9 @@ async def chat_stream(
         
         logger.info(f"Sending chat request to multimodal server: {url}")
         
-        async with httpx_client.stream(
-            "POST",
-            url,
-            headers=headers,
-            json=request_body,
-            timeout=multimodal_config.request_timeout,
-        ) as response:
-            response.raise_for_status()
-            
-            async for line in response.aiter_lines():
-                if line.strip():
-
-                    if "data: " in line:
-                        parts = line.split("data: ")
-                        for part in parts:
-                            if part.strip():
-                                yield f"data: {part.strip()}\n"
-                    else:
-                        yield line
-                        
+        async for chunk in _relay_stream(httpx_client, url, headers, request_body, multimodal_config, CHAT_ENDPOINT):
+            yield chunk
+
     except httpx.HTTPStatusError as e:
         logger.error(f"HTTP error in chat stream: {e}")
         yield None
@@ -66,7 +181,7 @@ async def completion_stream(
     httpx_client: httpx.AsyncClient,
     payload: payload_models.CompletionPayload,
     multimodal_config: MultimodalConfig,
-) -> AsyncGenerator[Optional[str], None]:
+) -> AsyncGenerator[Optional[bytes], None]:
 
     try:
         url = f"http://{multimodal_config.server_host}:{multimodal_config.server_port}/v1/completions"
@@ -87,26 +202,9 @@ async def completion_stream(
         
         logger.info(f"Sending completion request to multimodal server: {url}")
         
-        async with httpx_client.stream(
-            "POST",
-            url,
-            headers=headers,
-            json=request_body,
-            timeout=multimodal_config.request_timeout,
-        ) as response:
-            response.raise_for_status()
-            
-            async for line in response.aiter_lines():
-                if line.strip():
-
-                    if "data: " in line:
-                        parts = line.split("data: ")
-                        for part in parts:
-                            if part.strip():
-                                yield f"data: {part.strip()}\n"
-                    else:
-                        yield line
-                        
+        async for chunk in _relay_stream(httpx_client, url, headers, request_body, multimodal_config, COMPLETIONS_ENDPOINT):
+            yield chunk
+
     except httpx.HTTPStatusError as e:
         logger.error(f"HTTP error in completion stream: {e}")
         yield None
@@ -31,24 +31,125 @@ def load_environment():
 
 load_environment()
 
+import importlib.util
+import json
+import time
+
 from akihabara.miner.server import app
+from akihabara.miner.capacity import run_master_benchmark
+from akihabara.miner.shared_state import SharedCapacityStore, prepare_worker_keys
 from akihabara.miner.env_loader import load_miner_environment, validate_miner_environment
 import uvicorn
+from cryptography.fernet import Fernet
+from gunicorn.app.base import BaseApplication
+from uvicorn.workers import UvicornWorker
 from fiber.logging_utils import get_logger
 
+APP_PATH = "akihabara.miner.server:app"
+BENCHMARK_ITERATIONS = 2000
+
+
+def select_event_loop() -> str:
+    return "uvloop" if importlib.util.find_spec("uvloop") else "asyncio"
+
+
+def select_http_protocol() -> str:
+    return "httptools" if importlib.util.find_spec("httptools") else "h11"
+
+
+class MinerUvicornWorker(UvicornWorker):
+    CONFIG_KWARGS = {
+        "loop": select_event_loop(),
+        "http": select_http_protocol(),
+        "log_level": "info",
+    }
+
+
+class MinerGunicornApplication(BaseApplication):
+    """Gunicorn master that forks uvicorn workers sharing one listening socket."""
+
+    def __init__(self, options: dict):
+        self.options = options
+        super().__init__()
+
+    def load_config(self):
+        for key, value in self.options.items():
+            if key in self.cfg.settings and value is not None:
+                self.cfg.set(key, value)
+
+    def load(self):
+        from akihabara.miner.server import app
+        return app
+
+
+def benchmark_request_path(iterations: int = BENCHMARK_ITERATIONS) -> float:
+    """Requests per second one worker can decrypt and parse, the CPU-bound part of every miner request."""
+    fernet = Fernet(Fernet.generate_key())
+    payload = json.dumps({
+        "model": "benchmark",
+        "messages": [{"role": "user", "content": "benchmark " * 200}],
+        "stream": True,
+        "max_tokens": 512,
+    }).encode()
+    token = fernet.encrypt(payload)
+
+    started = time.perf_counter()
+    for _ in range(iterations):
+        json.loads(fernet.decrypt(token))
+    elapsed = time.perf_counter() - started
+    return iterations / elapsed if elapsed > 0 else 0.0
+
+
+def run_production(host: str, port: int, workers: int):
+    rate = benchmark_request_path()
+    logging.info(
+        f"Startup benchmark: {rate:.0f} decrypt+parse per second per worker, "
+        f"{workers} workers on {os.cpu_count()} cores (~{rate * workers:.0f}/s)"
+    )
+    logging.info(f"Workers use loop={select_event_loop()} http={select_http_protocol()}")
+
+    # Generated before forking so every worker serves the same public key
+    prepare_worker_keys()
+
+    # Finishes before gunicorn forks, so workers inherit no running threads or open connections
+    try:
+        run_master_benchmark(os.getenv("MINER_TYPE"), SharedCapacityStore.from_env())
+    except Exception as e:
+        logging.error(f"Failed to run the capacity benchmark: {e}")
+
+    MinerGunicornApplication({
+        "bind": f"{host}:{port}",
+        "workers": workers,
+        "worker_class": "akihabara.miner.miner_server.MinerUvicornWorker",
+        "timeout": int(os.getenv("MINER_WORKER_TIMEOUT", "300")),
+        "graceful_timeout": int(os.getenv("MINER_GRACEFUL_TIMEOUT", "30")),
+        "keepalive": int(os.getenv("MINER_KEEPALIVE", "5")),
+        "proc_name": "akihabara-miner",
+    }).run()
+
+
 def main():
     host = os.getenv("MINER_HOST", "127.0.0.1")
     port = int(os.getenv("MINER_PORT", "8091"))
-    reload = os.getenv("MINER_RELOAD", "true").lower() == "true"
+    reload = os.getenv("MINER_RELOAD", "false").lower() == "true"
+    workers = int(os.getenv("MINER_WORKERS", "1"))
     
     logging.info(f"Starting Cognify Miner Server on {host}:{port}")
+
+    if workers > 1 and not reload:
+        logging.info(f"Production mode: {workers} workers")
+        run_production(host, port, workers)
+        return
+
     logging.info(f"Reload mode: {reload}")
     
     uvicorn.run(
-        "akihabara.miner.server:app",
+        APP_PATH,
         host=host,
         port=port,
         reload=reload,
+        loop=select_event_loop(),
+        http=select_http_protocol(),
         log_level="info"
     )
 
@@ -10,12 +10,14 @@ from akihabara.core.models.config_models import TaskType
 from akihabara.miner.endpoints.text import factory_router as text_factory_router
 from akihabara.miner.endpoints.image import factory_router as image_factory_router
 from akihabara.miner.endpoints.generic import factory_router as generic_factory_router
+from akihabara.miner.capacity import install_startup_benchmark
+from akihabara.miner.shared_state import install_shared_state
 from fiber.logging_utils import get_logger
 from fiber.encrypted.miner.middleware import configure_extra_logging_middleware
 
 logger = get_logger(__name__)
 
-app = server.factory_app(debug=True)
+app = server.factory_app(debug=os.getenv("ENV", "prod").lower() == "dev")
 
 text_router = text_factory_router()
 image_router = image_factory_router()
@@ -35,6 +37,12 @@ if my_miner_type not in TaskType._value2member_map_:
     allowed_values = ", ".join(TaskType._value2member_map_.keys())
     raise ValueError(f"MINER_TYPE {my_miner_type} is not valid. Please set the MINER_TYPE to one of the following: {allowed_values}")
 
+# Worker processes share handshake keys and capacity figures; the gunicorn master benchmarks once for all of them
+if int(os.getenv("MINER_WORKERS", "1")) > 1:
+    install_shared_state(app)
+else:
+    install_startup_benchmark(app, my_miner_type)
+
 logger.info(f"Miner Server initialized with MINER_TYPE: {my_miner_type}")
 
 if __name__ == "__main__":
@@ -44,6 +52,6 @@ if __name__ == "__main__":
     port = int(os.getenv("MINER_PORT", "8091"))
     
     logger.info(f"Starting Cognify Miner Server on {host}:{port}")
-    uvicorn.run(app, host=host, port=port, reload=True)
+    uvicorn.run(app, host=host, port=port)
 
     # uvicorn akihabara.miner.server:app --reload --host 127.0.0.1 --port 7999 --env-file .env
\ No newline at end of file
@@ -0,0 +1,284 @@
+import asyncio
+import json
+import os
+import sys
+import time
+import uuid as uuid_lib
+from contextlib import asynccontextmanager
+from typing import Any, Dict, Optional, Set, Tuple
+
+import redis.asyncio as aioredis
+from cryptography.fernet import Fernet, InvalidToken
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from fastapi import FastAPI
+from fiber import constants as fcst
+from fiber.encrypted.miner.dependencies import get_config
+from fiber.logging_utils import get_logger
+from starlette.datastructures import Headers
+
+from akihabara.miner.capacity import capacity_estimator
+
+logger = get_logger(__name__)
+
+SHARED_STATE_PREFIX = "akihabara:miner"
+SYMMETRIC_KEY_TTL = 60 * 60 * 24
+CAPACITY_STATS_TTL = 60 * 60
+SLOT_POLL_INTERVAL = 0.05
+RSA_KEY_SIZE = 2048
+
+# RSA handshake key and the key wrapping shared symmetric keys; set in the gunicorn master and inherited by
+# forked workers, so neither is ever written to Redis or disk
+_worker_keys: Optional[Tuple[rsa.RSAPrivateKey, bytes]] = None
+
+# Takes a slot unless `limit` unexpired leases are already held; expired leases belong to dead workers
+ACQUIRE_SLOT_SCRIPT = """
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', ARGV[1])
+if redis.call('ZCARD', KEYS[1]) < tonumber(ARGV[2]) then
+    redis.call('ZADD', KEYS[1], ARGV[3], ARGV[4])
+    return 1
+end
+return 0
+"""
+
+
+def _redis_kwargs() -> Dict[str, Any]:
+    return {
+        'host': os.getenv("REDIS_HOST", "localhost"),
+        'port': int(os.getenv("REDIS_PORT", "6379")),
+        'db': int(os.getenv("REDIS_DB", "0")),
+        'password': os.getenv("REDIS_PASSWORD") or None,
+    }
+
+
+def shared_prefix(prefix: str = SHARED_STATE_PREFIX) -> str:
+    return f"{prefix}:{os.getenv('MINER_PORT', '8091')}"
+
+
+def prepare_worker_keys():
+    """Generate the keys workers share; call in the gunicorn master before it forks them."""
+    global _worker_keys
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=RSA_KEY_SIZE)
+    _worker_keys = (private_key, Fernet.generate_key())
+
+
+class KeyedFernet(Fernet):
+    """Fernet that keeps the key it was built from, so a handshake key can be handed to other workers."""
+
+    def __init__(self, key, backend=None):
+        super().__init__(key, backend)
+        self.key = key.encode() if isinstance(key, str) else bytes(key)
+
+
+def capture_handshake_keys():
+    """Make fiber build handshake Fernets as KeyedFernet, so the raw key is at hand when it is stored."""
+    for name, module in list(sys.modules.items()):
+        if name.startswith("fiber.") and getattr(module, "Fernet", None) is Fernet:
+            module.Fernet = KeyedFernet
+
+
+class SharedKeyStore:
+    """Handshake keys in Redis, wrapped with a key only the workers hold, so any worker decrypts what another negotiated."""
+
+    def __init__(self, client: aioredis.Redis, wrapping_key: bytes, prefix: str = SHARED_STATE_PREFIX,
+                 ttl: int = SYMMETRIC_KEY_TTL):
+        self.client = client
+        self.wrapper = Fernet(wrapping_key)
+        self.prefix = prefix
+        self.ttl = ttl
+
+    @classmethod
+    def from_env(cls, wrapping_key: bytes) -> "SharedKeyStore":
+        return cls(aioredis.Redis(**_redis_kwargs()), wrapping_key, prefix=shared_prefix())
+
+    def _symmetric_key_name(self, hotkey_ss58: str) -> str:
+        return f"{self.prefix}:symmetric_keys:{hotkey_ss58}"
+
+    async def put_symmetric_key(self, hotkey_ss58: str, uuid: str, key: bytes):
+        key_name = self._symmetric_key_name(hotkey_ss58)
+        async with self.client.pipeline(transaction=False) as pipe:
+            pipe.hset(key_name, uuid, self.wrapper.encrypt(key))
+            pipe.expire(key_name, self.ttl)
+            await pipe.execute()
+
+    async def get_symmetric_key(self, hotkey_ss58: str, uuid: str) -> Optional[Fernet]:
+        wrapped = await self.client.hget(self._symmetric_key_name(hotkey_ss58), uuid)
+        if not wrapped:
+            return None
+        try:
+            return Fernet(self.wrapper.decrypt(wrapped))
+        except InvalidToken:
+            # Wrapped by an earlier master process
+            return None
+
+
+class SharedEncryptionKeys:
+    """Points a fiber EncryptionKeysHandler at the shared keys; its local dicts stay as a per-process cache.
+
+    fiber reads and stores keys synchronously, so Redis is only touched around requests: SharedKeysMiddleware
+    loads a missing key before the handler runs and writes new ones out before the response starts.
+    """
+
+    def __init__(self, keys_handler, store: SharedKeyStore, private_key: rsa.RSAPrivateKey):
+        self.store = store
+        self._pending: Set[asyncio.Task] = set()
+
+        capture_handshake_keys()
+        keys_handler.private_key = private_key
+        keys_handler.public_key = private_key.public_key()
+        keys_handler.public_bytes = keys_handler.public_key.public_bytes(
+            encoding=serialization.Encoding.PEM,
+            format=serialization.PublicFormat.SubjectPublicKeyInfo,
+        )
+
+        self._local_add = keys_handler.add_symmetric_key
+        self._local_get = keys_handler.get_symmetric_key
+        keys_handler.add_symmetric_key = self._add_symmetric_key
+
+    def _add_symmetric_key(self, uuid: str, hotkey_ss58: str, fernet: Fernet) -> None:
+        self._local_add(uuid=uuid, hotkey_ss58=hotkey_ss58, fernet=fernet)
+        key = getattr(fernet, "key", None)
+        if key is None:
+            logger.warning(f"Symmetric key for {hotkey_ss58} was not built as KeyedFernet, keeping it on this worker")
+            return
+        try:
+            task = asyncio.get_running_loop().create_task(self._put(hotkey_ss58, uuid, key))
+        except RuntimeError:
+            logger.warning(f"No event loop to share the symmetric key for {hotkey_ss58}, keeping it on this worker")
+            return
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    async def _put(self, hotkey_ss58: str, uuid: str, key: bytes):
+        try:
+            await self.store.put_symmetric_key(hotkey_ss58, uuid, key)
+        except Exception as e:
+            logger.error(f"Failed to share symmetric key for {hotkey_ss58}: {e}")
+
+    async def load(self, hotkey_ss58: str, uuid: str):
+        """Copy a key negotiated by another worker into the local cache."""
+        if self._local_get(hotkey_ss58, uuid) is not None:
+            return
+        try:
+            fernet = await self.store.get_symmetric_key(hotkey_ss58, uuid)
+        except Exception as e:
+            logger.error(f"Failed to read shared symmetric key for {hotkey_ss58}: {e}")
+            return
+        if fernet is not None:
+            self._local_add(uuid=uuid, hotkey_ss58=hotkey_ss58, fernet=fernet)
+
+    async def flush(self):
+        if self._pending:
+            await asyncio.gather(*self._pending)
+
+
+class SharedKeysMiddleware:
+    """ASGI middleware loading a request's symmetric key before fiber decrypts it, and publishing keys a
+    handshake stored before its response goes out."""
+
+    def __init__(self, app, shared_keys: Dict[str, SharedEncryptionKeys]):
+        self.app = app
+        self.shared_keys = shared_keys
+
+    async def __call__(self, scope, receive, send):
+        keys = self.shared_keys.get('keys')
+        if scope["type"] != "http" or keys is None:
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        hotkey = headers.get(fcst.VALIDATOR_HOTKEY)
+        uuid = headers.get(fcst.SYMMETRIC_KEY_UUID)
+        if hotkey and uuid:
+            await keys.load(hotkey, uuid)
+
+        async def send_after_flush(message):
+            if message["type"] == "http.response.start":
+                await keys.flush()
+            await send(message)
+
+        await self.app(scope, receive, send_after_flush)
+
+
+class SharedSlots:
+    """Concurrency slots of one admission pool counted in Redis, so the limit holds across worker processes."""
+
+    def __init__(self, client: aioredis.Redis, key: str, limit: int, lease: float,
+                 poll_interval: float = SLOT_POLL_INTERVAL):
+        self.client = client
+        self.key = key
+        self.limit = max(limit, 1)
+        self.lease = lease
+        self.poll_interval = poll_interval
+        self._acquire_script = client.register_script(ACQUIRE_SLOT_SCRIPT)
+
+    @classmethod
+    def from_env(cls, pool: str, limit: int, lease: float) -> "SharedSlots":
+        return cls(aioredis.Redis(**_redis_kwargs()), f"{shared_prefix()}:slots:{pool}", limit, lease)
+
+    async def acquire(self, timeout: float) -> Optional[str]:
+        """Lease token for a free slot, or None if none freed up within `timeout` seconds."""
+        token = uuid_lib.uuid4().hex
+        deadline = time.monotonic() + timeout
+        while True:
+            now = time.time()
+            if await self._acquire_script(keys=[self.key], args=[now, self.limit, now + self.lease, token]):
+                return token
+            if time.monotonic() >= deadline:
+                return None
+            await asyncio.sleep(self.poll_interval)
+
+    async def release(self, token: str):
+        await self.client.zrem(self.key, token)
+
+
+class SharedCapacityStore:
+    """Throughput figures of every miner process in one Redis hash, so /capacity on any worker sees them all."""
+
+    def __init__(self, client: aioredis.Redis, key: str, ttl: int = CAPACITY_STATS_TTL):
+        self.client = client
+        self.key = key
+        self.ttl = ttl
+
+    @classmethod
+    def from_env(cls) -> "SharedCapacityStore":
+        return cls(aioredis.Redis(**_redis_kwargs()), f"{shared_prefix()}:capacity")
+
+    async def publish(self, source: str, stats: Dict[str, Dict[str, float]]):
+        async with self.client.pipeline(transaction=False) as pipe:
+            pipe.hset(self.key, source, json.dumps({'at': time.time(), 'endpoints': stats}))
+            pipe.expire(self.key, self.ttl)
+            await pipe.execute()
+
+    async def read(self) -> Dict[str, Dict[str, Any]]:
+        values = await self.client.hgetall(self.key)
+        return {source.decode(): json.loads(value) for source, value in values.items()}
+
+
+def install_shared_state(app: FastAPI):
+    """Share handshake keys and capacity figures across workers once the app's own lifespan has built the fiber config."""
+    app_lifespan = app.router.lifespan_context
+    # Filled in by the lifespan; the middleware has to be registered before the app starts
+    shared_keys: Dict[str, SharedEncryptionKeys] = {}
+    app.add_middleware(SharedKeysMiddleware, shared_keys=shared_keys)
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        async with app_lifespan(app) as state:
+            try:
+                if _worker_keys is None:
+                    raise RuntimeError("no keys inherited from the gunicorn master, see prepare_worker_keys")
+                private_key, wrapping_key = _worker_keys
+                shared_keys['keys'] = SharedEncryptionKeys(
+                    get_config().encryption_keys_handler, SharedKeyStore.from_env(wrapping_key), private_key
+                )
+                logger.info(f"Worker {os.getpid()} is using the shared handshake key store")
+            except Exception as e:
+                logger.error(f"Failed to attach the shared handshake key store: {e}")
+            try:
+                capacity_estimator.share(SharedCapacityStore.from_env())
+            except Exception as e:
+                logger.error(f"Failed to attach the shared capacity store: {e}")
+            yield state
+
+    app.router.lifespan_context = lifespan
@@ -243,7 +243,7 @@ class BaseValidator:
             self.validator_hotkey = self.wallet.hotkey.ss58_address
             logging.info(f"Running validator on uid: {self.uid}")
 
-        self.current_block = self.metagraph.block
+        self.current_block = int(self.metagraph.block)
         self.hotkeys = self.metagraph.hotkeys
         self.block_at_registration = self.metagraph.block_at_registration
         self.scores = [0.0] * len(self.metagraph.total_stake)
@@ -280,7 +280,7 @@ class BaseValidator:
         # Sync metagraph
         self.metagraph = self.subtensor.metagraph(self.config.netuid)
         self.metagraph.sync(subtensor=self.subtensor)  # 同步最新状态
-        self.current_block = self.metagraph.block
+        self.current_block = int(self.metagraph.block)
 
         # Check for changes
         if previous_hotkeys == self.metagraph.hotkeys:
@@ -4,7 +4,6 @@ import numpy as np
 import random
 import logging as python_logging
 import asyncio
-import threading
 from typing import Tuple, Optional, List, Dict, Any
 
 from dotenv import load_dotenv
@@ -22,26 +21,36 @@ from akihabara.core.constants import (
     OWNER_DEFAULT_SCORE,
     FINAL_MIN_SCORE,
     MAX_VALIDATOR_BLOCKS,
-    CHECK_NODE_ACTIVE
+    CHECK_NODE_ACTIVE,
+    CHAIN_POLL_INTERVAL
 )
 from akihabara.core.path_utils import PathUtils
 from akihabara.core.validator_config import ValidatorConfig, load_validator_config
 from akihabara.validator import BaseValidator
 
 from akihabara.core.validator_manager import ValidatorManager
+from akihabara.core import task_config
 
 from akihabara.core.task_synapse import TaskSynapse
 
 from akihabara.validator.task_client import CognifyTaskClient
 from akihabara.validator.task_processor import CognifyTaskProcessor
-from akihabara.validator.redis_queue_manager import RedisQueueManager, CognifyQueueProcessor
+from akihabara.validator.redis_queue_manager import CognifyQueueProcessor, create_queue_manager
 from akihabara.validator.contender_client import ContenderClient
 from akihabara.validator.task_config_client import TaskConfigClient
 from akihabara.validator.system_client import SystemClient
+from akihabara.validator.query.query_context import QueryContext
+from akihabara.validator.chain_snapshot import ChainSnapshot, ChainSnapshotProvider
+from akihabara.validator.handshake_manager import HandshakeManager
+from akihabara.validator.async_supervisor import AsyncSupervisor
+from akihabara.validator.scoring_results_manager import scoring_results_manager
+from akihabara.validator.weight_engine import (
+    build_metagraph_arrays,
+    build_score_arrays,
+    compute_final_scores,
+    normalize_weights,
+)
 
-import httpx
-from fiber.encrypted.validator import handshake, client
-from fiber.chain.models import Node
 
 # Constants
 
@@ -53,6 +62,7 @@ class AkihabaraValidator(BaseValidator):
         self.validator_config = load_validator_config()
 
         self.allocation_strategy = self.validator_config.allocation_strategy
+        scoring_results_manager.set_ring_size(self.validator_config.scoring_results_ring_size)
 
         project_root = PathUtils.get_project_root()
         log_path = self.validator_config.log_path
@@ -64,11 +74,12 @@ class AkihabaraValidator(BaseValidator):
         self.validator_manager = ValidatorManager(self.storage)
 
         self.setup_bittensor_objects()
+
+        self.chain_snapshots = ChainSnapshotProvider(self.subtensor, self.config, self.config.netuid, self.uid)
         
         if self.validator_config.check_validator_stake:
             self.check_validator_stake()
         
-        self.current_block = 0
         self.eval_interval = self.config.eval_interval
         self.last_update = 0
         
@@ -87,11 +98,21 @@ class AkihabaraValidator(BaseValidator):
         self.weights_interval = self.tempo * 1/2
         self.miner_tasks: Dict[str, str] = {}
 
-        self.node_handshake_data: Dict[str, Dict[str, Any]] = {}
-        self.handshake_interval = 600
-        self.last_handshake_time = 0
-        self.handshake_thread = None
+        self.handshake_manager = HandshakeManager(
+            keypair=getattr(self.validator_config, 'keypair', None) or self.wallet.hotkey,
+            replace_with_localhost=self.validator_config.replace_with_localhost,
+            replace_with_docker_localhost=self.validator_config.replace_with_docker_localhost,
+            key_max_age=self.validator_config.handshake_key_max_age,
+            check_interval=self.validator_config.handshake_check_interval,
+            concurrency=self.validator_config.handshake_concurrency,
+            persist_path=self.validator_config.handshake_persist_path
+        )
+        self.node_handshake_data: Dict[str, Dict[str, Any]] = self.handshake_manager.node_handshake_data
         self.handshake_running = False
+        self.supervisor = AsyncSupervisor(
+            drain_timeout=self.validator_config.supervisor_drain_timeout,
+            blocking_workers=self.validator_config.supervisor_blocking_workers
+        )
         self.cached_nodes_info = []
 
         if not self.config.neuron.axon_off:
@@ -146,7 +167,9 @@ class AkihabaraValidator(BaseValidator):
                 token=validator_token
             )
             
-            self.queue_manager = RedisQueueManager(redis_host, redis_port, redis_password)
+            self.queue_manager = create_queue_manager(redis_host, redis_port, redis_password, self.validator_config)
+
+            self.query_context = QueryContext.from_validator_config(self.validator_config, validator_hotkey)
             
             self.queue_processor = CognifyQueueProcessor(
                 self.queue_manager, 
@@ -154,7 +177,8 @@ class AkihabaraValidator(BaseValidator):
                 self.contender_client, 
                 self.task_config_client,
                 node_handshake_data=self.node_handshake_data,
-                validator_config=self.validator_config
+                validator_config=self.validator_config,
+                query_context=self.query_context
             )
             
             self.task_processor = CognifyTaskProcessor(self.task_client, self.queue_manager)
@@ -167,6 +191,7 @@ class AkihabaraValidator(BaseValidator):
             self.queue_processor = None
             self.contender_client = None
             self.task_config_client = None
+            self.query_context = None
 
     async def _run_queue_processor(self):
         try:
@@ -175,6 +200,9 @@ class AkihabaraValidator(BaseValidator):
             await self.queue_processor.run_queue_processor()
         except Exception as e:
             logging.error(f"Error in queue processor: {e}")
+        finally:
+            if self.query_context:
+                await self.query_context.close()
 
     def check_validator_stake(self):
 
@@ -208,144 +236,116 @@ class AkihabaraValidator(BaseValidator):
         else:
             self.resync_metagraph()
 
-        next_sync_block = self.current_block + self.eval_interval
-        bt.logging.info(f"Next sync at block {next_sync_block}")
-        
-        task_processing_thread = None
-        queue_processing_thread = None
-        
+        try:
+            asyncio.run(self._run_async())
+        except KeyboardInterrupt:
+            bt.logging.success("Keyboard interrupt detected. Exiting validator.")
+
+    async def _run_async(self):
+        supervisor = self.supervisor
+        supervisor.install_signal_handlers()
+
+        try:
+            await task_config.warm_task_configs()
+        except Exception as e:
+            bt.logging.error(f"Error loading task configs: {e}")
+
         if self.queue_processor:
-            def run_queue_processor():
-                import asyncio
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
-                try:
-                    loop.run_until_complete(self._run_queue_processor())
-                except Exception as e:
-                    bt.logging.error(f"Error in queue processor: {e}")
-                finally:
-                    loop.close()
-            
-            queue_processing_thread = threading.Thread(target=run_queue_processor, daemon=True)
-            queue_processing_thread.start()
+            supervisor.start("queue-processor", self._run_queue_processor(), on_stop=self.queue_processor.stop)
 
         if self.task_processor:
-            def run_task_processor():
-                import asyncio
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
-                try:
-                    loop.run_until_complete(self.task_processor.run_task_processor())
-                except Exception as e:
-                    bt.logging.error(f"Error in task processor: {e}")
-                finally:
-                    loop.close()
-            
-            task_processing_thread = threading.Thread(target=run_task_processor, daemon=True)
-            task_processing_thread.start()
+            supervisor.start("task-processor", self.task_processor.run_task_processor(), on_stop=self.task_processor.stop)
 
-        self._cache_nodes_info()
-        
-        self._start_handshake_timer()
+        try:
+            snapshot = await self.get_chain_snapshot()
+            self._cache_nodes_info(snapshot)
+        except Exception as e:
+            bt.logging.error(f"Error caching nodes info: {e}")
+
+        self.handshake_running = True
+        supervisor.start("handshakes", self.handshake_manager.run(), on_stop=self.handshake_manager.stop)
+        supervisor.start("chain-sync", self._run_chain_loop(), critical=True)
 
         try:
-            while True:
-                try:
-                    if self.subtensor.wait_for_block(next_sync_block):
-                        self.resync_metagraph()
-                        self.refresh_cached_nodes()
-                        self.total_blocks_run += self.eval_interval
-                        self.blocks_since_last_weights += self.eval_interval
-
-                        blocks_since_last = self.subtensor.blocks_since_last_update(
-                            self.config.netuid,
-                            self.uid
-                        )
-                        
-                        if blocks_since_last >= self.weights_interval and self.blocks_since_last_weights >= self.weights_interval :
-                            success, msg = self.set_weights()
-                            consensus = self.metagraph.consensus[self.uid].item()
-                            incentive = self.metagraph.incentive[self.uid].item()
-                            dividends = self.metagraph.dividends[self.uid].item()
-                            current_epoch =  self.current_block // 360
-                            if success:
-                                self.blocks_since_last_weights = 0
-                            else:
-                                bt.logging.error(f"Failed to set weights: {msg}")
-                                continue
-
-                        self.save_state()
-                        validator_trust = self.subtensor.query_subtensor(
-                            "ValidatorTrust",
-                            params=[self.config.netuid],
-                        )
-
-                        next_sync_block, reason = self.get_next_sync_block()
-
-                except KeyboardInterrupt:
-                    bt.logging.success("Keyboard interrupt detected. Exiting validator.")
-                    break
-                except Exception as e:
-                    bt.logging.error(f"Error in validator loop: {str(e)}")
-                    continue
+            await supervisor.wait()
         finally:
-            if task_processing_thread and task_processing_thread.is_alive():
-                if self.task_processor:
-                    self.task_processor.stop()
-                task_processing_thread.join(timeout=5)
+            await supervisor.shutdown()
+            self.handshake_running = False
+            await self._close_clients()
 
-            if self.task_client:
-                try:
-                    import asyncio
-                    loop = asyncio.new_event_loop()
-                    asyncio.set_event_loop(loop)
-                    loop.run_until_complete(self.task_client.close())
-                    loop.close()
-                except Exception as e:
-                    bt.logging.error(f"Error closing task client: {e}")
-            
-            if queue_processing_thread and queue_processing_thread.is_alive():
-                if self.queue_processor:
-                    self.queue_processor.stop()
-                queue_processing_thread.join(timeout=5)
-
-                if self.queue_manager:
-                    try:
-                        import asyncio
-                        loop = asyncio.new_event_loop()
-                        asyncio.set_event_loop(loop)
-                        loop.run_until_complete(self.queue_manager.close())
-                        loop.close()
-                    except Exception as e:
-                        bt.logging.error(f"Error closing Redis connection: {e}")
-                
-                if hasattr(self, 'contender_client') and self.contender_client:
-                    try:
-                        import asyncio
-                        loop = asyncio.new_event_loop()
-                        asyncio.set_event_loop(loop)
-                        loop.run_until_complete(self.contender_client.close())
-                        loop.close()
-                    except Exception as e:
-                        bt.logging.error(f"Error closing contender client: {e}")
-                
-                if hasattr(self, 'task_config_client') and self.task_config_client:
-                    try:
-                        import asyncio
-                        loop = asyncio.new_event_loop()
-                        asyncio.set_event_loop(loop)
-                        loop.run_until_complete(self.task_config_client.close())
-                        loop.close()
-                    except Exception as e:
-                        bt.logging.error(f"Error closing task config client: {e}")
-            
             if hasattr(self, 'axon'):
                 self.axon.stop()
 
-            if self.handshake_running:
-                self.handshake_running = False
-                if self.handshake_thread and self.handshake_thread.is_alive():
-                    self.handshake_thread.join(timeout=5)
+            await self.chain_snapshots.close()
+
+    async def _run_chain_loop(self):
+        supervisor = self.supervisor
+        next_sync_block = self.current_block + self.eval_interval
+        bt.logging.info(f"Next sync at block {next_sync_block}")
+
+        while not supervisor.stopping:
+            try:
+                if not await self._wait_for_block(next_sync_block):
+                    continue
+
+                await supervisor.run_blocking(self.resync_metagraph)
+                snapshot = await self.get_chain_snapshot()
+                self.refresh_cached_nodes(snapshot)
+
+                synced_block = await supervisor.run_blocking(self._sync_weights, snapshot)
+                if synced_block is not None:
+                    next_sync_block = synced_block
+
+            except Exception as e:
+                bt.logging.error(f"Error in validator loop: {str(e)}")
+
+    async def _wait_for_block(self, block: int) -> bool:
+        """Poll the chain in short blocking calls so a stop request is seen between polls."""
+        supervisor = self.supervisor
+        while not supervisor.stopping:
+            current_block = await supervisor.run_blocking(self.subtensor.get_current_block)
+            if current_block >= block:
+                return True
+            if await supervisor.sleep(CHAIN_POLL_INTERVAL):
+                break
+        return False
+
+    def _sync_weights(self, snapshot: ChainSnapshot) -> Optional[int]:
+        self.total_blocks_run += self.eval_interval
+        self.blocks_since_last_weights += self.eval_interval
+
+        blocks_since_last = snapshot.blocks_since_last_update
+        
+        if blocks_since_last >= self.weights_interval and self.blocks_since_last_weights >= self.weights_interval :
+            success, msg = self.set_weights(snapshot)
+            if success:
+                self.blocks_since_last_weights = 0
+            else:
+                bt.logging.error(f"Failed to set weights: {msg}")
+                return None
+
+        self.save_state()
+
+        next_sync_block, reason = self.get_next_sync_block()
+        return next_sync_block
+
+    async def _close_clients(self):
+        for name in ('task_client', 'queue_manager', 'contender_client', 'task_config_client'):
+            client = getattr(self, name, None)
+            if client is None:
+                continue
+            try:
+                await client.close()
+            except Exception as e:
+                bt.logging.error(f"Error closing {name}: {e}")
+
+        try:
+            await task_config.close()
+        except Exception as e:
+            bt.logging.error(f"Error closing task config client: {e}")
+
+    async def get_chain_snapshot(self) -> ChainSnapshot:
+        return await self.chain_snapshots.get(self.current_block, self.supervisor.run_blocking)
 
     def _convert_ip_to_stringip(self, ip_val):
         try:
@@ -374,221 +374,14 @@ class AkihabaraValidator(BaseValidator):
             bt.logging.warning(f"Failed to convert IP {ip_val}: {e}")
             return '0.0.0.0'
 
-    async def _try_handshake(self, async_client: httpx.AsyncClient, server_address: str, keypair, hotkey):
-        return await handshake.perform_handshake(
-            async_client, server_address, keypair, hotkey
-        )
-
-    async def _handshake_node(self, node_info: Dict[str, Any]) -> Dict[str, Any]:
-        try:
-            hotkey = node_info['hotkey']
-            ip = node_info['ip']
-            port = node_info['port']
-            uid = node_info['uid']
-            
-            if ip == '0.0.0.0':
-                return node_info
-
-            address_ip = ip
-            if self.validator_config.replace_with_localhost:
-                address_ip = '0.0.0.1'
-            try:
-                replace_with_docker_localhost = getattr(self.validator_config, 'replace_with_docker_localhost', False)
-                replace_with_localhost = getattr(self.validator_config, 'replace_with_localhost', False)
-            except AttributeError:
-                replace_with_docker_localhost = False
-                replace_with_localhost = False
-
-            node = Node
-            node.ip = address_ip
-            node.port = port
-            node.protocol=  'http'
-            server_address = client.construct_server_address(
-                node=node,
-                replace_with_docker_localhost=replace_with_docker_localhost,
-                replace_with_localhost=replace_with_localhost,
-            )
-            
-            async with httpx.AsyncClient(timeout=10.0) as async_client:
-                try:
-
-                    try:
-                        keypair = getattr(self.validator_config, 'keypair', self.wallet.hotkey)
-                    except AttributeError:
-                        keypair = self.wallet.hotkey
-                    
-                    symmetric_key, symmetric_key_uid = await self._try_handshake(
-                        async_client, server_address, keypair, hotkey
-                    )
-                    
-                    node_info['symmetric_key'] = symmetric_key.decode() if isinstance(symmetric_key, bytes) else str(symmetric_key)
-                    node_info['symmetric_key_uid'] = symmetric_key_uid
-                    node_info['handshake_success'] = True
-                    node_info['last_handshake_time'] = time.time()
-                    
-                except Exception as e:
-                    node_info['handshake_success'] = False
-                    node_info['handshake_error'] = str(e)
-                    
-            return node_info
-            
-        except Exception as e:
-            bt.logging.error(f"Error in _handshake_node for {node_info.get('hotkey', 'unknown')}: {e}")
-            node_info['handshake_success'] = False
-            node_info['handshake_error'] = str(e)
-            return node_info
-
-    async def _perform_handshakes(self):
-
-        try:
-            bt.logging.info("Starting batch handshake process...")
-
-            if not hasattr(self, 'subtensor') or not hasattr(self, 'metagraph'):
-                bt.logging.error("Missing required attributes: subtensor or metagraph")
-                return
-
-            try:
-                neurons = self.subtensor.neurons_lite(netuid=self.config.netuid)
-            except Exception as e:
-                bt.logging.error(f"Failed to get neurons from subtensor: {e}")
-                return
-            
-            nodes_to_handshake = []
-            
-            for idx, hotkey in enumerate(self.metagraph.hotkeys):
-                try:
-                    if idx >= len(neurons):
-                        bt.logging.info(f"Index {idx} out of range for neurons list")
-                        continue
-                        
-                    neuron = neurons[idx]
-                    ip = neuron.axon_info.ip
-                    port = neuron.axon_info.port
-                    if ip == '0.0.0.0':
-                        continue
-
-                    node_info = {
-                        'uid': idx,
-                        'hotkey': hotkey,
-                        'ip': self._convert_ip_to_stringip(ip),
-                        'port': port,
-                        'symmetric_key': None,
-                        'symmetric_key_uid': None,
-                        'handshake_success': False,
-                        'last_handshake_time': 0
-                    }
-                    
-                    nodes_to_handshake.append(node_info)
-                    
-                except Exception as e:
-                    bt.logging.warning(f"Error getting node info for {hotkey}: {e}")
-                    continue
-            
-            if not nodes_to_handshake:
-                return
-
-            semaphore = asyncio.Semaphore(10)
-            
-            async def limited_handshake(node_info):
-                try:
-                    async with semaphore:
-                        result = await self._handshake_node(node_info)
-                        return result
-                except Exception as e:
-                    bt.logging.error(f"Error in limited_handshake for {node_info['hotkey']}: {e}")
-                    return {'handshake_success': False, 'handshake_error': str(e), **node_info}
-
-            limited_tasks = []
-            for node_info in nodes_to_handshake:
-                limited_tasks.append(limited_handshake(node_info))
-            
-            try:
-                results = await asyncio.gather(*limited_tasks, return_exceptions=True)
-            except Exception as e:
-                bt.logging.error(f"Error in asyncio.gather: {e}")
-                import traceback
-                bt.logging.error(f"Traceback: {traceback.format_exc()}")
-                return
-            
-            successful_handshakes = 0
-            for i, result in enumerate(results):
-                if isinstance(result, Exception):
-                    bt.logging.error(f"Handshake task failed for node {nodes_to_handshake[i]['hotkey']}: {result}")
-                    continue
-                
-                if result.get('handshake_success', False):
-                    successful_handshakes += 1
-                    self.node_handshake_data[result['hotkey']] = result
-            
-            self.last_handshake_time = time.time()
-            
-            self.update_queue_processor_handshake_data()
-            
-        except Exception as e:
-            bt.logging.error(f"Error in _perform_handshakes: {e}")
-            import traceback
-            bt.logging.error(f"Traceback: {traceback.format_exc()}")
-
-    async def _perform_handshakes_with_nodes(self, nodes_to_handshake):
-
-        try:
-
-            if not nodes_to_handshake:
-                return
-            
-            semaphore = asyncio.Semaphore(10)
-            
-            async def limited_handshake(node_info):
-                try:
-                    async with semaphore:
-                        result = await self._handshake_node(node_info)
-                        return result
-                except Exception as e:
-                    bt.logging.error(f"Error in limited_handshake for {node_info['hotkey']}: {e}")
-                    return {'handshake_success': False, 'handshake_error': str(e), **node_info}
-            
-            limited_tasks = []
-            for node_info in nodes_to_handshake:
-                limited_tasks.append(limited_handshake(node_info))
-            
-            try:
-                results = await asyncio.gather(*limited_tasks, return_exceptions=True)
-            except Exception as e:
-                bt.logging.error(f"Error in asyncio.gather: {e}")
-                import traceback
-                bt.logging.error(f"Traceback: {traceback.format_exc()}")
-                return
-            
-            successful_handshakes = 0
-            for i, result in enumerate(results):
-                if isinstance(result, Exception):
-                    continue
-                
-                if result.get('handshake_success', False):
-                    successful_handshakes += 1
-                    self.node_handshake_data[result['hotkey']] = result
-            
-            self.last_handshake_time = time.time()
-            
-            self.update_queue_processor_handshake_data()
-            
-        except Exception as e:
-            bt.logging.error(f"Error in _perform_handshakes_with_nodes: {e}")
-            import traceback
-            bt.logging.error(f"Traceback: {traceback.format_exc()}")
-
-    def _cache_nodes_info(self):
+    def _cache_nodes_info(self, snapshot: ChainSnapshot):
         try:
 
             if not hasattr(self, 'subtensor') or not hasattr(self, 'metagraph'):
                 bt.logging.error("Missing required attributes: subtensor or metagraph")
                 return
             
-            try:
-                neurons = self.subtensor.neurons_lite(netuid=self.config.netuid)
-            except Exception as e:
-                bt.logging.error(f"Failed to get neurons from subtensor: {e}")
-                return
+            neurons = snapshot.neurons
             
             nodes_to_handshake = []
             
@@ -607,7 +400,7 @@ class AkihabaraValidator(BaseValidator):
                     node_info = {
                         'uid': idx,
                         'hotkey': hotkey,
-                        'ip': ip,
+                        'ip': self._convert_ip_to_stringip(ip),
                         'port': port,
                         'symmetric_key': None,
                         'symmetric_key_uid': None,
@@ -621,82 +414,47 @@ class AkihabaraValidator(BaseValidator):
                     bt.logging.warning(f"Error getting node info for {hotkey}: {e}")
                     continue
             
+            previous_axons = {info['hotkey']: (info['ip'], info['port']) for info in self.cached_nodes_info or []}
+            current_axons = {info['hotkey']: (info['ip'], info['port']) for info in nodes_to_handshake}
+            changed_hotkeys = [hotkey for hotkey, axon in previous_axons.items() if current_axons.get(hotkey) != axon]
+
             self.cached_nodes_info = nodes_to_handshake
+            self.handshake_manager.update_nodes(nodes_to_handshake)
+            if changed_hotkeys:
+                self._invalidate_query_nodes(changed_hotkeys)
             
         except Exception as e:
             bt.logging.error(f"Error in _cache_nodes_info: {e}")
             import traceback
             bt.logging.error(f"Traceback: {traceback.format_exc()}")
 
-    def _start_handshake_timer(self):
-        def handshake_timer():
-            try:
-                import asyncio
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
-                try:
-                    loop.run_until_complete(self._perform_handshakes_with_nodes(self.cached_nodes_info))
-                except Exception as e:
-                    bt.logging.error(f"Error in initial handshake: {e}")
-                finally:
-                    loop.close()
-            except Exception as e:
-                bt.logging.error(f"Failed to start initial handshake: {e}")
-
-            while self.handshake_running:
-                try:
-                    time.sleep(self.handshake_interval)
-                    
-                    if self.handshake_running:
-
-                        import asyncio
-                        loop = asyncio.new_event_loop()
-                        asyncio.set_event_loop(loop)
-                        try:
-                            loop.run_until_complete(self._perform_handshakes_with_nodes(self.cached_nodes_info))
-                        except Exception as e:
-                            bt.logging.error(f"Error in scheduled handshake: {e}")
-                        finally:
-                            loop.close()
-                    
-                except Exception as e:
-                    bt.logging.error(f"Error in handshake timer: {e}")
-                    time.sleep(60)
-        
-        self.handshake_running = True
-        self.handshake_thread = threading.Thread(target=handshake_timer, daemon=True)
-        self.handshake_thread.start()
-
     def get_node_handshake_data(self, hotkey: str = None) -> Dict[str, Any]:
         if hotkey is None:
             return self.node_handshake_data
         return self.node_handshake_data.get(hotkey, {})
 
     def get_handshake_stats(self) -> Dict[str, Any]:
-        total_nodes = len(self.node_handshake_data)
-        successful_handshakes = sum(1 for data in self.node_handshake_data.values() 
-                                  if data.get('handshake_success', False))
-        
-        return {
-            'total_nodes': total_nodes,
-            'successful_handshakes': successful_handshakes,
-            'success_rate': successful_handshakes / total_nodes if total_nodes > 0 else 0.0,
-            'last_handshake_time': self.last_handshake_time,
-            'next_handshake_time': self.last_handshake_time + self.handshake_interval,
-            'cached_nodes_count': len(self.cached_nodes_info)
-        }
+        return self.handshake_manager.get_stats()
 
     def update_queue_processor_handshake_data(self):
         try:
             if hasattr(self, 'queue_processor') and self.queue_processor:
                 if hasattr(self.queue_processor, 'contender_allocator'):
                     self.queue_processor.contender_allocator.node_handshake_data = self.node_handshake_data
+                    self.queue_processor.contender_allocator.invalidate_node_cache()
         except Exception as e:
             bt.logging.error(f"Error updating handshake data in queue processor: {e}")
 
-    def refresh_cached_nodes(self):
+    def _invalidate_query_nodes(self, hotkeys: List[str]):
         try:
-            self._cache_nodes_info()
+            if getattr(self, 'queue_processor', None) and hasattr(self.queue_processor, 'contender_allocator'):
+                self.queue_processor.contender_allocator.invalidate_node_cache(hotkeys)
+        except Exception as e:
+            bt.logging.error(f"Error invalidating query node cache: {e}")
+
+    def refresh_cached_nodes(self, snapshot: ChainSnapshot):
+        try:
+            self._cache_nodes_info(snapshot)
         except Exception as e:
             bt.logging.error(f"Error refreshing cached nodes: {e}")
 
@@ -749,67 +507,30 @@ class AkihabaraValidator(BaseValidator):
                 f"Validator was down for {blocks_down} blocks (> 230). Will fetch last hour's scores."
             )
 
-    def set_weights(self) -> Tuple[bool, str]:
+    def set_weights(self, snapshot: ChainSnapshot) -> Tuple[bool, str]:
 
         try:
 
-            miner_indices = []
-            weights = []
-            total_stake = 0.0
-            
-            neurons = self.subtensor.neurons_lite(netuid=self.config.netuid)
-            
-            validator_trust = self.subtensor.query_subtensor(
-                "ValidatorTrust",
-                params=[self.config.netuid],
-            )
-
-            total_stake = sum(float(neurons[idx].stake) for idx in range(len(self.metagraph.hotkeys))
-                            if not validator_trust[idx] > 0)  # 排除验证者
-            
-            # 遍历所有矿工
-            for idx, hotkey in enumerate(self.metagraph.hotkeys):
-                is_validator = False
-                try:
-                    neuron = neurons[idx]
-                    ip = neuron.axon_info.ip
-                    if ip == '0.0.0.0':
-                        continue
-
-                    is_validator = self.metagraph.validator_permit[idx]
-                    is_active = bool(neuron.active)
-                    stake = float(neuron.stake)
-
-                    if CHECK_NODE_ACTIVE and not is_active:
-                        logging.debug(f"Skipping inactive node: {hotkey}")
-                        continue
-                        
-                except Exception as e:
-                    bt.logging.warning(f"Error checking node status for {hotkey}: {e}")
-                    continue
-
-                from akihabara.validator.scoring_results_manager import scoring_results_manager
-                
-                historical_score = scoring_results_manager.get_historical_score(hotkey)
-                current_quality_score = scoring_results_manager.get_current_cycle_score(hotkey)
+            neurons = snapshot.neurons
+            validator_trust = snapshot.validator_trust
 
-                if historical_score == 0.0:
-                    historical_score = self.alpha
-                
-                stake_weight = (stake / total_stake) * 0.2 if total_stake > 0 else 0
-                
-                final_score = (
-                    stake_weight +
-                    current_quality_score * 0.7 +
-                    historical_score * 0.1
-                )
-
-                if final_score < FINAL_MIN_SCORE or final_score> 1.0 :
-                    final_score = round(random.uniform(0.8, 1.0), 2)
+            hotkeys = self.metagraph.hotkeys
+            metagraph_arrays = build_metagraph_arrays(neurons, validator_trust, len(hotkeys))
+            current_scores, historical_scores = build_score_arrays(
+                hotkeys,
+                scoring_results_manager.get_all_current_scores(),
+                scoring_results_manager.get_all_historical_scores()
+            )
 
-                if current_quality_score > 0 :
-                    miner_indices.append(idx)
-                    weights.append(final_score)
+            uids, final_scores = compute_final_scores(
+                **metagraph_arrays,
+                current_scores=current_scores,
+                historical_scores=historical_scores,
+                default_historical_score=self.alpha,
+                check_active=CHECK_NODE_ACTIVE
+            )
+            miner_indices = uids.tolist()
+            weights = final_scores.tolist()
 
             is_blacklisted = self.config_manager.is_validator_blacklisted(self.validator_hotkey)
 
@@ -825,24 +546,17 @@ class AkihabaraValidator(BaseValidator):
 
                 miner_indices = list(range(len(self.metagraph.hotkeys)))
             else:
-                total_weight = sum(weights)
-                if total_weight > 0:
-
-                    MIN_WEIGHT_THRESHOLD = 0.001  # 0.1%
-
-                    weights = [w if w >= MIN_WEIGHT_THRESHOLD else 0.0 for w in weights]
-                    
-                    total_weight = sum(weights)
-                    if total_weight > 0:
-                            weights = [ w / total_weight for w in weights]
-                    else:
-                        owner_uid = self.get_subnet_owner_uid()
-                        if owner_uid is not None:
-                            weights = [0.0] * len(self.metagraph.hotkeys)
+                normalized_weights = normalize_weights(final_scores)
+                if normalized_weights is not None:
+                    weights = normalized_weights.tolist()
+                else:
+                    owner_uid = self.get_subnet_owner_uid()
+                    if owner_uid is not None:
+                        weights = [0.0] * len(self.metagraph.hotkeys)
 
-                            weights[owner_uid] =  self.config_manager.get_config().owner_default_score
+                        weights[owner_uid] =  self.config_manager.get_config().owner_default_score
 
-                            logging.info(f"All weights below threshold, setting all weight to subnet owner (uid: {owner_uid})")
+                        logging.info(f"All weights below threshold, setting all weight to subnet owner (uid: {owner_uid})")
                             
 
             success = self.subtensor.set_weights(
@@ -856,7 +570,6 @@ class AkihabaraValidator(BaseValidator):
 
             if success:
                 self.last_update = self.current_block
-                from akihabara.validator.scoring_results_manager import scoring_results_manager
                 scoring_results_manager.clear_current_cycle_scores()
             else:
                 logging.error("Failed to set weights")
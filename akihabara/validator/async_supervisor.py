@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+
+import asyncio
+import signal
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from bittensor import logging
+
+SUPERVISOR_DRAIN_TIMEOUT = 30.0
+SUPERVISOR_BLOCKING_WORKERS = 4
+
+
+class AsyncSupervisor:
+    """Runs the validator's background workers as tasks on one event loop and drains them on shutdown."""
+
+    def __init__(self, drain_timeout: float = SUPERVISOR_DRAIN_TIMEOUT,
+                 blocking_workers: int = SUPERVISOR_BLOCKING_WORKERS):
+        self.drain_timeout = drain_timeout
+        self.blocking_workers = max(blocking_workers, 1)
+
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._critical: set[str] = set()
+        self._stop_callbacks: List[Callable[[], Any]] = []
+        self._stop_event: Optional[asyncio.Event] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._signals: List[int] = []
+
+    @property
+    def stopping(self) -> bool:
+        return self._stop_event is not None and self._stop_event.is_set()
+
+    def _ensure_started(self):
+        if self._stop_event is None:
+            self._stop_event = asyncio.Event()
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.blocking_workers,
+                                                thread_name_prefix="validator-blocking")
+
+    def start(self, name: str, coro: Awaitable, critical: bool = False,
+              on_stop: Optional[Callable[[], Any]] = None) -> asyncio.Task:
+        """Start a named worker; when a critical worker exits the whole runtime shuts down."""
+        self._ensure_started()
+        task = asyncio.get_running_loop().create_task(coro, name=name)
+        self._tasks[name] = task
+        if critical:
+            self._critical.add(name)
+        if on_stop is not None:
+            self._stop_callbacks.append(on_stop)
+        task.add_done_callback(partial(self._on_task_done, name))
+        return task
+
+    def _on_task_done(self, name: str, task: asyncio.Task):
+        if task.cancelled():
+            return
+        exc = task.exception()
+        if exc is not None:
+            logging.error(f"Worker {name} failed: {exc}")
+        if name in self._critical and not self.stopping:
+            logging.warning(f"Critical worker {name} exited, shutting down")
+            self.request_stop()
+
+    async def run_blocking(self, func: Callable, *args, **kwargs) -> Any:
+        """Run a blocking call (substrate RPCs, metagraph sync) on the supervisor's worker threads."""
+        self._ensure_started()
+        return await asyncio.get_running_loop().run_in_executor(self._executor, partial(func, *args, **kwargs))
+
+    async def sleep(self, delay: float) -> bool:
+        """Sleep for `delay` seconds or until a stop is requested; returns True when stopping."""
+        self._ensure_started()
+        try:
+            await asyncio.wait_for(self._stop_event.wait(), timeout=delay)
+        except asyncio.TimeoutError:
+            pass
+        return self.stopping
+
+    def install_signal_handlers(self):
+        self._ensure_started()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            try:
+                loop.add_signal_handler(sig, self._on_signal, sig)
+                self._signals.append(sig)
+            except (NotImplementedError, RuntimeError, ValueError):
+                # Not the main thread, or a platform without loop signal support
+                pass
+
+    def _on_signal(self, sig: int):
+        logging.info(f"Received {signal.Signals(sig).name}, draining validator workers...")
+        self.request_stop()
+
+    def request_stop(self):
+        self._ensure_started()
+        if self._stop_event.is_set():
+            return
+        self._stop_event.set()
+        for callback in self._stop_callbacks:
+            try:
+                callback()
+            except Exception as e:
+                logging.error(f"Error signalling worker to stop: {e}")
+
+    async def wait(self):
+        self._ensure_started()
+        await self._stop_event.wait()
+
+    async def shutdown(self):
+        """Give workers drain_timeout seconds to finish on their own, then cancel what is left."""
+        self.request_stop()
+
+        pending = [task for task in self._tasks.values() if not task.done()]
+        if pending:
+            done, pending = await asyncio.wait(pending, timeout=self.drain_timeout)
+            for task in pending:
+                logging.warning(f"Worker {task.get_name()} did not drain in {self.drain_timeout}s, cancelling")
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+
+        loop = asyncio.get_running_loop()
+        for sig in self._signals:
+            loop.remove_signal_handler(sig)
+        self._signals.clear()
+
+        if self._executor is not None:
+            # Queued calls are dropped; one already running still holds interpreter exit until it
+            # returns, which is why workers only make short blocking calls
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'stopping': self.stopping,
+            'workers': {name: 'running' if not task.done() else 'done' for name, task in self._tasks.items()},
+        }
@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, List, Optional
+
+from bittensor import AsyncSubtensor, logging
+
+
+@dataclass
+class ChainSnapshot:
+    block: int
+    neurons: List[Any]
+    validator_trust: Any
+    blocks_since_last_update: Optional[int]
+    fetch_time: float = 0.0
+    fetched_at: float = field(default_factory=time.time)
+
+
+class ChainSnapshotProvider:
+
+    def __init__(self, subtensor, config, netuid: int, uid: int):
+        self.subtensor = subtensor
+        self.config = config
+        self.netuid = netuid
+        self.uid = uid
+        self._snapshot: Optional[ChainSnapshot] = None
+        self._lock = asyncio.Lock()
+        self._async_subtensor: Optional[AsyncSubtensor] = None
+
+    @property
+    def latest(self) -> Optional[ChainSnapshot]:
+        return self._snapshot
+
+    async def get(self, block: int, run_blocking: Callable[..., Awaitable[Any]]) -> ChainSnapshot:
+        """Latest chain state, fetched at most once per block; `block` is the validator's last synced block.
+
+        Runs on the validator's event loop; `run_blocking` is only used for the sync-RPC fallback.
+        """
+        block = int(block)
+        if block <= 0:
+            raise ValueError(f"Chain snapshot requested before the first metagraph sync (block {block})")
+        async with self._lock:
+            if self._snapshot is not None and self._snapshot.block == block:
+                return self._snapshot
+
+            start_time = time.time()
+            try:
+                snapshot = await self._fetch(block, run_blocking)
+            except Exception as e:
+                if self._snapshot is None:
+                    raise
+                logging.error(f"Failed to fetch chain snapshot at block {block}, reusing block {self._snapshot.block}: {e}")
+                return self._snapshot
+
+            snapshot.fetch_time = time.time() - start_time
+            self._snapshot = snapshot
+            logging.debug(f"Fetched chain snapshot at block {block} in {snapshot.fetch_time:.2f}s")
+            return snapshot
+
+    async def close(self):
+        async_subtensor, self._async_subtensor = self._async_subtensor, None
+        if async_subtensor is None:
+            return
+        try:
+            await async_subtensor.close()
+        except Exception as e:
+            logging.error(f"Error closing async subtensor: {e}")
+
+    async def _fetch(self, block: int, run_blocking: Callable[..., Awaitable[Any]]) -> ChainSnapshot:
+        try:
+            return await self._fetch_async(block)
+        except Exception as e:
+            logging.warning(f"Concurrent chain snapshot fetch failed, falling back to sequential RPCs: {e}")
+            self._async_subtensor = None
+
+        return await run_blocking(self._fetch_sync, block)
+
+    def _fetch_sync(self, block: int) -> ChainSnapshot:
+        neurons = self.subtensor.neurons_lite(netuid=self.netuid)
+        validator_trust = self.subtensor.query_subtensor("ValidatorTrust", params=[self.netuid])
+        blocks_since_last_update = self._blocks_since_last_update(block, neurons)
+        if blocks_since_last_update is None:
+            blocks_since_last_update = self.subtensor.blocks_since_last_update(self.netuid, self.uid)
+        return ChainSnapshot(
+            block=block,
+            neurons=neurons,
+            validator_trust=validator_trust,
+            blocks_since_last_update=blocks_since_last_update,
+        )
+
+    async def _get_async_subtensor(self) -> AsyncSubtensor:
+        if self._async_subtensor is None:
+            async_subtensor = AsyncSubtensor(config=self.config)
+            await async_subtensor.initialize()
+            self._async_subtensor = async_subtensor
+        return self._async_subtensor
+
+    async def _fetch_async(self, block: int) -> ChainSnapshot:
+        subtensor = await self._get_async_subtensor()
+        neurons, validator_trust = await asyncio.gather(
+            subtensor.neurons_lite(netuid=self.netuid),
+            subtensor.query_subtensor("ValidatorTrust", params=[self.netuid]),
+        )
+        blocks_since_last_update = self._blocks_since_last_update(block, neurons)
+        if blocks_since_last_update is None:
+            blocks_since_last_update = await subtensor.blocks_since_last_update(self.netuid, self.uid)
+        return ChainSnapshot(
+            block=block,
+            neurons=neurons,
+            validator_trust=validator_trust,
+            blocks_since_last_update=blocks_since_last_update,
+        )
+
+    def _blocks_since_last_update(self, block: int, neurons: List[Any]) -> Optional[int]:
+        # neurons_lite already carries last_update, so this needs no extra RPC; None asks the caller for one
+        try:
+            return block - int(neurons[self.uid].last_update)
+        except Exception:
+            return None
@@ -8,7 +8,6 @@ from fiber.logging_utils import get_logger
 from akihabara.validator.query.query_config import Config
 from akihabara.validator.models import Contender
 from akihabara.core.models import utility_models
-from akihabara.core.models import config_models as cmodels
 import uuid
 from akihabara.core.models.utility_models import RewardData
 from akihabara.core import work_and_speed_functions
@@ -17,6 +16,7 @@ from akihabara.validator.scoring_results_manager import scoring_results_manager,
 
 logger = get_logger(__name__)
 
+
 async def adjust_contender_from_result(
     config: Config,
     query_result: utility_models.QueryResult,
@@ -36,20 +36,10 @@ async def adjust_contender_from_result(
             logger.error(f"Task {query_result.task} is not enabled")
             return query_result, None
 
-    inp_character_count = len(payload.get("prompt")) if payload.get("prompt") else sum(
-        len(m['content']) if isinstance(m['content'], str)
-        else sum(len(b.get('text', '')) for b in m['content'] if b.get('type') == 'text')
-        for m in payload['messages']
-    ) if payload.get('messages') else 0
-
     if sus_task:
         try:
-            capacity_consumed, num_tokens = work_and_speed_functions.calculate_work(
-                task_config=task_config,
-                result=query_result.model_dump(),
-                inp_character_count=inp_character_count,
-                steps=payload.get("steps"),
-                img_resolution=(payload.get("width"), payload.get("height"))
+            capacity_consumed, num_tokens = work_and_speed_functions.calculate_result_work(
+                task_config, query_result, payload
             )
             metric = capacity_consumed / query_result.response_time if query_result.response_time else 0
             stream_metric = num_tokens / query_result.stream_time if query_result.stream_time else 0
@@ -84,46 +74,12 @@ async def adjust_contender_from_result(
                     stream_metric=stream_metric,
                     created_at=query_result.created_at,
                 )
-                if hasattr(config, 'reward_client') and config.reward_client:
-                    reward_data_dict = {
-                        'id': reward_data.id,
-                        'task': reward_data.task,
-                        'node_id': reward_data.node_id,
-                        'quality_score': reward_data.quality_score,
-                        'validator_hotkey': reward_data.validator_hotkey,
-                        'node_hotkey': reward_data.node_hotkey,
-                        'synthetic_query': reward_data.synthetic_query,
-                        'response_time': reward_data.response_time,
-                        'volume': reward_data.volume,
-                        'metric': reward_data.metric,
-                        'stream_metric': reward_data.stream_metric,
-                        'created_at': reward_data.created_at.isoformat() if reward_data.created_at else None
-                    }
-                    await config.reward_client.insert_reward_data(reward_data_dict)
-                else:
-                    logger.warning("No reward_client available to insert reward data.")
+                await config.submit_reward_data(reward_data.dict())
         except Exception as e:
             logger.error(f"Couldn't process sus task {getattr(contender, 'task', None)} for node id {getattr(contender, 'node_id', None)}: {e}")
 
     if query_result.status_code == 200 and query_result.success:
-        task_type = task_config.get("task_type")
-
-        if task_type == cmodels.TaskType.IMAGE.value:
-
-            capacity_consumed, _ = work_and_speed_functions.calculate_work(
-                task_config=task_config,
-                result=query_result.model_dump(),
-                inp_character_count=inp_character_count,
-                steps=payload.get("steps"),
-                img_resolution=(payload.get("width"), payload.get("height"))
-            )
-        else:
-            capacity_consumed, _ = work_and_speed_functions.calculate_work(
-                task_config=task_config,
-                result=query_result.model_dump(),
-                inp_character_count=inp_character_count,
-                steps=payload.get("steps")
-            )
+        capacity_consumed, _ = work_and_speed_functions.calculate_result_work(task_config, query_result, payload)
         
         node_id = int(getattr(contender, 'nodeid', 0))
         quality_score = await scoring_system.score_result(
@@ -146,39 +102,21 @@ async def adjust_contender_from_result(
         )
         scoring_results_manager.add_scoring_result(scoring_result)
         
-        if hasattr(config, 'reward_client') and config.reward_client:
-            reward_data = RewardData(
-                id=uuid.uuid4().hex,
-                task=query_result.task,
-                node_id=node_id,
-                quality_score=quality_score,
-                validator_hotkey=getattr(config.keypair, 'ss58_address', None),
-                node_hotkey=getattr(contender, 'node_hotkey', None),
-                synthetic_query=synthetic_query,
-                response_time=query_result.response_time,
-                volume=capacity_consumed,
-                metric=capacity_consumed / query_result.response_time if query_result.response_time else 0,
-                stream_metric=0,
-                created_at=query_result.created_at,
-            )
-            
-            reward_data_dict = {
-                'id': reward_data.id,
-                'task': reward_data.task,
-                'node_id': reward_data.node_id,
-                'quality_score': reward_data.quality_score,
-                'validator_hotkey': reward_data.validator_hotkey,
-                'node_hotkey': reward_data.node_hotkey,
-                'synthetic_query': reward_data.synthetic_query,
-                'response_time': reward_data.response_time,
-                'volume': reward_data.volume,
-                'metric': reward_data.metric,
-                'stream_metric': reward_data.stream_metric,
-                'created_at': reward_data.created_at.isoformat() if reward_data.created_at else None
-            }
-            await config.reward_client.insert_reward_data(reward_data_dict)
-        else:
-            logger.warning("No reward_client available to insert reward data.")
+        reward_data = RewardData(
+            id=uuid.uuid4().hex,
+            task=query_result.task,
+            node_id=node_id,
+            quality_score=quality_score,
+            validator_hotkey=getattr(config.keypair, 'ss58_address', None),
+            node_hotkey=getattr(contender, 'node_hotkey', None),
+            synthetic_query=synthetic_query,
+            response_time=query_result.response_time,
+            volume=capacity_consumed,
+            metric=capacity_consumed / query_result.response_time if query_result.response_time else 0,
+            stream_metric=0,
+            created_at=query_result.created_at,
+        )
+        await config.submit_reward_data(reward_data.dict())
             
     elif query_result.status_code == 400:
         logger.debug(f"400 error; Node {getattr(contender, 'node_id', None)} - Task {query_result.task}.")
@@ -4,25 +4,37 @@ import asyncio
 from bittensor import logging
 import time
 import os
-import httpx
-from fiber.chain import chain_utils
 from dotenv import load_dotenv
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterable, Optional, Tuple
 from datetime import datetime
-from substrateinterface import Keypair
 import json
+import uuid
+
+from cryptography.fernet import Fernet
+from fiber.encrypted.networking.models import NodeWithFernet as Node
 
 from akihabara.core.path_utils import PathUtils
 import base64
 
 from akihabara.validator.contender_client import ContenderClient
 from akihabara.validator.task_config_client import TaskConfigClient
+from akihabara.validator.miner_lease_manager import MinerLeaseManager
+from akihabara.validator.models import Contender
+from akihabara.validator.query.query_context import QueryContext
+
+FAN_OUT_CONCURRENCY = 16
+FAN_OUT_DEADLINE_GRACE = 5
+FAN_OUT_RETRY_DELAY = 2
+SEQUENTIAL_RETRY_DELAY = 30
+MAX_TASK_RETRIES = 3
 
 
 class ContenderAllocator:
     def __init__(self, contender_client: ContenderClient, task_config_client: TaskConfigClient,
                  redis_host: str = "localhost", redis_port: int = 6379, redis_password: str = None,
-                 node_handshake_data: Dict[str, Dict[str, Any]] = None):
+                 node_handshake_data: Dict[str, Dict[str, Any]] = None,
+                 fan_out: bool = True, fan_out_concurrency: int = FAN_OUT_CONCURRENCY,
+                 required_successes: int = 0, query_context: Optional[QueryContext] = None):
         self.contender_client = contender_client
         self.task_config_client = task_config_client
         self.redis_host = redis_host
@@ -30,11 +42,24 @@ class ContenderAllocator:
         self.redis_password = redis_password
         self.node_handshake_data = node_handshake_data or {}
         self.contenders = []
-        self.miner_tasks = {}
         self.task_history = {}
         self.validator_ss58_address = contender_client.validator_hotkey
         self.redis_client = None
         self.miner_task_expire_time = 1800
+        self.lease_manager = MinerLeaseManager(
+            self._get_redis_client if redis_host else None,
+            self.validator_ss58_address,
+            lease_ttl=self.miner_task_expire_time
+        )
+        self.fan_out = fan_out
+        self.fan_out_concurrency = max(1, fan_out_concurrency)
+        self.required_successes = required_successes
+        self._owns_query_context = query_context is None
+        self.query_context = query_context or QueryContext.from_env(self.validator_ss58_address)
+        self._node_cache: Dict[str, Tuple[Tuple, Node]] = {}  # hotkey -> (cache key, node)
+        self._node_cache_hits = 0
+        self._node_cache_misses = 0
+
     async def _get_redis_client(self):
         if self.redis_client is None:
             try:
@@ -54,76 +79,13 @@ class ContenderAllocator:
                 self.redis_client = None
         return self.redis_client
 
-    async def _set_miner_task(self, miner_hotkey: str, task_id: str) -> bool:
-        try:
-            redis_client = await self._get_redis_client()
-            if redis_client is None:
-                logging.warning("Redis client not available, using memory fallback")
-                self.miner_tasks[miner_hotkey] = task_id
-                return True
-
-            key = f"miner_task:{miner_hotkey}"
-            task_data = {
-                'task_id': task_id,
-                'allocated_at': datetime.now().isoformat(),
-                'validator_hotkey': self.validator_ss58_address
-            }
-
-            await redis_client.setex(
-                key,
-                self.miner_task_expire_time,
-                json.dumps(task_data)
-            )
-            logging.debug(f"Set miner task in Redis: {miner_hotkey} -> {task_id}")
-            return True
-
-        except Exception as e:
-            logging.error(f"Error setting miner task in Redis: {e}")
-            self.miner_tasks[miner_hotkey] = task_id
-            return True
-
     async def _get_miner_task(self, miner_hotkey: str) -> Optional[str]:
-        try:
-            redis_client = await self._get_redis_client()
-            if redis_client is None:
-                logging.warning("Redis client not available, using memory fallback")
-                return self.miner_tasks.get(miner_hotkey)
-
-            key = f"miner_task:{miner_hotkey}"
-            task_data_str = await redis_client.get(key)
-
-            if task_data_str:
-                task_data = json.loads(task_data_str)
-                task_id = task_data.get('task_id')
-                logging.debug(f"Found miner task in Redis: {miner_hotkey} -> {task_id}")
-                return task_id
-            else:
-                logging.debug(f"No miner task found in Redis for: {miner_hotkey}")
-                return None
-
-        except Exception as e:
-            logging.error(f"Error getting miner task from Redis: {e}")
-            return self.miner_tasks.get(miner_hotkey)
+        return await self.lease_manager.get_task(miner_hotkey)
 
-    async def _remove_miner_task(self, miner_hotkey: str) -> bool:
-        try:
-            redis_client = await self._get_redis_client()
-            if redis_client is None:
-                logging.warning("Redis client not available, using memory fallback")
-                if miner_hotkey in self.miner_tasks:
-                    del self.miner_tasks[miner_hotkey]
-                return True
-
-            key = f"miner_task:{miner_hotkey}"
-            result = await redis_client.delete(key)
-            logging.debug(f"Removed miner task from Redis: {miner_hotkey}, result: {result}")
-            return True
-
-        except Exception as e:
-            logging.error(f"Error removing miner task from Redis: {e}")
-            if miner_hotkey in self.miner_tasks:
-                del self.miner_tasks[miner_hotkey]
-            return True
+    async def _remove_miner_task(self, miner_hotkey: str, task_id: str) -> bool:
+        released = await self.lease_manager.release(miner_hotkey, task_id)
+        logging.debug(f"Released miner lease: {miner_hotkey} -> {task_id}, result: {released}")
+        return True
 
     async def _check_miner_has_task(self, miner_hotkey: str) -> bool:
         task_id = await self._get_miner_task(miner_hotkey)
@@ -150,15 +112,9 @@ class ContenderAllocator:
             contender_id = contender.get('contender_id')
             miner_hotkey = contender.get('node_hotkey')
 
-            has_task = await self._check_miner_has_task(miner_hotkey)
-            if has_task:
-                existing_task = await self._get_miner_task(miner_hotkey)
-                logging.warning(f"Miner {miner_hotkey} already has a task: {existing_task}")
-                return False
-
-            success = await self._set_miner_task(miner_hotkey, task_id)
-            if not success:
-                logging.error(f"Failed to set miner task in Redis for {miner_hotkey}")
+            acquired = await self.lease_manager.acquire(miner_hotkey, task_id)
+            if not acquired:
+                logging.info(f"Miner {miner_hotkey} already has a task, lease not acquired for {task_id}")
                 return False
 
             if task_id not in self.task_history:
@@ -226,7 +182,7 @@ class ContenderAllocator:
 
                 await self._update_contender_stats(contender, success=True)
 
-                await self._remove_miner_task(miner_hotkey)
+                await self._remove_miner_task(miner_hotkey, task_id)
             else:
                 logging.warning(f"Task {task_id} failed with contender {contender.get('contender_id')}")
 
@@ -236,7 +192,7 @@ class ContenderAllocator:
 
                 await self._update_contender_stats(contender, success=False)
 
-                await self._remove_miner_task(miner_hotkey)
+                await self._remove_miner_task(miner_hotkey, task_id)
 
             return success
 
@@ -355,6 +311,9 @@ class ContenderAllocator:
             current_synthetic_requests = contender.get('synthetic_requests_made', 0)
             contender['synthetic_requests_made'] = current_synthetic_requests + 1
 
+            # Reported together with the outcome by _update_contender_stats
+            contender['_unreported_requests'] = contender.get('_unreported_requests', 0) + 1
+
         except Exception as e:
             logging.error(f"Error updating contender requests made: {e}")
 
@@ -473,156 +432,104 @@ class ContenderAllocator:
             logging.error(f"Error in non-stream query: {e}")
             return False
 
-    def load_hotkey_keypair_from_seed(self, secret_seed: str) -> Keypair:
-        try:
-            keypair = Keypair.create_from_seed(secret_seed)
-            logging.info("Loaded keypair from seed directly!")
-            return keypair
-        except Exception as e:
-            raise ValueError(f"Failed to load keypair: {str(e)}")
-
     def _create_config_for_query(self):
         try:
-            from akihabara.validator.query.query_config import Config
-            from fiber import Keypair
-            from redis.asyncio import Redis
-            import httpx
-
-            redis_db = Redis(
-                host=os.getenv('REDIS_HOST', 'localhost'),
-                port=int(os.getenv('REDIS_PORT', 6379)),
-                password=os.getenv('REDIS_PASSWORD'),
-                decode_responses=True
-            )
-
-            keypair = Keypair.create_from_uri("//Alice")
-            wallet_name = os.getenv("BT_WALLET_NAME", "default")
-            hotkey_name = os.getenv("BT_WALLET_HOTKEY", "default")
-            try:
-                keypair = chain_utils.load_hotkey_keypair(wallet_name=wallet_name, hotkey_name=hotkey_name)
-            except (ValueError, FileNotFoundError) as e:
-                logging.info("Attempting to use WALLET_SECRET_SEED environment variable")
-                secret_seed = os.getenv("WALLET_SECRET_SEED", None)
-                if secret_seed:
-                    try:
-                        keypair = self.load_hotkey_keypair_from_seed(secret_seed)
-                    except Exception as e:
-                        logging.error(f"Failed to load keypair from seed: {str(e)}")
-                        raise ValueError(f"Invalid secret seed provided: {str(e)}")
-                else:
-                    logging.error("WALLET_SECRET_SEED environment variable not set")
-                    raise ValueError(
-                        f"Could not load wallet from path and WALLET_SECRET_SEED env var is not set. Original error: {str(e)}")
-            except Exception as e:
-                logging.error(f"Unexpected error loading hotkey from wallet: {str(e)}")
-                raise
-
-            httpx_client = httpx.AsyncClient(timeout=30)
-
-            config = Config(
-                keypair=keypair,
-                redis_db=redis_db,
-                ss58_address=self.validator_ss58_address,
-                netuid=int(os.getenv('NETUID', 119)),
-                httpx_client=httpx_client,
-                replace_with_localhost=os.getenv('REPLACE_WITH_LOCALHOST', 'false').lower() == 'true',
-                replace_with_docker_localhost=os.getenv('REPLACE_WITH_DOCKER_LOCALHOST', 'false').lower() == 'true'
-            )
-
-            return config
-
+            return self.query_context.get_config()
         except Exception as e:
             logging.error(f"Error creating config for query: {e}")
             return None
 
+    def _node_cache_key(self, node_hotkey: str, node_data: Optional[Dict[str, Any]] = None) -> Tuple:
+        handshake_data = self.node_handshake_data.get(node_hotkey)
+        if handshake_data and handshake_data.get('handshake_success', False) \
+                and handshake_data.get('symmetric_key') and handshake_data.get('symmetric_key_uid'):
+            return (node_hotkey, handshake_data['symmetric_key_uid'], handshake_data.get('ip'), handshake_data.get('port'))
+        if node_data is None:
+            return None
+        return (node_hotkey, None, node_data.get('ip'), node_data.get('port'))
+
+    def invalidate_node_cache(self, hotkeys: Optional[Iterable[str]] = None):
+        if hotkeys is None:
+            self._node_cache.clear()
+            return
+        for hotkey in hotkeys:
+            self._node_cache.pop(hotkey, None)
+
+    def get_node_cache_stats(self) -> Dict[str, Any]:
+        return {
+            'size': len(self._node_cache),
+            'hits': self._node_cache_hits,
+            'misses': self._node_cache_misses,
+        }
+
     async def _create_node_for_query(self, contender: Dict[str, Any], config):
         try:
-            from fiber.encrypted.networking.models import NodeWithFernet as Node
-            from cryptography.fernet import Fernet
-            import uuid
-
             node_hotkey = contender.get('node_hotkey')
             if not node_hotkey:
                 return None
 
+            # Handshake entries are replaced on every re-handshake, so a changed key uid or axon misses here
+            cache_key = self._node_cache_key(node_hotkey)
+            cached = self._node_cache.get(node_hotkey)
+            if cached is not None and cache_key is not None and cached[0] == cache_key:
+                self._node_cache_hits += 1
+                return cached[1]
+
             node_data = await config.get_node_by_hotkey(node_hotkey)
             if not node_data:
+                logging.error(f"Node data not found for hotkey: {node_hotkey}")
                 return None
 
-            handshake_data = self.node_handshake_data.get(node_hotkey)
-            if handshake_data and handshake_data.get('handshake_success', False):
-                try:
-                    symmetric_key = handshake_data.get('symmetric_key')
-                    symmetric_key_uid = handshake_data.get('symmetric_key_uid')
-
-                    if symmetric_key and symmetric_key_uid:
-                        if isinstance(symmetric_key, str):
-                            fernet_key = symmetric_key.encode()
-                        else:
-                            fernet_key = symmetric_key
-
-                        fernet = Fernet(fernet_key)
-
-                        node = Node(
-                            node_id=node_data.get('node_id', 0),
-                            hotkey=node_hotkey,
-                            coldkey=node_data.get('coldkey'),
-                            incentive=node_data.get('incentive'),
-                            netuid=node_data.get('netuid', 0),
-                            trust=node_data.get('trust'),
-                            vtrust=node_data.get('vtrust'),
-                            stake=node_data.get('stake', 0.0),
-                            ip=node_data.get('ip', '127.0.0.1'),
-                            ip_type=node_data.get('ip_type', 'ipv4'),
-                            port=node_data.get('port', 8091),
-                            protocol=node_data.get('protocol', 0),
-                            last_updated=node_data.get('last_updated', 0.0),
-                            fernet=fernet,
-                            symmetric_key_uuid=symmetric_key_uid
-                        )
-
-                        return node
+            if cache_key is None:
+                cache_key = self._node_cache_key(node_hotkey, node_data)
+                if cached is not None and cached[0] == cache_key:
+                    self._node_cache_hits += 1
+                    return cached[1]
 
+            self._node_cache_misses += 1
+            node = None
+            symmetric_key_uid = cache_key[1]
+            if symmetric_key_uid is not None:
+                try:
+                    symmetric_key = self.node_handshake_data[node_hotkey]['symmetric_key']
+                    fernet_key = symmetric_key.encode() if isinstance(symmetric_key, str) else symmetric_key
+                    node = self._build_node(node_hotkey, node_data, Fernet(fernet_key), symmetric_key_uid)
                 except Exception as e:
                     logging.warning(f"Failed to create Node using handshake data for {node_hotkey}: {e}")
 
-            logging.info(f"Using fallback method to create Node for {node_hotkey}")
-            node_data = await config.get_node_by_hotkey(node_hotkey)
-            if not node_data:
-                logging.error(f"Node data not found for hotkey: {node_hotkey}")
-                return None
-
-            fernet_key = Fernet.generate_key()
-            fernet = Fernet(fernet_key)
-
-            node = Node(
-                node_id=node_data.get('node_id', 0),
-                hotkey=node_hotkey,
-                coldkey=node_data.get('coldkey'),
-                incentive=node_data.get('incentive'),
-                netuid=node_data.get('netuid', 0),
-                trust=node_data.get('trust'),
-                vtrust=node_data.get('vtrust'),
-                stake=node_data.get('stake', 0.0),
-                ip=node_data.get('ip', '127.0.0.1'),
-                ip_type=node_data.get('ip_type', 'ipv4'),
-                port=node_data.get('port', 8091),
-                protocol=node_data.get('protocol', 0),
-                last_updated=node_data.get('last_updated', 0.0),
-                fernet=fernet,
-                symmetric_key_uuid=str(uuid.uuid4())
-            )
+            if node is None:
+                logging.info(f"Using fallback method to create Node for {node_hotkey}")
+                node = self._build_node(node_hotkey, node_data, Fernet(Fernet.generate_key()), str(uuid.uuid4()))
 
+            self._node_cache[node_hotkey] = (cache_key, node)
             return node
 
         except Exception as e:
             logging.error(f"Error creating node for query: {e}")
             return None
 
+    @staticmethod
+    def _build_node(node_hotkey: str, node_data: Dict[str, Any], fernet: Fernet, symmetric_key_uid: str) -> Node:
+        return Node(
+            node_id=node_data.get('node_id', 0),
+            hotkey=node_hotkey,
+            coldkey=node_data.get('coldkey'),
+            incentive=node_data.get('incentive'),
+            netuid=node_data.get('netuid', 0),
+            trust=node_data.get('trust'),
+            vtrust=node_data.get('vtrust'),
+            stake=node_data.get('stake', 0.0),
+            ip=node_data.get('ip', '127.0.0.1'),
+            ip_type=node_data.get('ip_type', 'ipv4'),
+            port=node_data.get('port', 8091),
+            protocol=node_data.get('protocol', 0),
+            last_updated=node_data.get('last_updated', 0.0),
+            fernet=fernet,
+            symmetric_key_uuid=symmetric_key_uid
+        )
+
     async def _create_contender_obj(self, contender: Dict[str, Any]):
         try:
-            from akihabara.validator.models import Contender
-
             contender_obj = Contender(
                 contender_id=contender.get('contender_id', ''),
                 node_hotkey=contender.get('node_hotkey', ''),
@@ -651,26 +558,35 @@ class ContenderAllocator:
             if not contender_id:
                 return
 
+            unreported_requests = contender.pop('_unreported_requests', 0)
             stats = {
-                'total_requests_made': contender.get('total_requests_made', 0),
+                'total_requests_made': contender.get('total_requests_made', 0) - unreported_requests,
                 'requests_429': contender.get('requests_429', 0),
                 'requests_500': contender.get('requests_500', 0),
                 'period_score': contender.get('period_score', 0.0)
             }
+            increments = {
+                'total_requests_made': unreported_requests,
+                'requests_500': 0 if success else 1
+            }
 
-            if not success:
-                stats['requests_500'] += 1
-
-            await self.contender_client.update_contender_stats(contender_id, stats)
+            await self.contender_client.add_contender_stats(
+                contender_id, stats, increments, fetched_at=contender.get('_fetched_at')
+            )
 
         except Exception as e:
             logging.error(f"Error updating contender stats: {e}")
 
     async def process_task_with_contenders(self, task: Dict[str, Any], contenders: List[Dict[str, Any]]) -> bool:
+        if self.fan_out:
+            return await self._process_task_fan_out(task, contenders)
+        return await self._process_task_sequentially(task, contenders)
+
+    async def _process_task_sequentially(self, task: Dict[str, Any], contenders: List[Dict[str, Any]]) -> bool:
 
         task_id = task.get('task_id')
-        max_retries = 3
-        retry_delay = 30
+        max_retries = MAX_TASK_RETRIES
+        retry_delay = SEQUENTIAL_RETRY_DELAY
 
         for attempt in range(max_retries):
 
@@ -683,18 +599,10 @@ class ContenderAllocator:
 
                 logging.info(f"Processing contender {i + 1}/{len(contenders)}: {contender_id}")
 
-                has_task = await self._check_miner_has_task(miner_hotkey)
-                if has_task:
-                    existing_task = await self._get_miner_task(miner_hotkey)
-                    logging.info(
-                        f"Contender  is busy with task {existing_task}, skipping to next contender")
-                    contender_results[contender_id] = "skipped_busy"
-                    continue
-
                 allocated = await self.allocate_task_to_contender(task, contender)
                 if not allocated:
-                    logging.warning(f"Failed to allocate task to contender {contender_id}")
-                    contender_results[contender_id] = False
+                    logging.info(f"Contender {contender_id} is busy, skipping to next contender")
+                    contender_results[contender_id] = "skipped_busy"
                     continue
 
                 success = await self.process_task_with_contender(task, contender)
@@ -717,6 +625,91 @@ class ContenderAllocator:
         logging.error(f"Failed to process task {task_id} after {max_retries} attempts with all contenders")
         return False
 
+    async def _get_contender_deadline(self, task: Dict[str, Any]) -> float:
+        task_config = await self._get_task_config(task.get('task_type'))
+        timeout = task_config.get('timeout', 30) if task_config else 30
+        return float(timeout) + FAN_OUT_DEADLINE_GRACE
+
+    async def _run_contender_with_deadline(self, task: Dict[str, Any], contender: Dict[str, Any],
+                                           semaphore: asyncio.Semaphore, deadline: float):
+        contender_id = contender.get('contender_id')
+        miner_hotkey = contender.get('node_hotkey')
+
+        async with semaphore:
+            allocated = await self.allocate_task_to_contender(task, contender)
+            if not allocated:
+                return "skipped_busy"
+
+            try:
+                return await asyncio.wait_for(self.process_task_with_contender(task, contender), timeout=deadline)
+            except asyncio.TimeoutError:
+                logging.warning(f"Contender {contender_id} exceeded deadline of {deadline}s for task {task.get('task_id')}")
+                await self._update_contender_stats(contender, success=False)
+                await self._remove_miner_task(miner_hotkey, task.get('task_id'))
+                return False
+            except asyncio.CancelledError:
+                await self._remove_miner_task(miner_hotkey, task.get('task_id'))
+                raise
+
+    async def _process_task_fan_out(self, task: Dict[str, Any], contenders: List[Dict[str, Any]]) -> bool:
+
+        task_id = task.get('task_id')
+        deadline = await self._get_contender_deadline(task)
+        required_successes = self.required_successes
+        retry_delay = FAN_OUT_RETRY_DELAY
+
+        remaining = list(contenders)
+        total_successes = 0
+
+        for attempt in range(MAX_TASK_RETRIES):
+            semaphore = asyncio.Semaphore(self.fan_out_concurrency)
+            pending = {
+                asyncio.create_task(self._run_contender_with_deadline(task, contender, semaphore, deadline)): contender
+                for contender in remaining
+            }
+            failed_contenders = []
+
+            try:
+                while pending:
+                    done, _ = await asyncio.wait(pending.keys(), return_when=asyncio.FIRST_COMPLETED)
+                    for finished in done:
+                        contender = pending.pop(finished)
+                        try:
+                            result = finished.result()
+                        except Exception as e:
+                            logging.error(f"Error querying contender {contender.get('contender_id')}: {e}")
+                            result = False
+
+                        if result is True:
+                            total_successes += 1
+                        else:
+                            failed_contenders.append(contender)
+
+                    if required_successes > 0 and total_successes >= required_successes:
+                        logging.info(f"Task {task_id} reached {total_successes} successes, cancelling remaining contenders")
+                        break
+            finally:
+                for unfinished in pending:
+                    unfinished.cancel()
+                if pending:
+                    await asyncio.gather(*pending.keys(), return_exceptions=True)
+
+            if total_successes and (required_successes <= 0 or total_successes >= required_successes):
+                return True
+
+            if not failed_contenders:
+                break
+
+            remaining = failed_contenders
+            if attempt < MAX_TASK_RETRIES - 1:
+                await asyncio.sleep(retry_delay * (2 ** attempt))
+
+        if total_successes:
+            return True
+
+        logging.error(f"Failed to process task {task_id} after {MAX_TASK_RETRIES} attempts with all contenders")
+        return False
+
     async def _wait_for_contender_availability(self, contenders: List[Dict[str, Any]], timeout: int = 30) -> bool:
 
         start_time = time.time()
@@ -744,17 +737,7 @@ class ContenderAllocator:
         completed_tasks = len([t for t in self.task_history.values() if t['status'] == 'completed'])
         failed_tasks = len([t for t in self.task_history.values() if t['status'] == 'failed'])
 
-        active_miners = 0
-        try:
-            redis_client = await self._get_redis_client()
-            if redis_client is not None:
-                keys = await redis_client.keys("miner_task:*")
-                active_miners = len(keys)
-            else:
-                active_miners = len(self.miner_tasks)
-        except Exception as e:
-            logging.error(f"Error getting active miners count: {e}")
-            active_miners = len(self.miner_tasks)
+        active_miners = await self.lease_manager.count_active()
 
         return {
             'total_tasks': total_tasks,
@@ -767,6 +750,8 @@ class ContenderAllocator:
 
     async def cleanup(self):
         try:
+            if self._owns_query_context:
+                await self.query_context.close()
             if self.redis_client is not None:
                 await self.redis_client.close()
                 logging.info("Redis client connection closed")
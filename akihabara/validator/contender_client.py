@@ -4,21 +4,41 @@ import asyncio
 import json
 import logging
 import os
+import time
 from typing import List, Dict, Any, Optional
 from datetime import datetime
 
 import aiohttp
 
+from akihabara.validator.ttl_cache import (
+    AsyncTTLCache,
+    CacheEntry,
+    CacheResponse,
+    cache_response_from_http,
+    conditional_headers,
+)
+
 logger = logging.getLogger(__name__)
 
+CONTENDER_CACHE_TTL = 5
+CONTENDER_STALE_TTL = 30
+CONTENDER_NEGATIVE_TTL = 5
+
 
 class ContenderClient:
 
-    def __init__(self, base_url: str, validator_hotkey: str, token: Optional[str] = None):
+    def __init__(self, base_url: str, validator_hotkey: str, token: Optional[str] = None,
+                 cache_ttl: float = CONTENDER_CACHE_TTL, stale_ttl: float = CONTENDER_STALE_TTL,
+                 negative_ttl: float = CONTENDER_NEGATIVE_TTL):
         self.base_url = base_url.rstrip('/')
         self.validator_hotkey = validator_hotkey
         self.token = token
         self.session = None
+        self._cache = AsyncTTLCache(ttl=cache_ttl, stale_ttl=stale_ttl, negative_ttl=negative_ttl,
+                                    name="contender")
+        self._stats_locks: Dict[str, asyncio.Lock] = {}
+        self._reported_stats: Dict[str, Dict[str, Any]] = {}  # contender_id -> {'values', 'reported_at'}
+        self._pending_increments: Dict[str, Dict[str, int]] = {}
     
     async def __aenter__(self):
         self.session = aiohttp.ClientSession()
@@ -48,31 +68,52 @@ class ContenderClient:
         
         return headers
     
+    async def _fetch_contenders_for_task(self, task: str, top_x: int, entry: Optional[CacheEntry]) -> CacheResponse:
+        await self.ensure_session()
+
+        url = f"{self.base_url}/contenders/task/{task}"
+        params = {
+            'top_x': top_x,
+            'validator_hotkey': self.validator_hotkey
+        }
+        headers = {**self._get_headers(), **conditional_headers(entry)}
+
+        async with self.session.get(url, params=params, headers=headers) as response:
+            if response.status == 304:
+                return CacheResponse(not_modified=True)
+            if response.status == 404:
+                return CacheResponse()
+            if response.status != 200:
+                raise RuntimeError(f"HTTP {response.status}: {await response.text()}")
+
+            data = await response.json()
+            if not data.get('success'):
+                raise RuntimeError(f"Failed to get contenders: {data.get('error')}")
+            return cache_response_from_http(response, data.get('contenders', []))
+
     async def get_contenders_for_task(self, task: str, top_x: int = 5) -> List[Dict[str, Any]]:
         try:
-            await self.ensure_session()
-            
-            url = f"{self.base_url}/contenders/task/{task}"
-            params = {
-                'top_x': top_x,
-                'validator_hotkey': self.validator_hotkey
-            }
-            
-            async with self.session.get(url, params=params, headers=self._get_headers()) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    if data.get('success'):
-                        return data.get('contenders', [])
-                    else:
-                        logger.error(f"Failed to get contenders: {data.get('error')}")
-                        return []
-                else:
-                    logger.error(f"HTTP {response.status}: {await response.text()}")
-                    return []
+            key = ('task', task, top_x)
+            contenders = await self._cache.get(
+                key,
+                lambda entry: self._fetch_contenders_for_task(task, top_x, entry),
+                default=[]
+            )
+            entry = self._cache.peek(key)
+            fetched_at = entry.fetched_at if entry is not None else time.monotonic()
+            # Callers update request counters on the dicts they get, so keep the cached ones untouched;
+            # _fetched_at tells add_contender_stats how old the counters are
+            return [{**contender, '_fetched_at': fetched_at} for contender in contenders]
                     
         except Exception as e:
             logger.error(f"Error getting contenders for task {task}: {e}")
             return []
+
+    def clear_cache(self):
+        self._cache.invalidate()
+
+    def get_cache_stats(self) -> Dict[str, Any]:
+        return self._cache.get_stats()
     
     async def get_contenders_by_node(self, node_hotkey: str) -> List[Dict[str, Any]]:
         try:
@@ -145,6 +186,39 @@ class ContenderClient:
             logger.error(f"Error updating contender stats: {e}")
             return False
     
+    async def add_contender_stats(self, contender_id: str, stats: Dict[str, Any], increments: Dict[str, int],
+                                  fetched_at: Optional[float] = None) -> bool:
+        """Write back `stats` with counters advanced by `increments`.
+
+        Contender lists are cached, so concurrent tasks start from the same counters and the server only takes
+        absolute values. Until a fetch newer than this validator's last successful write arrives, counters are
+        advanced from what was last written; after that the server's values win, so a reset there sticks.
+        """
+        lock = self._stats_locks.setdefault(contender_id, asyncio.Lock())
+        async with lock:
+            reported = self._reported_stats.get(contender_id)
+            if reported is not None and fetched_at is not None and fetched_at >= reported['reported_at']:
+                del self._reported_stats[contender_id]
+                reported = None
+            reported_values = reported['values'] if reported is not None else {}
+
+            # Increments from failed writes ride along with the next one
+            pending = self._pending_increments.pop(contender_id, {})
+            totals = {key: increments.get(key, 0) + pending.get(key, 0) for key in increments.keys() | pending.keys()}
+            new_stats = dict(stats)
+            for key, amount in totals.items():
+                new_stats[key] = max(stats.get(key, 0), reported_values.get(key, 0)) + amount
+
+            if not await self.update_contender_stats(contender_id, new_stats):
+                self._pending_increments[contender_id] = totals
+                return False
+
+            self._reported_stats[contender_id] = {
+                'values': {key: new_stats[key] for key in totals},
+                'reported_at': time.monotonic(),
+            }
+            return True
+
     async def update_contender_capacity(self, contender_id: str, capacity_data: Dict[str, Any]) -> bool:
         try:
             await self.ensure_session()
@@ -0,0 +1,292 @@
+# -*- coding: utf-8 -*-
+
+import asyncio
+import bisect
+import json
+import os
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional
+
+import httpx
+from bittensor import logging
+from fiber.encrypted.validator import client, handshake
+
+from akihabara.core.path_utils import PathUtils
+
+HANDSHAKE_TIMEOUT = 10.0
+HANDSHAKE_KEY_MAX_AGE = 3600
+HANDSHAKE_CHECK_INTERVAL = 60
+HANDSHAKE_CONCURRENCY = 32
+HANDSHAKE_MAX_CONNECTIONS = 64
+HANDSHAKE_FAILURE_RETRY_INTERVAL = 120
+HANDSHAKE_LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+PERSISTED_FIELDS = ('uid', 'hotkey', 'ip', 'port', 'symmetric_key', 'symmetric_key_uid', 'last_handshake_time')
+
+
+def get_default_handshake_persist_path() -> Path:
+    return PathUtils.get_project_root() / "data" / "handshake_keys.json"
+
+
+class LatencyHistogram:
+
+    def __init__(self, buckets=HANDSHAKE_LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.total += value
+
+    def to_dict(self) -> Dict[str, Any]:
+        labels = [f"<={bucket}s" for bucket in self.buckets] + [f">{self.buckets[-1]}s"]
+        return {
+            'count': self.count,
+            'avg': self.total / self.count if self.count else 0.0,
+            'buckets': dict(zip(labels, self.counts)),
+        }
+
+
+class HandshakeManager:
+
+    def __init__(self, keypair, replace_with_localhost: bool = False, replace_with_docker_localhost: bool = False,
+                 key_max_age: int = HANDSHAKE_KEY_MAX_AGE, check_interval: int = HANDSHAKE_CHECK_INTERVAL,
+                 concurrency: int = HANDSHAKE_CONCURRENCY, persist_path: Optional[str] = None):
+        self.keypair = keypair
+        self.replace_with_localhost = replace_with_localhost
+        self.replace_with_docker_localhost = replace_with_docker_localhost
+        self.key_max_age = key_max_age
+        self.check_interval = check_interval
+        self.concurrency = max(concurrency, 1)
+        self.persist_path = Path(persist_path) if persist_path else get_default_handshake_persist_path()
+
+        self.node_handshake_data: Dict[str, Dict[str, Any]] = {}
+        self.nodes_info: List[Dict[str, Any]] = []
+        self.running = False
+        self.last_handshake_time = 0.0
+
+        self._client: Optional[httpx.AsyncClient] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._success_latency = LatencyHistogram()
+        self._failure_latency = LatencyHistogram()
+        self._rounds = 0
+
+        self._load_persisted_keys()
+
+    def update_nodes(self, nodes_info: List[Dict[str, Any]]):
+        # Called from the sync loop thread; the handshake loop picks the new list up on its next pass
+        self.nodes_info = list(nodes_info)
+        if self._loop is not None and self._wakeup is not None:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    def stop(self):
+        self.running = False
+        if self._loop is not None and self._wakeup is not None:
+            try:
+                self._loop.call_soon_threadsafe(self._wakeup.set)
+            except RuntimeError:
+                pass
+
+    async def run(self):
+        self.running = True
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._client = httpx.AsyncClient(
+            timeout=HANDSHAKE_TIMEOUT,
+            limits=httpx.Limits(max_connections=HANDSHAKE_MAX_CONNECTIONS,
+                                max_keepalive_connections=HANDSHAKE_MAX_CONNECTIONS)
+        )
+
+        try:
+            while self.running:
+                try:
+                    await self.handshake_due_nodes()
+                except Exception as e:
+                    logging.error(f"Error in handshake round: {e}")
+
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.check_interval)
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+        finally:
+            await self._client.aclose()
+            self._client = None
+            self._loop = None
+
+    def _needs_handshake(self, node_info: Dict[str, Any], now: float) -> bool:
+        current = self.node_handshake_data.get(node_info['hotkey'])
+        if current is None:
+            return True
+        if current.get('ip') != node_info['ip'] or current.get('port') != node_info['port']:
+            return True
+        if now - current.get('last_attempt_time', 0) < HANDSHAKE_FAILURE_RETRY_INTERVAL:
+            return False
+        if not current.get('handshake_success', False):
+            return True
+        return now - current.get('last_handshake_time', 0) >= self.key_max_age
+
+    async def handshake_due_nodes(self) -> int:
+        nodes_info = self.nodes_info
+        now = time.time()
+
+        if not nodes_info:
+            return 0
+
+        active_hotkeys = {node_info['hotkey'] for node_info in nodes_info}
+        removed = [hotkey for hotkey in list(self.node_handshake_data) if hotkey not in active_hotkeys]
+        for hotkey in removed:
+            self.node_handshake_data.pop(hotkey, None)
+
+        due = [
+            node_info for node_info in nodes_info
+            if node_info['ip'] != '0.0.0.0' and self._needs_handshake(node_info, now)
+        ]
+        if not due:
+            if removed:
+                self._persist_keys()
+            return 0
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def limited_handshake(node_info):
+            async with semaphore:
+                return await self._handshake_node(node_info)
+
+        start_time = time.time()
+        results = await asyncio.gather(*(limited_handshake(node_info) for node_info in due), return_exceptions=True)
+
+        successful = 0
+        for node_info, result in zip(due, results):
+            if isinstance(result, Exception):
+                logging.error(f"Handshake task failed for node {node_info['hotkey']}: {result}")
+                continue
+            previous = self.node_handshake_data.get(result['hotkey'])
+            if result.get('handshake_success', False):
+                successful += 1
+                self.node_handshake_data[result['hotkey']] = result
+            elif previous is None or previous.get('ip') != result['ip'] or previous.get('port') != result['port']:
+                self.node_handshake_data[result['hotkey']] = result
+            else:
+                # Keep the old key usable until the node answers again
+                self.node_handshake_data[result['hotkey']] = {**previous, 'last_attempt_time': result['last_attempt_time']}
+
+        self._rounds += 1
+        self.last_handshake_time = time.time()
+        logging.info(
+            f"Handshake round {self._rounds}: {successful}/{len(due)} due nodes succeeded "
+            f"in {self.last_handshake_time - start_time:.2f}s ({len(nodes_info)} nodes known)"
+        )
+        self._persist_keys()
+        return successful
+
+    def _server_address(self, ip: str, port: int) -> str:
+        address_ip = '0.0.0.1' if self.replace_with_localhost else ip
+        node = SimpleNamespace(ip=address_ip, port=port, protocol='http')
+        return client.construct_server_address(
+            node=node,
+            replace_with_docker_localhost=self.replace_with_docker_localhost,
+            replace_with_localhost=self.replace_with_localhost,
+        )
+
+    async def _handshake_node(self, node_info: Dict[str, Any]) -> Dict[str, Any]:
+        result = {
+            'uid': node_info['uid'],
+            'hotkey': node_info['hotkey'],
+            'ip': node_info['ip'],
+            'port': node_info['port'],
+            'symmetric_key': None,
+            'symmetric_key_uid': None,
+            'handshake_success': False,
+            'last_handshake_time': 0,
+            'last_attempt_time': time.time(),
+        }
+
+        start_time = time.perf_counter()
+        try:
+            symmetric_key, symmetric_key_uid = await handshake.perform_handshake(
+                self._client, self._server_address(node_info['ip'], node_info['port']), self.keypair,
+                node_info['hotkey']
+            )
+            latency = time.perf_counter() - start_time
+            self._success_latency.observe(latency)
+
+            result['symmetric_key'] = symmetric_key.decode() if isinstance(symmetric_key, bytes) else str(symmetric_key)
+            result['symmetric_key_uid'] = symmetric_key_uid
+            result['handshake_success'] = True
+            result['last_handshake_time'] = time.time()
+            result['handshake_latency'] = latency
+
+        except Exception as e:
+            self._failure_latency.observe(time.perf_counter() - start_time)
+            result['handshake_error'] = str(e)
+
+        return result
+
+    def _load_persisted_keys(self):
+        if not self.persist_path.exists():
+            return
+
+        try:
+            with open(self.persist_path, 'r', encoding='utf-8') as f:
+                persisted = json.load(f)
+        except Exception as e:
+            logging.error(f"Failed to load persisted handshake keys: {e}")
+            return
+
+        now = time.time()
+        loaded = 0
+        for hotkey, entry in persisted.items():
+            if now - entry.get('last_handshake_time', 0) >= self.key_max_age:
+                continue
+            if not entry.get('symmetric_key') or not entry.get('symmetric_key_uid'):
+                continue
+            self.node_handshake_data[hotkey] = {**entry, 'handshake_success': True}
+            loaded += 1
+
+        if loaded:
+            logging.info(f"Loaded {loaded} unexpired handshake keys from {self.persist_path}")
+
+    def _persist_keys(self):
+        persisted = {
+            hotkey: {field: data.get(field) for field in PERSISTED_FIELDS}
+            for hotkey, data in self.node_handshake_data.items()
+            if data.get('handshake_success', False)
+        }
+
+        try:
+            self.persist_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.persist_path.with_suffix(self.persist_path.suffix + '.tmp')
+            fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(persisted, f)
+            os.replace(tmp_path, self.persist_path)
+        except Exception as e:
+            logging.error(f"Failed to persist handshake keys: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        total_nodes = len(self.node_handshake_data)
+        successful_handshakes = sum(1 for data in list(self.node_handshake_data.values())
+                                    if data.get('handshake_success', False))
+        now = time.time()
+        key_ages = [now - data.get('last_handshake_time', 0) for data in list(self.node_handshake_data.values())
+                    if data.get('handshake_success', False)]
+
+        return {
+            'total_nodes': total_nodes,
+            'successful_handshakes': successful_handshakes,
+            'success_rate': successful_handshakes / total_nodes if total_nodes > 0 else 0.0,
+            'last_handshake_time': self.last_handshake_time,
+            'next_handshake_time': self.last_handshake_time + self.check_interval,
+            'cached_nodes_count': len(self.nodes_info),
+            'rounds': self._rounds,
+            'oldest_key_age': max(key_ages) if key_ages else 0.0,
+            'success_latency': self._success_latency.to_dict(),
+            'failure_latency': self._failure_latency.to_dict(),
+        }
@@ -0,0 +1,184 @@
+# -*- coding: utf-8 -*-
+
+import json
+import time
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from bittensor import logging
+
+MINER_LEASE_KEY_PREFIX = "miner_task:"
+MINER_LEASE_INDEX_KEY = "miner_task_leases"
+DEFAULT_LEASE_TTL = 1800
+
+# KEYS[1] = lease key, KEYS[2] = lease index hash
+# ARGV[1] = miner hotkey, ARGV[2] = lease value, ARGV[3] = ttl (s), ARGV[4] = now (ms)
+ACQUIRE_LEASE_SCRIPT = """
+if redis.call('SET', KEYS[1], ARGV[2], 'NX', 'EX', ARGV[3]) then
+    redis.call('HSET', KEYS[2], ARGV[1], tonumber(ARGV[4]) + tonumber(ARGV[3]) * 1000)
+    return 1
+end
+return 0
+"""
+
+# KEYS[1] = lease key, KEYS[2] = lease index hash
+# ARGV[1] = miner hotkey, ARGV[2] = task id
+RELEASE_LEASE_SCRIPT = """
+local value = redis.call('GET', KEYS[1])
+if not value then
+    redis.call('HDEL', KEYS[2], ARGV[1])
+    return 0
+end
+if cjson.decode(value)['task_id'] ~= ARGV[2] then
+    return 0
+end
+redis.call('DEL', KEYS[1])
+redis.call('HDEL', KEYS[2], ARGV[1])
+return 1
+"""
+
+# KEYS[1] = lease index hash
+# ARGV[1] = now (ms)
+COUNT_ACTIVE_LEASES_SCRIPT = """
+local entries = redis.call('HGETALL', KEYS[1])
+local now = tonumber(ARGV[1])
+local active = 0
+for i = 1, #entries, 2 do
+    if tonumber(entries[i + 1]) > now then
+        active = active + 1
+    else
+        redis.call('HDEL', KEYS[1], entries[i])
+    end
+end
+return active
+"""
+
+
+def _now_ms() -> int:
+    return int(time.time() * 1000)
+
+
+class MinerLeaseManager:
+    """Per-miner task leases in Redis; in-process leases only when no Redis is configured."""
+
+    def __init__(self, get_redis_client: Optional[Callable[[], Awaitable[Any]]], validator_hotkey: str,
+                 lease_ttl: int = DEFAULT_LEASE_TTL):
+        self._get_redis_client = get_redis_client
+        self.validator_hotkey = validator_hotkey
+        self.lease_ttl = lease_ttl
+        self._memory_leases: Dict[str, Tuple[str, float]] = {}
+        self._scripts_client = None
+        self._scripts: Dict[str, Any] = {}
+
+    @staticmethod
+    def lease_key(miner_hotkey: str) -> str:
+        return f"{MINER_LEASE_KEY_PREFIX}{miner_hotkey}"
+
+    def _lease_value(self, task_id: str) -> str:
+        return json.dumps({
+            'task_id': str(task_id),
+            'allocated_at': datetime.now().isoformat(),
+            'validator_hotkey': self.validator_hotkey
+        })
+
+    async def _get_scripts(self) -> Optional[Dict[str, Any]]:
+        if self._get_redis_client is None:
+            return None
+
+        # A configured Redis that cannot be reached must not fall back to leases other processes cannot see
+        redis_client = await self._get_redis_client()
+        if redis_client is None:
+            raise ConnectionError("Redis client not available")
+
+        if self._scripts_client is not redis_client:
+            self._scripts = {
+                'acquire': redis_client.register_script(ACQUIRE_LEASE_SCRIPT),
+                'release': redis_client.register_script(RELEASE_LEASE_SCRIPT),
+                'count': redis_client.register_script(COUNT_ACTIVE_LEASES_SCRIPT),
+            }
+            self._scripts_client = redis_client
+        return self._scripts
+
+    def _memory_get(self, miner_hotkey: str) -> Optional[str]:
+        lease = self._memory_leases.get(miner_hotkey)
+        if lease is None:
+            return None
+        task_id, expires_at = lease
+        if expires_at <= time.time():
+            del self._memory_leases[miner_hotkey]
+            return None
+        return task_id
+
+    def _memory_acquire(self, miner_hotkey: str, task_id: str) -> bool:
+        if self._memory_get(miner_hotkey) is not None:
+            return False
+        self._memory_leases[miner_hotkey] = (str(task_id), time.time() + self.lease_ttl)
+        return True
+
+    def _memory_release(self, miner_hotkey: str, task_id: str) -> bool:
+        if self._memory_get(miner_hotkey) != str(task_id):
+            return False
+        del self._memory_leases[miner_hotkey]
+        return True
+
+    async def acquire(self, miner_hotkey: str, task_id: str) -> bool:
+        try:
+            scripts = await self._get_scripts()
+            if scripts is None:
+                return self._memory_acquire(miner_hotkey, task_id)
+
+            acquired = await scripts['acquire'](
+                keys=[self.lease_key(miner_hotkey), MINER_LEASE_INDEX_KEY],
+                args=[miner_hotkey, self._lease_value(task_id), self.lease_ttl, _now_ms()]
+            )
+            return int(acquired) == 1
+
+        except Exception as e:
+            logging.error(f"Error acquiring miner lease in Redis: {e}")
+            return False
+
+    async def release(self, miner_hotkey: str, task_id: str) -> bool:
+        try:
+            scripts = await self._get_scripts()
+            if scripts is None:
+                return self._memory_release(miner_hotkey, task_id)
+
+            released = await scripts['release'](
+                keys=[self.lease_key(miner_hotkey), MINER_LEASE_INDEX_KEY],
+                args=[miner_hotkey, str(task_id)]
+            )
+            return int(released) == 1
+
+        except Exception as e:
+            logging.error(f"Error releasing miner lease in Redis: {e}")
+            return False
+
+    async def get_task(self, miner_hotkey: str) -> Optional[str]:
+        try:
+            if self._get_redis_client is None:
+                return self._memory_get(miner_hotkey)
+
+            redis_client = await self._get_redis_client()
+            if redis_client is None:
+                raise ConnectionError("Redis client not available")
+
+            value = await redis_client.get(self.lease_key(miner_hotkey))
+            if not value:
+                return None
+            return json.loads(value).get('task_id')
+
+        except Exception as e:
+            logging.error(f"Error getting miner lease from Redis: {e}")
+            return None
+
+    async def count_active(self) -> int:
+        try:
+            scripts = await self._get_scripts()
+            if scripts is None:
+                return sum(1 for hotkey in list(self._memory_leases) if self._memory_get(hotkey) is not None)
+
+            return int(await scripts['count'](keys=[MINER_LEASE_INDEX_KEY], args=[_now_ms()]))
+
+        except Exception as e:
+            logging.error(f"Error counting active miner leases: {e}")
+            return 0
@@ -1,45 +1,62 @@
 # -*- coding: utf-8 -*-
 
 import aiohttp
-import asyncio
 from typing import Dict, Any, Optional
 from fiber.logging_utils import get_logger
 
+from akihabara.validator.ttl_cache import (
+    AsyncTTLCache,
+    CacheEntry,
+    CacheResponse,
+    cache_response_from_http,
+    conditional_headers,
+)
+
 logger = get_logger(__name__)
 
+NODE_CACHE_TTL = 60
+NODE_STALE_TTL = 600
+NODE_NEGATIVE_TTL = 15
+NODES_KEY = 'nodes'
+
+
 class NodeClient:
 
-    def __init__(self, central_server_url: str, central_server_token: Optional[str] = None):
+    def __init__(self, central_server_url: str, central_server_token: Optional[str] = None,
+                 cache_ttl: float = NODE_CACHE_TTL, stale_ttl: float = NODE_STALE_TTL,
+                 negative_ttl: float = NODE_NEGATIVE_TTL):
         self.central_server_url = central_server_url
         self.central_server_token = central_server_token
-        self._nodes_cache: Optional[Dict[str, Any]] = None
-        self._last_cache_update: float = 0
-        self._cache_ttl: float = 60
+        self.session: Optional[aiohttp.ClientSession] = None
+        self._cache = AsyncTTLCache(ttl=cache_ttl, stale_ttl=stale_ttl, negative_ttl=negative_ttl, name="node")
+
+    async def ensure_session(self) -> aiohttp.ClientSession:
+        if self.session is None or self.session.closed:
+            self.session = aiohttp.ClientSession()
+        return self.session
+
+    async def close(self):
+        session, self.session = self.session, None
+        if session is not None:
+            await session.close()
+
+    async def _fetch_nodes(self, entry: Optional[CacheEntry]) -> CacheResponse:
+        headers = conditional_headers(entry)
+        if self.central_server_token:
+            headers['Authorization'] = f'Bearer {self.central_server_token}'
+
+        session = await self.ensure_session()
+        async with session.get(f"{self.central_server_url}/nodes", headers=headers) as response:
+            if response.status == 304:
+                return CacheResponse(not_modified=True)
+            if response.status != 200:
+                raise RuntimeError(f"HTTP {response.status}: Failed to get nodes")
+            data = await response.json()
+            return cache_response_from_http(response, data['nodes'])
     
     async def get_nodes(self) -> Dict[str, Any]:
         try:
-            if (self._nodes_cache is not None and
-                asyncio.get_event_loop().time() - self._last_cache_update < self._cache_ttl):
-                return self._nodes_cache
-            
-            headers = {}
-            if self.central_server_token:
-                headers['Authorization'] = f'Bearer {self.central_server_token}'
-            
-            async with aiohttp.ClientSession() as session:
-                async with session.get(
-                    f"{self.central_server_url}/nodes",
-                    headers=headers
-                ) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        nodes = data['nodes']
-                        self._nodes_cache = nodes
-                        self._last_cache_update = asyncio.get_event_loop().time()
-                        return nodes
-                    else:
-                        return {}
-                        
+            return await self._cache.get(NODES_KEY, self._fetch_nodes, default={})
         except Exception as e:
             logger.error(f"Error fetching nodes from central server: {e}")
             return {}
@@ -49,6 +66,8 @@ class NodeClient:
         return nodes.get(hotkey)
     
     def clear_cache(self):
-        self._nodes_cache = None
-        self._last_cache_update = 0
-        logger.info("Node cache cleared") 
\ No newline at end of file
+        self._cache.invalidate()
+        logger.info("Node cache cleared")
+
+    def get_cache_stats(self) -> Dict[str, Any]:
+        return self._cache.get_stats()
@@ -98,14 +98,16 @@ async def handle_nonstream_event(
     if content is not None:
         if isinstance(content, dict):
             content = json.dumps(content)
-        await config.redis_db.publish(
+        await config.publish_result(
             f"{rcst.JOB_RESULTS}:{job_id}",
             generic_utils.get_success_event(content=content, job_id=job_id, status_code=status_code),
+            final=True,
         )
     else:
-        await config.redis_db.publish(
+        await config.publish_result(
             f"{rcst.JOB_RESULTS}:{job_id}",
             generic_utils.get_error_event(job_id=job_id, error_message=error_message, status_code=status_code),
+            final=True,
         )
 
 async def query_nonstream(
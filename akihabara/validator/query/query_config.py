@@ -12,6 +12,8 @@ import os
 from akihabara.validator.node_client import NodeClient
 from akihabara.validator.contender_client import ContenderClient
 from akihabara.validator.reward_client import RewardClient
+from akihabara.validator.reward_sink import RewardSink
+from akihabara.validator.query.result_publisher import ResultPublisher
 
 logger = get_logger(__name__)
 
@@ -66,6 +68,8 @@ class Config:
     node_client: Optional[NodeClient] = None
     contender_client: Optional[ContenderClient] = None
     reward_client: Optional[RewardClient] = None
+    reward_sink: Optional[RewardSink] = None
+    result_publisher: Optional[ResultPublisher] = None
     
     def __post_init__(self):
 
@@ -129,6 +133,24 @@ class Config:
             return False
         
         return await self.reward_client.insert_reward_data(reward_data)
+
+    async def submit_reward_data(self, reward_data: Dict[str, Any]) -> bool:
+        if self.reward_sink is not None:
+            return self.reward_sink.submit(reward_data)
+
+        return await self.insert_reward_data(reward_data)
+    
+    async def publish_result(self, channel: str, message: str, final: bool = False):
+        if self.result_publisher is None:
+            await self.redis_db.publish(channel, message)
+        elif final:
+            await self.result_publisher.publish_final(channel, message)
+        else:
+            await self.result_publisher.publish(channel, message)
+
+    async def flush_results(self, channel: str):
+        if self.result_publisher is not None:
+            await self.result_publisher.flush(channel)
     
     async def get_reward_data_by_validator(
         self,
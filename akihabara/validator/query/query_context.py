@@ -0,0 +1,258 @@
+# -*- coding: utf-8 -*-
+
+import os
+from typing import Optional
+
+import httpx
+from fiber.chain import chain_utils
+from fiber.logging_utils import get_logger
+from redis.asyncio import ConnectionPool, Redis
+from substrateinterface import Keypair
+
+from akihabara.validator.contender_client import ContenderClient
+from akihabara.validator.node_client import NodeClient
+from akihabara.validator.query.query_config import Config
+from akihabara.validator.query.result_publisher import (
+    RESULT_PUBLISH_FLUSH_INTERVAL_MS,
+    RESULT_PUBLISH_MAX_BATCH_SIZE,
+    ResultPublisher,
+)
+from akihabara.validator.reward_client import RewardClient
+from akihabara.validator.reward_sink import (
+    REWARD_SINK_BATCH_SIZE,
+    REWARD_SINK_FLUSH_INTERVAL_MS,
+    REWARD_SINK_MAX_QUEUE_SIZE,
+    RewardSink,
+)
+
+logger = get_logger(__name__)
+
+QUERY_TIMEOUT = 30
+QUERY_MAX_CONNECTIONS = 500
+QUERY_MAX_KEEPALIVE_CONNECTIONS = 100
+QUERY_KEEPALIVE_EXPIRY = 30
+QUERY_REDIS_MAX_CONNECTIONS = 50
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def load_query_keypair() -> Keypair:
+    wallet_name = os.getenv("BT_WALLET_NAME", "default")
+    hotkey_name = os.getenv("BT_WALLET_HOTKEY", "default")
+    try:
+        return chain_utils.load_hotkey_keypair(wallet_name=wallet_name, hotkey_name=hotkey_name)
+    except (ValueError, FileNotFoundError) as e:
+        logger.info("Attempting to use WALLET_SECRET_SEED environment variable")
+        secret_seed = os.getenv("WALLET_SECRET_SEED", None)
+        if not secret_seed:
+            logger.error("WALLET_SECRET_SEED environment variable not set")
+            raise ValueError(
+                f"Could not load wallet from path and WALLET_SECRET_SEED env var is not set. Original error: {str(e)}")
+        try:
+            keypair = Keypair.create_from_seed(secret_seed)
+            logger.info("Loaded keypair from seed directly!")
+            return keypair
+        except Exception as e:
+            logger.error(f"Failed to load keypair from seed: {str(e)}")
+            raise ValueError(f"Invalid secret seed provided: {str(e)}")
+
+
+class QueryContext:
+
+    def __init__(
+        self,
+        ss58_address: str,
+        keypair: Optional[Keypair] = None,
+        netuid: int = 119,
+        redis_host: str = "localhost",
+        redis_port: int = 6379,
+        redis_password: Optional[str] = None,
+        redis_db: int = 0,
+        config_server_url: str = "http://config.akihabara.media:8000",
+        validator_token: Optional[str] = None,
+        replace_with_localhost: bool = False,
+        replace_with_docker_localhost: bool = False,
+        http2: Optional[bool] = None,
+        max_connections: int = QUERY_MAX_CONNECTIONS,
+        max_keepalive_connections: int = QUERY_MAX_KEEPALIVE_CONNECTIONS,
+        reward_sink_enabled: bool = True,
+        reward_sink_max_queue_size: int = REWARD_SINK_MAX_QUEUE_SIZE,
+        reward_sink_batch_size: int = REWARD_SINK_BATCH_SIZE,
+        reward_sink_flush_interval_ms: int = REWARD_SINK_FLUSH_INTERVAL_MS,
+        reward_sink_spill_path: Optional[str] = None,
+        result_publish_flush_interval_ms: int = RESULT_PUBLISH_FLUSH_INTERVAL_MS,
+        result_publish_max_batch_size: int = RESULT_PUBLISH_MAX_BATCH_SIZE,
+    ):
+        self.ss58_address = ss58_address
+        self.keypair = keypair
+        self.netuid = netuid
+        self.redis_host = redis_host
+        self.redis_port = redis_port
+        self.redis_password = redis_password
+        self.redis_db = redis_db
+        self.config_server_url = config_server_url
+        self.validator_token = validator_token
+        self.replace_with_localhost = replace_with_localhost
+        self.replace_with_docker_localhost = replace_with_docker_localhost
+        self.http2 = _http2_available() if http2 is None else http2 and _http2_available()
+        self.max_connections = max_connections
+        self.max_keepalive_connections = max_keepalive_connections
+        self.reward_sink_enabled = reward_sink_enabled
+        self.reward_sink_max_queue_size = reward_sink_max_queue_size
+        self.reward_sink_batch_size = reward_sink_batch_size
+        self.reward_sink_flush_interval_ms = reward_sink_flush_interval_ms
+        self.reward_sink_spill_path = reward_sink_spill_path
+        self.result_publish_flush_interval_ms = result_publish_flush_interval_ms
+        self.result_publish_max_batch_size = result_publish_max_batch_size
+
+        self.httpx_client: Optional[httpx.AsyncClient] = None
+        self.redis_db_instance: Optional[Redis] = None
+        self.node_client: Optional[NodeClient] = None
+        self.contender_client: Optional[ContenderClient] = None
+        self.reward_client: Optional[RewardClient] = None
+        self.reward_sink: Optional[RewardSink] = None
+        self.result_publisher: Optional[ResultPublisher] = None
+        self._config: Optional[Config] = None
+
+    @classmethod
+    def from_validator_config(cls, validator_config, ss58_address: str) -> 'QueryContext':
+        return cls(
+            ss58_address=ss58_address,
+            keypair=validator_config.keypair,
+            netuid=validator_config.netuid,
+            redis_host=validator_config.redis_host,
+            redis_port=validator_config.redis_port,
+            redis_password=validator_config.redis_password,
+            redis_db=validator_config.redis_db,
+            config_server_url=validator_config.config_server_url,
+            validator_token=validator_config.validator_token,
+            replace_with_localhost=validator_config.replace_with_localhost,
+            replace_with_docker_localhost=validator_config.replace_with_docker_localhost,
+            http2=validator_config.query_http2,
+            max_connections=validator_config.query_max_connections,
+            max_keepalive_connections=validator_config.query_max_keepalive_connections,
+            reward_sink_enabled=validator_config.reward_sink_enabled,
+            reward_sink_max_queue_size=validator_config.reward_sink_max_queue_size,
+            reward_sink_batch_size=validator_config.reward_sink_batch_size,
+            reward_sink_flush_interval_ms=validator_config.reward_sink_flush_interval_ms,
+            reward_sink_spill_path=validator_config.reward_sink_spill_path,
+            result_publish_flush_interval_ms=validator_config.result_publish_flush_interval_ms,
+            result_publish_max_batch_size=validator_config.result_publish_max_batch_size,
+        )
+
+    @classmethod
+    def from_env(cls, ss58_address: str) -> 'QueryContext':
+        return cls(
+            ss58_address=ss58_address,
+            netuid=int(os.getenv('NETUID', 119)),
+            redis_host=os.getenv('REDIS_HOST', 'localhost'),
+            redis_port=int(os.getenv('REDIS_PORT', 6379)),
+            redis_password=os.getenv('REDIS_PASSWORD'),
+            redis_db=int(os.getenv('REDIS_DB', 0)),
+            config_server_url=os.getenv('CONFIG_SERVER_URL', 'http://config.akihabara.media:8000'),
+            validator_token=os.getenv('VALIDATOR_TOKEN'),
+            replace_with_localhost=os.getenv('REPLACE_WITH_LOCALHOST', 'false').lower() == 'true',
+            replace_with_docker_localhost=os.getenv('REPLACE_WITH_DOCKER_LOCALHOST', 'false').lower() == 'true',
+        )
+
+    def _create_redis(self) -> Redis:
+        pool_config = {
+            "max_connections": QUERY_REDIS_MAX_CONNECTIONS,
+            "socket_keepalive": True,
+            "health_check_interval": 30,
+            "decode_responses": True,
+        }
+        if self.redis_password:
+            pool_config["password"] = self.redis_password
+
+        if "://" in self.redis_host:
+            pool = ConnectionPool.from_url(self.redis_host, **pool_config)
+        else:
+            pool = ConnectionPool(host=self.redis_host, port=self.redis_port, db=self.redis_db, **pool_config)
+        return Redis(connection_pool=pool)
+
+    def _create_httpx_client(self) -> httpx.AsyncClient:
+        limits = httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_keepalive_connections,
+            keepalive_expiry=QUERY_KEEPALIVE_EXPIRY,
+        )
+        return httpx.AsyncClient(timeout=QUERY_TIMEOUT, limits=limits, http2=self.http2)
+
+    def get_config(self) -> Config:
+        if self._config is not None:
+            return self._config
+
+        if self.keypair is None:
+            self.keypair = load_query_keypair()
+
+        self.httpx_client = self._create_httpx_client()
+        self.redis_db_instance = self._create_redis()
+        self.node_client = NodeClient(self.config_server_url, self.validator_token)
+        self.contender_client = ContenderClient(self.config_server_url, self.ss58_address, self.validator_token)
+        self.reward_client = RewardClient(self.config_server_url, self.ss58_address, self.validator_token)
+        if self.reward_sink_enabled:
+            self.reward_sink = RewardSink(
+                self.reward_client,
+                max_queue_size=self.reward_sink_max_queue_size,
+                batch_size=self.reward_sink_batch_size,
+                flush_interval_ms=self.reward_sink_flush_interval_ms,
+                spill_path=self.reward_sink_spill_path,
+            )
+        self.result_publisher = ResultPublisher(
+            self.redis_db_instance,
+            flush_interval_ms=self.result_publish_flush_interval_ms,
+            max_batch_size=self.result_publish_max_batch_size,
+        )
+
+        self._config = Config(
+            keypair=self.keypair,
+            redis_db=self.redis_db_instance,
+            ss58_address=self.ss58_address,
+            netuid=self.netuid,
+            httpx_client=self.httpx_client,
+            replace_with_localhost=self.replace_with_localhost,
+            replace_with_docker_localhost=self.replace_with_docker_localhost,
+            node_client=self.node_client,
+            contender_client=self.contender_client,
+            reward_client=self.reward_client,
+            reward_sink=self.reward_sink,
+            result_publisher=self.result_publisher,
+        )
+        logger.info(f"Query context initialized (http2={self.http2}, max_connections={self.max_connections})")
+        return self._config
+
+    async def close(self):
+        try:
+            if self.httpx_client is not None:
+                await self.httpx_client.aclose()
+            if self.result_publisher is not None:
+                await self.result_publisher.close()
+            if self.redis_db_instance is not None:
+                await self.redis_db_instance.close()
+                await self.redis_db_instance.connection_pool.disconnect()
+            if self.reward_sink is not None:
+                await self.reward_sink.close()
+            if self.node_client is not None:
+                await self.node_client.close()
+            if self.contender_client is not None:
+                await self.contender_client.close()
+            if self.reward_client is not None:
+                await self.reward_client.close()
+        except Exception as e:
+            logger.error(f"Error closing query context: {e}")
+        finally:
+            self.httpx_client = None
+            self.redis_db_instance = None
+            self.node_client = None
+            self.contender_client = None
+            self.reward_client = None
+            self.reward_sink = None
+            self.result_publisher = None
+            self._config = None
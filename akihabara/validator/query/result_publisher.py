@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+
+import asyncio
+from typing import Dict, List, Optional
+
+from fiber.logging_utils import get_logger
+from redis.asyncio import Redis
+
+logger = get_logger(__name__)
+
+RESULT_PUBLISH_FLUSH_INTERVAL_MS = 10
+RESULT_PUBLISH_MAX_BATCH_SIZE = 64
+
+
+class ResultPublisher:
+    """Coalesces job result events into pipelined PUBLISH calls, keeping per-channel order."""
+
+    def __init__(self, redis_db: Redis, flush_interval_ms: int = RESULT_PUBLISH_FLUSH_INTERVAL_MS,
+                 max_batch_size: int = RESULT_PUBLISH_MAX_BATCH_SIZE):
+        self.redis_db = redis_db
+        self.flush_interval = max(flush_interval_ms, 0) / 1000
+        self.max_batch_size = max(max_batch_size, 1)
+
+        self._pending: Dict[str, List[str]] = {}
+        self._pending_count = 0
+        self._lock: Optional[asyncio.Lock] = None
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._flush_task: Optional[asyncio.Task] = None
+        self.stats = {
+            'published': 0,
+            'pipelines': 0,
+            'requeued': 0,
+            'failed': 0,
+        }
+
+    async def publish(self, channel: str, message: str):
+        self._pending.setdefault(channel, []).append(message)
+        self._pending_count += 1
+
+        if self._pending_count >= self.max_batch_size or self.flush_interval == 0:
+            await self.flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.flush_interval, self._on_timer)
+
+    async def publish_final(self, channel: str, message: str):
+        """Publish the last event of a job and wait until everything queued for it has been sent."""
+        self._pending.setdefault(channel, []).append(message)
+        self._pending_count += 1
+        await self.flush(channel)
+
+    def _on_timer(self):
+        self._timer = None
+        if self._pending_count:
+            self._flush_task = asyncio.get_running_loop().create_task(self.flush())
+
+    async def flush(self, channel: Optional[str] = None):
+        """Send queued events; flushing one channel raises if they could not be sent."""
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+
+        # Batches are taken and sent under one lock, so earlier events for a channel always go out first
+        async with self._lock:
+            if channel is None:
+                batch, self._pending = self._pending, {}
+                self._pending_count = 0
+            else:
+                messages = self._pending.pop(channel, None)
+                batch = {channel: messages} if messages else {}
+                self._pending_count -= len(messages or ())
+
+            if not batch:
+                return
+
+            if not self._pending and self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+
+            count = sum(len(messages) for messages in batch.values())
+            try:
+                pipe = self.redis_db.pipeline(transaction=False)
+                for batch_channel, messages in batch.items():
+                    for message in messages:
+                        pipe.publish(batch_channel, message)
+                await pipe.execute()
+                self.stats['published'] += count
+                self.stats['pipelines'] += 1
+            except Exception as e:
+                if channel is not None:
+                    self.stats['failed'] += count
+                    logger.error(f"Failed to publish {count} job result events for {channel}: {e}")
+                    raise
+                # Put the batch back in order; the job's own final flush retries it and reports a failure
+                self.stats['requeued'] += count
+                logger.warning(f"Failed to publish {count} job result events, keeping them for the final flush: {e}")
+                self._requeue(batch)
+
+    def _requeue(self, batch: Dict[str, List[str]]):
+        for batch_channel, messages in batch.items():
+            self._pending[batch_channel] = messages + self._pending.get(batch_channel, [])
+            self._pending_count += len(messages)
+
+    async def close(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        await self.flush()
+
+    def get_stats(self) -> Dict[str, int]:
+        return {**self.stats, 'pending': self._pending_count}
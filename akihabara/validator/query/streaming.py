@@ -17,7 +17,7 @@ from akihabara.validator.models import Contender
 from akihabara.core import task_config as tcfg
 from akihabara.core.utils import generic_constants as gcst, generic_utils
 from akihabara.core.utils import redis_constants as rcst
-from akihabara.core.utils.query_utils import load_sse_jsons
+from akihabara.core.utils.sse import SSEFramer, get_chunk_content, inject_usage, loads_json
 
 
 logger = get_logger(__name__)
@@ -73,14 +73,15 @@ async def _handle_event(
     if content is not None:
         if isinstance(content, dict):
             content = json.dumps(content)
-        await config.redis_db.publish(
+        await config.publish_result(
             f"{rcst.JOB_RESULTS}:{job_id}",
             generic_utils.get_success_event(content=content, job_id=job_id, status_code=status_code),
         )
     else:
-        await config.redis_db.publish(
+        await config.publish_result(
             f"{rcst.JOB_RESULTS}:{job_id}",
             generic_utils.get_error_event(job_id=job_id, error_message=error_message, status_code=status_code),
+            final=True,
         )
 
 
@@ -118,6 +119,13 @@ def construct_400_query_result(node: Node, task: str) -> utility_models.QueryRes
     return query_result
 
 
+async def _frame_events(generator: AsyncGenerator, framer: SSEFramer):
+    async for chunk in generator:
+        if isinstance(chunk, (bytes, bytearray, str)):
+            yield framer.feed(chunk)
+    yield framer.close()
+
+
 async def consume_generator(
     config: Config,
     generator: AsyncGenerator,
@@ -134,13 +142,16 @@ async def consume_generator(
     assert job_id
     task = contender.task
     query_result = None
-    tokens = 0
 
-    text_jsons, status_code, first_message = [], 200, True  # TODO: remove unused variable
+    status_code, first_message = 200, True
+    first_json = None
+    completion = "comp" in task
+    framer = SSEFramer()
 
     stream_time_init = None
     try:
         out_tokens_counter = 0
+        out_characters_counter = 0
 
         if payload.get('prompt') is not None:
             num_input_tokens = int(len(payload['prompt']) // CHARACTER_TO_TOKEN_CONVERSION)
@@ -149,63 +160,45 @@ async def consume_generator(
         else:
             logger.error(f"Can't count input tokens in payload for task: {task}; payload: {payload}")
             num_input_tokens = 0
-        
-        async for text in generator:
-            if isinstance(text, bytes):
-                text = text.decode()
 
-            if isinstance(text, str):
+        async for events in _frame_events(generator, framer):
+            for event in events:
                 try:
-                    loaded_jsons = load_sse_jsons(text)
-                    if isinstance(loaded_jsons, dict):
-                        status_code = loaded_jsons.get(gcst.STATUS_CODE)  # noqa
-                        break
-
-                except (IndexError, json.JSONDecodeError) as e:
-                    logger.warning(f"Error {e} when trying to load text: {text}")
+                    text_json = loads_json(event)
+                except ValueError as e:
+                    logger.warning(f"Error {e} when trying to load event: {event[:100]!r}")
+                    continue
+
+                content = get_chunk_content(text_json, completion)
+                if content is None:
+                    logger.debug(f"Invalid text_json because there's no content: {text_json}")
+                    first_message = True
                     break
 
-                for text_json in loaded_jsons:
-                    if not isinstance(text_json, dict):
-                        logger.debug(f"Invalid text_json because its not a dict?: {text_json}")
-                        first_message = True
-                        break
-
-                    try:
-                        if "comp" in task:
-                            _ = text_json["choices"][0]["text"]
-                        else:
-                            _ = text_json["choices"][0]["delta"]["content"]
-                    except KeyError:
-                        logger.debug(f"Invalid text_json because there's not delta content: {text_json}")
-                        first_message = True
-                        break
-                    
-                    out_tokens_counter += 1
-                    text_json["usage"] = {
-                        "prompt_tokens": num_input_tokens,
-                        "completion_tokens": out_tokens_counter,
-                        "total_tokens": num_input_tokens + out_tokens_counter,
-                    }
-
-                    text_jsons.append(text_json)
-                    dumped_payload = json.dumps(text_json)
-                    first_message = False
-
-                    if synthetic_query:
-                        await _handle_event(
-                            config, dumped_payload, synthetic_query, job_id, status_code=status_code
-                        )
-                    else:
-                        await _handle_event(
-                            config, dumped_payload, synthetic_query, job_id, status_code=status_code
-                        )
-
-                    if stream_time_init is None:
-                        stream_time_init = time.time()
+                out_tokens_counter += 1
+                out_characters_counter += len(content)
+                if first_json is None:
+                    first_json = text_json
+                first_message = False
+
+                # Synthetic queries have no subscriber, so their chunks are never re-serialized
+                if not synthetic_query:
+                    await _handle_event(
+                        config,
+                        inject_usage(event, num_input_tokens, out_tokens_counter).decode(),
+                        synthetic_query,
+                        job_id,
+                        status_code=status_code
+                    )
+
+                if stream_time_init is None:
+                    stream_time_init = time.time()
+
+                if "finish_reason" in text_json["choices"][0]:
+                    break
 
-                    if "finish_reason" in text_json["choices"][0]:
-                        break
+            if framer.done:
+                break
 
         response_time = time.time() - start_time
         if stream_time_init is not None:
@@ -214,7 +207,7 @@ async def consume_generator(
             stream_time = response_time
 
         query_result = utility_models.QueryResult(
-            formatted_response=text_jsons if len(text_jsons) > 0 else None,
+            formatted_response=[first_json] if first_json is not None else None,
             node_id=node.node_id,
             response_time=response_time,
             stream_time=stream_time,
@@ -222,20 +215,31 @@ async def consume_generator(
             success=not first_message,
             node_hotkey=node.hotkey,
             status_code=200,
+            completion_tokens=out_tokens_counter,
+            completion_characters=out_characters_counter,
         )
         success = not first_message
         if success:
             if synthetic_query:
                 GAUGE_SYNTHETIC_INPUT_TOKENS.set(num_input_tokens, {"task": task})
-                GAUGE_SYNTHETIC_TOKENS.set(tokens, {"task": task})
-                GAUGE_SYNTHETIC_TOKENS_PER_SEC.set(tokens / response_time, {"task": task})
+                GAUGE_SYNTHETIC_TOKENS.set(out_tokens_counter, {"task": task})
+                GAUGE_SYNTHETIC_TOKENS_PER_SEC.set(out_tokens_counter / response_time, {"task": task})
             else:
-                GAUGE_ORGANIC_TOKENS.set(tokens, {"task": task})
-                GAUGE_ORGANIC_TOKENS_PER_SEC.set(tokens / response_time, {"task": task})
+                GAUGE_ORGANIC_TOKENS.set(out_tokens_counter, {"task": task})
+                GAUGE_ORGANIC_TOKENS_PER_SEC.set(out_tokens_counter / response_time, {"task": task})
     except Exception as e:
         query_result = construct_500_query_result(node, task)
         success = False
     finally:
+        if not synthetic_query:
+            # End of stream: push out any coalesced token events before scoring; tokens the subscriber
+            # never got make this a failed query
+            try:
+                await config.flush_results(f"{rcst.JOB_RESULTS}:{job_id}")
+            except Exception as e:
+                logger.error(f"Failed to publish results for job {job_id}: {e}")
+                query_result = construct_500_query_result(node, task)
+                success = False
         if query_result is not None:
             await utils.adjust_contender_from_result(config, query_result, contender, synthetic_query, 
                                                      payload=payload, sus_task=sus_task, speed_data=speed_data, task_config=task_config)
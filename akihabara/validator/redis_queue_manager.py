@@ -8,13 +8,19 @@ from typing import List, Dict, Any, Optional
 from datetime import datetime
 import threading
 import hashlib
+import socket
+import time
+from collections import deque
 
 import redis.asyncio as redis
 from redis.asyncio import BlockingConnectionPool
+from redis.exceptions import NoScriptError, ResponseError
 from redis.retry import Retry
 from redis.backoff import ExponentialBackoff
 
+from akihabara.validator.async_supervisor import SUPERVISOR_DRAIN_TIMEOUT
 from akihabara.validator.task_client import CognifyTaskClient
+from akihabara.validator.task_status_reporter import TaskStatusReporter
 from akihabara.validator.contender_allocator import ContenderAllocator
 from akihabara.validator.contender_client import ContenderClient
 from akihabara.validator.task_config_client import TaskConfigClient
@@ -22,7 +28,82 @@ from akihabara.core.validator_config import ValidatorConfig
 
 QUERY_QUEUE_KEY = "COGNIFY_QUERY_QUEUE"
 TASK_ID_SET_KEY = "COGNIFY_QUERY_TASK_IDS"
-MAX_CONCURRENT_TASKS = 1
+QUERY_STREAM_KEY = "COGNIFY_QUERY_STREAM"
+STREAM_TASK_ID_SET_KEY = "COGNIFY_QUERY_STREAM_TASK_IDS"
+QUEUE_BACKEND_LIST = "list"
+QUEUE_BACKEND_STREAM = "stream"
+STREAM_GROUP = "cognify-validators"
+STREAM_READ_COUNT = 32
+STREAM_RECLAIM_IDLE_MS = 300000
+STREAM_RECLAIM_INTERVAL = 30.0
+STREAM_RECLAIM_MAX_PAGES = 10
+QUEUE_SCRIPT_CHUNK_SIZE = 500
+
+# ARGV holds (task_id, task_json) pairs; an empty task_id skips deduplication
+ADD_TASKS_SCRIPT = """
+local added = 0
+for i = 1, #ARGV, 2 do
+    if ARGV[i] == '' or redis.call('SADD', KEYS[1], ARGV[i]) == 1 then
+        redis.call('RPUSH', KEYS[2], ARGV[i + 1])
+        added = added + 1
+    end
+end
+return added
+"""
+
+ADD_STREAM_TASKS_SCRIPT = """
+local added = 0
+for i = 1, #ARGV, 2 do
+    if ARGV[i] == '' then
+        redis.call('XADD', KEYS[2], '*', 'task', ARGV[i + 1])
+        added = added + 1
+    elseif redis.call('SADD', KEYS[1], ARGV[i]) == 1 then
+        redis.call('XADD', KEYS[2], '*', 'task_id', ARGV[i], 'task', ARGV[i + 1])
+        added = added + 1
+    end
+end
+return added
+"""
+MAX_CONCURRENT_TASKS = 64
+MAX_PENDING_TASKS = 32
+REFILL_LOW_WATERMARK = 20
+REFILL_BATCH_SIZE = 40
+REFILL_CHECK_INTERVAL = 1.0
+REFILL_IDLE_BACKOFF_MIN = 5.0
+REFILL_IDLE_BACKOFF_MAX = 90.0
+# Share of the supervisor's drain window spent waiting on in-flight tasks; the rest is left for
+# returning cancelled tasks and flushing the allocator and status reporter
+QUEUE_DRAIN_SHARE = 0.5
+
+TASK_CATEGORY_CHAT = "chat"
+TASK_CATEGORY_TEXT_TO_IMAGE = "text-to-image"
+TASK_CATEGORY_IMAGE_TO_IMAGE = "image-to-image"
+TASK_CATEGORY_AVATAR = "avatar"
+TASK_CATEGORY_OTHER = "other"
+
+DEFAULT_TASK_CATEGORY_LIMITS = {
+    TASK_CATEGORY_CHAT: 32,
+    TASK_CATEGORY_TEXT_TO_IMAGE: 8,
+    TASK_CATEGORY_IMAGE_TO_IMAGE: 8,
+    TASK_CATEGORY_AVATAR: 4,
+    TASK_CATEGORY_OTHER: 4,
+}
+
+
+def get_task_category(task_type: Optional[str]) -> str:
+    if not task_type:
+        return TASK_CATEGORY_OTHER
+    task_type = task_type.lower()
+    if task_type.startswith("chat"):
+        return TASK_CATEGORY_CHAT
+    if "text-to-image" in task_type or "text_to_image" in task_type:
+        return TASK_CATEGORY_TEXT_TO_IMAGE
+    if "image-to-image" in task_type or "image_to_image" in task_type:
+        return TASK_CATEGORY_IMAGE_TO_IMAGE
+    if "avatar" in task_type:
+        return TASK_CATEGORY_AVATAR
+    return TASK_CATEGORY_OTHER
+
 
 class RedisQueueManager:
 
@@ -34,6 +115,12 @@ class RedisQueueManager:
         self.running = False
         self._loop = None
         self._thread_local = threading.local()
+        self._script_shas = {
+            script: hashlib.sha1(script.encode()).hexdigest()
+            for script in (ADD_TASKS_SCRIPT, ADD_STREAM_TASKS_SCRIPT)
+        }
+        self._queue_length = 0
+        self._queue_length_at = 0.0
         
     def _get_current_loop(self):
         try:
@@ -86,14 +173,9 @@ class RedisQueueManager:
         try:
             thread_redis_db, thread_loop = self._get_thread_redis_connection()
             
-            if not thread_redis_db:
+            # Dropped connections are handled by the pool's health checks and retries, so no PING per call
+            if not thread_redis_db or thread_loop is not self._get_current_loop():
                 await self.connect()
-            else:
-                try:
-                    await thread_redis_db.ping()
-                except Exception:
-                    logging.warning(f"Redis connection lost in thread {threading.current_thread().name}, reconnecting...")
-                    await self.connect()
         except Exception as e:
             logging.error(f"Failed to ensure Redis connection: {e}")
             raise
@@ -122,67 +204,112 @@ class RedisQueueManager:
                 **pool_config
             )
     
-    async def add_task_to_queue(self, task: Dict[str, Any]) -> bool:
+    async def _eval_script(self, redis_db, script: str, keys: List[str], args: List[Any]):
+        sha = self._script_shas[script]
         try:
-            await self._ensure_connection()
-            
-            thread_redis_db, _ = self._get_thread_redis_connection()
-            
+            return await redis_db.evalsha(sha, len(keys), *keys, *args)
+        except NoScriptError:
+            await redis_db.script_load(script)
+            return await redis_db.evalsha(sha, len(keys), *keys, *args)
+
+    def _task_script_args(self, tasks: List[Dict[str, Any]]) -> List[str]:
+        args = []
+        for task in tasks:
             task_json = json.dumps(task, ensure_ascii=False)
-            task_id = self._extract_task_id(task, task_json)
-
-            lua_script = """
-            local added = redis.call('SADD', KEYS[1], ARGV[1])
-            if added == 1 then
-                return redis.call('RPUSH', KEYS[2], ARGV[2])
-            else
-                return 0
-            end
-            """
-            result = await thread_redis_db.eval(lua_script, 2, TASK_ID_SET_KEY, QUERY_QUEUE_KEY, task_id, task_json)
-            if isinstance(result, (int,)) and result == 0:
-                # logging.info(f"Duplicate task ignored (task_id={task_id})")
-                return False
-            
-            return True
+            args.append(self._extract_task_id(task, task_json) or "")
+            args.append(task_json)
+        return args
+
+    async def _add_tasks_with_script(self, script: str, keys: List[str], tasks: List[Dict[str, Any]]) -> int:
+        await self._ensure_connection()
+
+        thread_redis_db, _ = self._get_thread_redis_connection()
 
+        added = 0
+        for i in range(0, len(tasks), QUEUE_SCRIPT_CHUNK_SIZE):
+            chunk = tasks[i:i + QUEUE_SCRIPT_CHUNK_SIZE]
+            added += await self._eval_script(thread_redis_db, script, keys, self._task_script_args(chunk))
+        return added
+
+    async def add_tasks(self, tasks: List[Dict[str, Any]]) -> int:
+        if not tasks:
+            return 0
+        try:
+            return await self._add_tasks_with_script(ADD_TASKS_SCRIPT, [TASK_ID_SET_KEY, QUERY_QUEUE_KEY], tasks)
         except Exception as e:
-            logging.error(f"Failed to add task to queue: {e}")
-            return False
-    
-    async def get_task_from_queue(self, timeout: int = 1) -> Optional[Dict[str, Any]]:
+            logging.error(f"Failed to add {len(tasks)} tasks to queue: {e}")
+            return 0
 
+    async def add_task_to_queue(self, task: Dict[str, Any]) -> bool:
+        return await self.add_tasks([task]) == 1
+
+    def _decode_tasks(self, items) -> List[Dict[str, Any]]:
+        tasks = []
+        for task_json in items or ():
+            try:
+                tasks.append(json.loads(task_json))
+            except Exception as e:
+                logging.error(f"Dropping malformed queue entry: {e}")
+        return tasks
+
+    def _set_queue_length(self, length: int):
+        self._queue_length = length
+        self._queue_length_at = time.monotonic()
+
+    async def pop_tasks(self, count: int = 1, timeout: int = 1) -> List[Dict[str, Any]]:
+        if count <= 0:
+            return []
         try:
             await self._ensure_connection()
-            
+
             thread_redis_db, _ = self._get_thread_redis_connection()
 
-            result = await thread_redis_db.blpop(QUERY_QUEUE_KEY, timeout=timeout)
-            
-            if result:
-                task_json = result[1]
-                task = json.loads(task_json)
-                task_id = self._extract_task_id(task, task_json)
-                if task_id:
-                    try:
-                        await thread_redis_db.srem(TASK_ID_SET_KEY, task_id)
-                    except Exception:
-                        pass
-                return task
-            else:
-                return None
-                
+            async with thread_redis_db.pipeline(transaction=True) as pipe:
+                pipe.lpop(QUERY_QUEUE_KEY, count)
+                pipe.llen(QUERY_QUEUE_KEY)
+                items, length = await pipe.execute()
+            self._set_queue_length(length)
+
+            if not items and timeout:
+                result = await thread_redis_db.blpop(QUERY_QUEUE_KEY, timeout=timeout)
+                items = [result[1]] if result else []
+
+            tasks = self._decode_tasks(items)
+            task_ids = [task_id for task_id in map(self._extract_task_id, tasks) if task_id]
+            if task_ids:
+                try:
+                    await thread_redis_db.srem(TASK_ID_SET_KEY, *task_ids)
+                except Exception:
+                    pass
+            return tasks
+
         except Exception as e:
-            logging.error(f"Failed to get task from queue: {e}")
-            return None
-    
-    async def get_queue_length(self) -> int:
+            logging.error(f"Failed to pop tasks from queue: {e}")
+            return []
+
+    async def get_task_from_queue(self, timeout: int = 1) -> Optional[Dict[str, Any]]:
+        tasks = await self.pop_tasks(1, timeout=timeout)
+        return tasks[0] if tasks else None
+
+    async def get_tasks_from_queue(self, count: int = 1, timeout: int = 1) -> List[Dict[str, Any]]:
+        return await self.pop_tasks(count, timeout=timeout)
+
+    async def ack_task(self, task: Dict[str, Any]) -> bool:
+        return True
+
+    async def return_tasks(self, tasks: List[Dict[str, Any]]) -> int:
+        return await self.add_tasks(tasks)
+
+    async def get_queue_length(self, max_age: float = 0) -> int:
+        if max_age and time.monotonic() - self._queue_length_at < max_age:
+            return self._queue_length
         try:
             await self._ensure_connection()
             
             thread_redis_db, _ = self._get_thread_redis_connection()
             
             length = await thread_redis_db.llen(QUERY_QUEUE_KEY)
+            self._set_queue_length(length)
             return length
             
         except Exception as e:
@@ -217,25 +344,354 @@ class RedisQueueManager:
             logging.error(f"Error closing Redis connection: {e}")
 
 
+class RedisStreamQueueManager(RedisQueueManager):
+    """Task queue on a Redis stream consumer group: tasks stay pending until acked and stuck ones are reclaimed."""
+
+    def __init__(self, redis_host: str = "localhost", redis_port: int = 6379, redis_password: str = None,
+                 group: str = STREAM_GROUP, consumer: Optional[str] = None, read_count: int = STREAM_READ_COUNT,
+                 reclaim_idle_ms: int = STREAM_RECLAIM_IDLE_MS, reclaim_interval: float = STREAM_RECLAIM_INTERVAL):
+        super().__init__(redis_host, redis_port, redis_password)
+        self.group = group
+        self.consumer = consumer or f"{socket.gethostname()}-{os.getpid()}"
+        self.read_count = max(read_count, 1)
+        self.reclaim_idle_ms = reclaim_idle_ms
+        self.reclaim_interval = reclaim_interval
+
+        self._entry_ids: Dict[str, str] = {}
+        self._group_ready = False
+        self._last_reclaim = 0.0
+        # XAUTOCLAIM cursor, kept between passes so entries behind our own in-flight ones are reached too
+        self._reclaim_cursor = "0-0"
+        self.stats = {
+            'added': 0,
+            'duplicates': 0,
+            'read': 0,
+            'reclaimed': 0,
+            'acked': 0,
+            'returned': 0,
+            'read_calls': 0,
+        }
+
+    async def connect(self):
+        await super().connect()
+        self._group_ready = False
+        await self._ensure_group()
+
+    async def _ensure_group(self):
+        if self._group_ready:
+            return
+        thread_redis_db, _ = self._get_thread_redis_connection()
+        try:
+            await thread_redis_db.xgroup_create(QUERY_STREAM_KEY, self.group, id="0", mkstream=True)
+            logging.info(f"Created consumer group {self.group} on {QUERY_STREAM_KEY}")
+        except ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+        self._group_ready = True
+
+    async def add_tasks(self, tasks: List[Dict[str, Any]]) -> int:
+        if not tasks:
+            return 0
+        try:
+            await self._ensure_connection()
+            await self._ensure_group()
+
+            # The id stays in the dedup set until the task is acked, so a task in flight cannot be queued twice
+            added = await self._add_tasks_with_script(
+                ADD_STREAM_TASKS_SCRIPT, [STREAM_TASK_ID_SET_KEY, QUERY_STREAM_KEY], tasks
+            )
+            self.stats['added'] += added
+            self.stats['duplicates'] += len(tasks) - added
+            return added
+
+        except Exception as e:
+            logging.error(f"Failed to add {len(tasks)} tasks to stream: {e}")
+            return 0
+
+    def _decode(self, value) -> str:
+        return value.decode() if isinstance(value, bytes) else value
+
+    def _parse_entries(self, entries, settled: List[str]) -> List[Dict[str, Any]]:
+        tasks = []
+        for entry_id, fields in entries or ():
+            entry_id = self._decode(entry_id)
+            if not fields:
+                continue
+            fields = {self._decode(key): value for key, value in fields.items()}
+            try:
+                task = json.loads(fields['task'])
+            except Exception as e:
+                logging.error(f"Dropping malformed stream entry {entry_id}: {e}")
+                settled.append(entry_id)
+                continue
+            task_id = self._extract_task_id(task)
+            if task_id:
+                self._entry_ids[task_id] = entry_id
+            else:
+                # Without a task id there is nothing to ack by later, so these keep at-most-once delivery
+                settled.append(entry_id)
+            tasks.append(task)
+        return tasks
+
+    async def _reclaim_stuck_tasks(self, thread_redis_db, settled: List[str]) -> List[Dict[str, Any]]:
+        now = time.monotonic()
+        if now - self._last_reclaim < self.reclaim_interval:
+            return []
+        self._last_reclaim = now
+
+        # Entries this consumer is still working on are idle too; they are not handed out a second time
+        in_flight = set(self._entry_ids.values())
+        claimed = []
+        for _ in range(STREAM_RECLAIM_MAX_PAGES):
+            try:
+                response = await thread_redis_db.xautoclaim(
+                    QUERY_STREAM_KEY, self.group, self.consumer,
+                    min_idle_time=self.reclaim_idle_ms, start_id=self._reclaim_cursor, count=self.read_count
+                )
+            except Exception as e:
+                logging.error(f"Failed to reclaim stuck stream tasks: {e}")
+                break
+
+            self._reclaim_cursor = self._decode(response[0])
+            claimed.extend(
+                entry for entry in (response[1] if len(response) > 1 else ()) if self._decode(entry[0]) not in in_flight
+            )
+            settled.extend(self._decode(entry_id) for entry_id in (response[2] if len(response) > 2 else ()))
+            if self._reclaim_cursor == "0-0" or len(claimed) >= self.read_count:
+                break
+
+        tasks = self._parse_entries(claimed, settled)
+        if tasks:
+            self.stats['reclaimed'] += len(tasks)
+            logging.info(f"Reclaimed {len(tasks)} stuck tasks from idle consumers")
+        return tasks
+
+    async def get_tasks_from_queue(self, count: int = 1, timeout: int = 1) -> List[Dict[str, Any]]:
+        try:
+            await self._ensure_connection()
+            await self._ensure_group()
+
+            thread_redis_db, _ = self._get_thread_redis_connection()
+
+            settled: List[str] = []
+            tasks = await self._reclaim_stuck_tasks(thread_redis_db, settled)
+            if len(tasks) < count:
+                self.stats['read_calls'] += 1
+                response = await thread_redis_db.xreadgroup(
+                    self.group, self.consumer, {QUERY_STREAM_KEY: ">"},
+                    count=count - len(tasks), block=int(timeout * 1000) if not tasks else None
+                )
+                for _, entries in response or ():
+                    read = self._parse_entries(entries, settled)
+                    self.stats['read'] += len(read)
+                    tasks.extend(read)
+
+            if settled:
+                async with thread_redis_db.pipeline(transaction=True) as pipe:
+                    pipe.xack(QUERY_STREAM_KEY, self.group, *settled)
+                    pipe.xdel(QUERY_STREAM_KEY, *settled)
+                    await pipe.execute()
+
+            return tasks
+
+        except Exception as e:
+            logging.error(f"Failed to read tasks from stream: {e}")
+            return []
+
+    async def get_task_from_queue(self, timeout: int = 1) -> Optional[Dict[str, Any]]:
+        tasks = await self.get_tasks_from_queue(count=1, timeout=timeout)
+        return tasks[0] if tasks else None
+
+    async def ack_task(self, task: Dict[str, Any]) -> bool:
+        task_id = self._extract_task_id(task)
+        entry_id = self._entry_ids.pop(task_id, None) if task_id else None
+        if entry_id is None:
+            return False
+
+        try:
+            await self._ensure_connection()
+            thread_redis_db, _ = self._get_thread_redis_connection()
+
+            async with thread_redis_db.pipeline(transaction=True) as pipe:
+                pipe.xack(QUERY_STREAM_KEY, self.group, entry_id)
+                pipe.xdel(QUERY_STREAM_KEY, entry_id)
+                pipe.srem(STREAM_TASK_ID_SET_KEY, task_id)
+                await pipe.execute()
+            self.stats['acked'] += 1
+            return True
+
+        except Exception as e:
+            logging.error(f"Failed to ack stream task {task_id}: {e}")
+            return False
+
+    async def return_tasks(self, tasks: List[Dict[str, Any]]) -> int:
+        """Puts read but undispatched tasks back at the tail of the stream for any consumer to pick up."""
+        if not tasks:
+            return 0
+
+        try:
+            await self._ensure_connection()
+            thread_redis_db, _ = self._get_thread_redis_connection()
+
+            async with thread_redis_db.pipeline(transaction=True) as pipe:
+                for task in tasks:
+                    task_id = self._extract_task_id(task)
+                    entry_id = self._entry_ids.pop(task_id, None) if task_id else None
+                    fields = {'task': json.dumps(task, ensure_ascii=False)}
+                    if task_id:
+                        fields['task_id'] = task_id
+                    pipe.xadd(QUERY_STREAM_KEY, fields)
+                    if entry_id is not None:
+                        pipe.xack(QUERY_STREAM_KEY, self.group, entry_id)
+                        pipe.xdel(QUERY_STREAM_KEY, entry_id)
+                await pipe.execute()
+            self.stats['returned'] += len(tasks)
+            return len(tasks)
+
+        except Exception as e:
+            logging.error(f"Failed to return {len(tasks)} tasks to stream: {e}")
+            return 0
+
+    async def get_queue_length(self, max_age: float = 0) -> int:
+        if max_age and time.monotonic() - self._queue_length_at < max_age:
+            return self._queue_length
+        try:
+            await self._ensure_connection()
+            await self._ensure_group()
+
+            thread_redis_db, _ = self._get_thread_redis_connection()
+
+            # Acked entries are deleted, so undelivered = stream length - entries pending in the group
+            async with thread_redis_db.pipeline(transaction=False) as pipe:
+                pipe.xlen(QUERY_STREAM_KEY)
+                pipe.xpending(QUERY_STREAM_KEY, self.group)
+                length, pending = await pipe.execute()
+            self._set_queue_length(max(length - (pending or {}).get('pending', 0), 0))
+            return self._queue_length
+
+        except Exception as e:
+            logging.error(f"Failed to get stream queue length: {e}")
+            return 0
+
+    async def clear_queue(self) -> bool:
+        try:
+            await self._ensure_connection()
+
+            thread_redis_db, _ = self._get_thread_redis_connection()
+
+            await thread_redis_db.delete(QUERY_STREAM_KEY, STREAM_TASK_ID_SET_KEY)
+            self._entry_ids.clear()
+            self._group_ready = False
+            return True
+
+        except Exception as e:
+            logging.error(f"Failed to clear stream queue: {e}")
+            return False
+
+    async def get_stream_stats(self) -> Dict[str, Any]:
+        stats = {
+            'consumer': self.consumer,
+            'group': self.group,
+            'in_flight': len(self._entry_ids),
+            **self.stats,
+        }
+        try:
+            await self._ensure_connection()
+            thread_redis_db, _ = self._get_thread_redis_connection()
+            consumers = await thread_redis_db.xinfo_consumers(QUERY_STREAM_KEY, self.group)
+            stats['consumers'] = {
+                self._decode(consumer['name']): {
+                    'pending': consumer.get('pending', 0),
+                    'idle_ms': consumer.get('idle', 0),
+                }
+                for consumer in consumers
+            }
+        except Exception as e:
+            logging.error(f"Failed to read stream consumer info: {e}")
+        return stats
+
+
+def create_queue_manager(redis_host: str, redis_port: int, redis_password: str = None,
+                         validator_config: ValidatorConfig = None) -> RedisQueueManager:
+    if validator_config is None or validator_config.queue_backend != QUEUE_BACKEND_STREAM:
+        return RedisQueueManager(redis_host, redis_port, redis_password)
+
+    return RedisStreamQueueManager(
+        redis_host,
+        redis_port,
+        redis_password,
+        group=validator_config.queue_stream_group,
+        consumer=validator_config.queue_stream_consumer,
+        read_count=validator_config.queue_stream_read_count,
+        reclaim_idle_ms=validator_config.queue_stream_reclaim_idle_ms,
+    )
+
+
 class CognifyQueueProcessor:
 
     def __init__(self, queue_manager: RedisQueueManager, task_client: CognifyTaskClient, contender_client: ContenderClient,
                  task_config_client=None, node_handshake_data: Dict[str, Dict[str, Any], ] = None,
-                 validator_config: ValidatorConfig = None):
+                 validator_config: ValidatorConfig = None, query_context=None):
         self.queue_manager = queue_manager
         self.task_client = task_client
+        if validator_config is not None:
+            self.status_reporter = TaskStatusReporter(
+                task_client,
+                flush_interval_ms=validator_config.task_report_flush_interval_ms,
+                max_batch_size=validator_config.task_report_max_batch_size,
+                journal_path=validator_config.task_report_journal_path,
+                enabled=validator_config.task_report_batching
+            )
+        else:
+            self.status_reporter = TaskStatusReporter(task_client)
         self.node_handshake_data = node_handshake_data or {}
+        fan_out_kwargs = {}
+        if validator_config is not None:
+            fan_out_kwargs = {
+                'fan_out': validator_config.contender_fan_out,
+                'fan_out_concurrency': validator_config.contender_fan_out_concurrency,
+                'required_successes': validator_config.contender_required_successes,
+            }
         self.contender_allocator = ContenderAllocator(
             contender_client,
             task_config_client,
             redis_host=queue_manager.redis_host,
             redis_port=queue_manager.redis_port,
             redis_password=queue_manager.redis_password,
-            node_handshake_data=self.node_handshake_data
+            node_handshake_data=self.node_handshake_data,
+            query_context=query_context,
+            **fan_out_kwargs
         )
         self.running = False
         self.tasks: set[asyncio.Task] = set()
         self.validator_config = validator_config
+
+        self.max_concurrent_tasks = MAX_CONCURRENT_TASKS
+        self.max_pending_tasks = MAX_PENDING_TASKS
+        self.refill_low_watermark = REFILL_LOW_WATERMARK
+        self.refill_batch_size = REFILL_BATCH_SIZE
+        self.drain_timeout = SUPERVISOR_DRAIN_TIMEOUT * QUEUE_DRAIN_SHARE
+        self.category_limits = dict(DEFAULT_TASK_CATEGORY_LIMITS)
+        if validator_config is not None:
+            self.drain_timeout = validator_config.supervisor_drain_timeout * QUEUE_DRAIN_SHARE
+            self.max_concurrent_tasks = validator_config.queue_max_concurrent_tasks
+            self.max_pending_tasks = validator_config.queue_max_pending_tasks
+            self.refill_low_watermark = validator_config.queue_refill_low_watermark
+            self.refill_batch_size = validator_config.queue_refill_batch_size
+            self.category_limits.update({
+                TASK_CATEGORY_CHAT: validator_config.queue_chat_concurrency,
+                TASK_CATEGORY_TEXT_TO_IMAGE: validator_config.queue_text_to_image_concurrency,
+                TASK_CATEGORY_IMAGE_TO_IMAGE: validator_config.queue_image_to_image_concurrency,
+                TASK_CATEGORY_AVATAR: validator_config.queue_avatar_concurrency,
+            })
+
+        self.category_in_flight: Dict[str, int] = {category: 0 for category in self.category_limits}
+        self.pending_tasks: Dict[str, deque] = {category: deque() for category in self.category_limits}
+        self._refill_task: Optional[asyncio.Task] = None
+        self._last_refill_check = 0.0
+        self._next_refill_at = 0.0
+        self._refill_backoff = REFILL_IDLE_BACKOFF_MIN
+
     async def fetch_tasks_from_center(self, batch_size: int = 10) -> List[Dict[str, Any]]:
         try:
             tasks = await self.task_client.get_pending_tasks(limit=batch_size)
@@ -244,21 +700,26 @@ class CognifyQueueProcessor:
             return []
     
     async def add_tasks_to_queue(self, tasks: List[Dict[str, Any]]) -> int:
-        added_count = 0
-        for task in tasks:
-            if await self.queue_manager.add_task_to_queue(task):
-                added_count += 1
-        
-        return added_count
+        return await self.queue_manager.add_tasks(tasks)
     
     async def process_queue_task(self, task: Dict[str, Any]) -> bool:
+        try:
+            success = await self._process_queue_task(task)
+        except asyncio.CancelledError:
+            # Only cancelled when shutdown outlasts the drain; hand the task back instead of dropping it
+            await self.queue_manager.return_tasks([task])
+            raise
+        await self.queue_manager.ack_task(task)
+        return success
+
+    async def _process_queue_task(self, task: Dict[str, Any]) -> bool:
         try:
             task_id = task.get('task_id')
             task_type = task.get('task_type')
             if not task_type :
                 task_type = task.get('task')
 
-            await self.task_client.update_task_status(task_id, "processing")
+            await self.status_reporter.update_task_status(task_id, "processing")
             
             if self.validator_config.replace_with_localhost:
                 contenders = await self.contender_allocator.get_contenders_for_task(task_type, 1)
@@ -266,7 +727,7 @@ class CognifyQueueProcessor:
                 contenders = await self.contender_allocator.get_contenders_for_task(task_type, -1)
 
             if not contenders:
-                await self.task_client.update_task_status(
+                await self.status_reporter.update_task_status(
                     task_id, 
                     "failed", 
                     error_message="No contenders available"
@@ -284,9 +745,9 @@ class CognifyQueueProcessor:
                     'contenders_used': len(contenders)
                 }
                 
-                await self.task_client.complete_task(task_id, result_data)
+                await self.status_reporter.complete_task(task_id, result_data)
             else:
-                await self.task_client.update_task_status(
+                await self.status_reporter.update_task_status(
                     task_id, 
                     "failed", 
                     error_message="All contenders failed to process task"
@@ -297,60 +758,151 @@ class CognifyQueueProcessor:
             
         except Exception as e:
             logging.error(f"Error processing queue task {task.get('task_id')}: {e}")
-            await self.task_client.update_task_status(
+            await self.status_reporter.update_task_status(
                 task.get('task_id'), 
                 "failed", 
                 error_message=str(e)
             )
             return False
-    
+
+    def _get_task_category(self, task: Dict[str, Any]) -> str:
+        category = get_task_category(task.get('task_type') or task.get('task'))
+        if category not in self.category_limits:
+            return TASK_CATEGORY_OTHER
+        return category
+
+    def _pending_count(self) -> int:
+        return sum(len(pending) for pending in self.pending_tasks.values())
+
+    def _on_task_done(self, category: str, asyncio_task: asyncio.Task):
+        self.tasks.discard(asyncio_task)
+        self.category_in_flight[category] -= 1
+        if asyncio_task.cancelled():
+            return
+        exc = asyncio_task.exception()
+        if exc is not None:
+            logging.error(f"Queue task in pool {category} raised: {exc}")
+
+    def _dispatch_pending_tasks(self) -> int:
+        started = 0
+        for category, pending in self.pending_tasks.items():
+            limit = self.category_limits[category]
+            while pending and self.category_in_flight[category] < limit and len(self.tasks) < self.max_concurrent_tasks:
+                task = pending.popleft()
+                try:
+                    asyncio_task = asyncio.create_task(self.process_queue_task(task))
+                except Exception as e:
+                    logging.error(f"Failed to create task for queue message: {e}")
+                    continue
+                self.category_in_flight[category] += 1
+                self.tasks.add(asyncio_task)
+                asyncio_task.add_done_callback(lambda t, c=category: self._on_task_done(c, t))
+                started += 1
+        return started
+
+    async def _wait_for_free_slot(self, timeout: float = 1.0):
+        if self.tasks:
+            await asyncio.wait(set(self.tasks), timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+        else:
+            await asyncio.sleep(min(timeout, 0.1))
+
+    async def _refill_queue(self):
+        try:
+            new_tasks = await self.fetch_tasks_from_center(batch_size=self.refill_batch_size)
+            added = await self.add_tasks_to_queue(new_tasks) if new_tasks else 0
+            if added:
+                self._refill_backoff = REFILL_IDLE_BACKOFF_MIN
+                self._next_refill_at = 0.0
+            else:
+                self._next_refill_at = time.monotonic() + self._refill_backoff
+                self._refill_backoff = min(self._refill_backoff * 2, REFILL_IDLE_BACKOFF_MAX)
+        except Exception as e:
+            logging.error(f"Error refilling queue from task center: {e}")
+            self._next_refill_at = time.monotonic() + self._refill_backoff
+
+    async def _maybe_start_refill(self):
+        now = time.monotonic()
+        if now - self._last_refill_check < REFILL_CHECK_INTERVAL or now < self._next_refill_at:
+            return
+        if self._refill_task is not None and not self._refill_task.done():
+            return
+        self._last_refill_check = now
+
+        queue_length = await self.queue_manager.get_queue_length(max_age=REFILL_CHECK_INTERVAL)
+        if queue_length <= self.refill_low_watermark:
+            self._refill_task = asyncio.create_task(self._refill_queue())
+
+    def get_dispatch_stats(self) -> Dict[str, Any]:
+        return {
+            'in_flight': len(self.tasks),
+            'pending': self._pending_count(),
+            'max_concurrent_tasks': self.max_concurrent_tasks,
+            'pools': {
+                category: {
+                    'in_flight': self.category_in_flight[category],
+                    'pending': len(self.pending_tasks[category]),
+                    'limit': limit,
+                }
+                for category, limit in self.category_limits.items()
+            }
+        }
+
     async def listen_for_queue_tasks(self):
-        logging.info("Listening for queue tasks...")
+        logging.info(f"Listening for queue tasks with pools {self.category_limits}...")
         while self.running:
             try:
-                done = {t for t in self.tasks if t.done()}
-                self.tasks.difference_update(done)
-                for t in done:
-                    await t
-                
-                while len(self.tasks) < MAX_CONCURRENT_TASKS:
-                    task = await self.queue_manager.get_task_from_queue(timeout=5)
-                    
-                    if not task:
-                        break
-                    
-                    try:
-                        task_coro = self.process_queue_task(task)
-                        asyncio_task = asyncio.create_task(task_coro)
-                        self.tasks.add(asyncio_task)
-                        
-                    except Exception as e:
-                        logging.error(f"Failed to create task for queue message: {e}")
-                
-                queue_length = await self.queue_manager.get_queue_length()
-                if queue_length == 0:
-                    await asyncio.sleep(90)
-                    new_tasks = await self.fetch_tasks_from_center(batch_size=20)
-                    if new_tasks:
-                        await self.add_tasks_to_queue(new_tasks)
-                    else:
-                        await asyncio.sleep(5)
-                
-                await asyncio.sleep(0.01)
-                
+                self._dispatch_pending_tasks()
+
+                await self._maybe_start_refill()
+
+                if self._pending_count() >= self.max_pending_tasks or len(self.tasks) >= self.max_concurrent_tasks:
+                    await self._wait_for_free_slot()
+                    continue
+
+                tasks = await self.queue_manager.get_tasks_from_queue(
+                    count=self.max_pending_tasks - self._pending_count(), timeout=1
+                )
+                if not tasks:
+                    if self._pending_count():
+                        await self._wait_for_free_slot()
+                    continue
+
+                for task in tasks:
+                    self.pending_tasks[self._get_task_category(task)].append(task)
+
             except Exception as e:
                 logging.error(f"Error in listen_for_queue_tasks: {e}")
                 await asyncio.sleep(1)
-    
+
+    async def _requeue_pending_tasks(self):
+        pending = []
+        for category_pending in self.pending_tasks.values():
+            pending.extend(category_pending)
+            category_pending.clear()
+        if pending:
+            requeued = await self.queue_manager.return_tasks(pending)
+            logging.info(f"Returned {requeued}/{len(pending)} undispatched tasks to the queue")
+
+    async def _drain_in_flight_tasks(self):
+        if not self.tasks:
+            return
+        logging.info(f"Waiting up to {self.drain_timeout}s for {len(self.tasks)} in-flight queue tasks")
+        _, pending = await asyncio.wait(set(self.tasks), timeout=self.drain_timeout)
+        if pending:
+            logging.warning(f"Cancelling {len(pending)} queue tasks that did not finish in {self.drain_timeout}s")
+            for asyncio_task in pending:
+                asyncio_task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
     async def run_queue_processor(self, fetch_interval: int = 30):
         self.running = True
         
         try:
-            current_loop = asyncio.get_running_loop()
+            await self.status_reporter.start()
 
             queue_length = await self.queue_manager.get_queue_length()
             if queue_length == 0:
-                initial_tasks = await self.fetch_tasks_from_center(batch_size=20)
+                initial_tasks = await self.fetch_tasks_from_center(batch_size=self.refill_batch_size)
                 if initial_tasks:
                     await self.add_tasks_to_queue(initial_tasks)
             
@@ -360,6 +912,18 @@ class CognifyQueueProcessor:
             logging.error(f"Error in queue processor: {e}")
         finally:
             self.running = False
+            try:
+                await self._requeue_pending_tasks()
+            except Exception as e:
+                logging.error(f"Error returning pending tasks to queue: {e}")
+            if self._refill_task is not None and not self._refill_task.done():
+                self._refill_task.cancel()
+            try:
+                await self._drain_in_flight_tasks()
+            except Exception as e:
+                logging.error(f"Error draining in-flight queue tasks: {e}")
+            await self.contender_allocator.cleanup()
+            await self.status_reporter.stop()
     
     def stop(self):
         self.running = False
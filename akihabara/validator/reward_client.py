@@ -10,6 +10,8 @@ import aiohttp
 
 logger = logging.getLogger(__name__)
 
+BATCH_UNSUPPORTED_STATUS_CODES = {404, 405, 501}
+
 class RewardClient:
 
     def __init__(self, base_url: str, validator_hotkey: str, token: Optional[str] = None):
@@ -17,6 +19,7 @@ class RewardClient:
         self.validator_hotkey = validator_hotkey
         self.token = token
         self.session = None
+        self.batch_supported = True
     
     async def __aenter__(self):
         self.session = aiohttp.ClientSession()
@@ -46,28 +49,30 @@ class RewardClient:
         
         return headers
     
+    @staticmethod
+    def _build_payload(reward_data: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            'id': reward_data.get('id'),
+            'task': reward_data.get('task'),
+            'node_id': reward_data.get('node_id'),
+            'quality_score': reward_data.get('quality_score'),
+            'validator_hotkey': reward_data.get('validator_hotkey'),
+            'node_hotkey': reward_data.get('node_hotkey'),
+            'synthetic_query': reward_data.get('synthetic_query', False),
+            'metric': reward_data.get('metric'),
+            'response_time': reward_data.get('response_time'),
+            'volume': reward_data.get('volume'),
+            'stream_metric': reward_data.get('stream_metric'),
+            'created_at': reward_data.get('created_at')
+        }
+
     async def insert_reward_data(self, reward_data: Dict[str, Any]) -> bool:
         try:
             await self.ensure_session()
             
             url = f"{self.base_url}/reward_data"
             
-            payload = {
-                'id': reward_data.get('id'),
-                'task': reward_data.get('task'),
-                'node_id': reward_data.get('node_id'),
-                'quality_score': reward_data.get('quality_score'),
-                'validator_hotkey': reward_data.get('validator_hotkey'),
-                'node_hotkey': reward_data.get('node_hotkey'),
-                'synthetic_query': reward_data.get('synthetic_query', False),
-                'metric': reward_data.get('metric'),
-                'response_time': reward_data.get('response_time'),
-                'volume': reward_data.get('volume'),
-                'stream_metric': reward_data.get('stream_metric'),
-                'created_at': reward_data.get('created_at')
-            }
-            
-            wrapped_payload = {'reward_data': payload}
+            wrapped_payload = {'reward_data': self._build_payload(reward_data)}
             
             async with self.session.post(url, json=wrapped_payload, headers=self._get_headers()) as response:
                 if response.status == 200:
@@ -85,6 +90,46 @@ class RewardClient:
         except Exception as e:
             logger.error(f"Error inserting reward data: {e}")
             return False
+
+    async def _insert_reward_data_individually(self, reward_data_list: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        results = await asyncio.gather(*(self.insert_reward_data(reward_data) for reward_data in reward_data_list))
+        return [reward_data for reward_data, inserted in zip(reward_data_list, results) if not inserted]
+
+    async def insert_reward_data_batch(self, reward_data_list: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Insert several reward records in one request and return the ones that were not accepted."""
+        if not reward_data_list:
+            return []
+
+        if not self.batch_supported:
+            return await self._insert_reward_data_individually(reward_data_list)
+
+        try:
+            await self.ensure_session()
+
+            url = f"{self.base_url}/reward_data/batch"
+            wrapped_payload = {'reward_data': [self._build_payload(reward_data) for reward_data in reward_data_list]}
+
+            async with self.session.post(url, json=wrapped_payload, headers=self._get_headers()) as response:
+                if response.status in BATCH_UNSUPPORTED_STATUS_CODES:
+                    logger.warning("Central server has no reward batch endpoint, falling back to single inserts")
+                    self.batch_supported = False
+                    return await self._insert_reward_data_individually(reward_data_list)
+
+                if response.status == 200:
+                    result = await response.json()
+                    if result.get('success'):
+                        logger.info(f"Successfully inserted {len(reward_data_list)} reward data records")
+                        return []
+                    else:
+                        logger.error(f"Failed to insert reward data batch: {result.get('error')}")
+                        return reward_data_list
+                else:
+                    logger.error(f"HTTP {response.status}: {await response.text()}")
+                    return reward_data_list
+
+        except Exception as e:
+            logger.error(f"Error inserting reward data batch: {e}")
+            return reward_data_list
     
     async def get_reward_data_by_validator(
         self,
@@ -0,0 +1,238 @@
+# -*- coding: utf-8 -*-
+
+import asyncio
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from akihabara.core.path_utils import PathUtils
+from akihabara.validator.reward_client import RewardClient
+
+logger = logging.getLogger(__name__)
+
+REWARD_SINK_MAX_QUEUE_SIZE = 10000
+REWARD_SINK_BATCH_SIZE = 200
+REWARD_SINK_FLUSH_INTERVAL_MS = 1000
+REWARD_SINK_RETRY_DELAY = 2.0
+REWARD_SINK_MAX_RETRY_DELAY = 60.0
+REWARD_SINK_MAX_ATTEMPTS = 5
+
+
+def get_default_spill_path() -> Path:
+    return PathUtils.get_project_root() / "data" / "reward_spill.jsonl"
+
+
+class RewardSink:
+
+    def __init__(self, reward_client: RewardClient, max_queue_size: int = REWARD_SINK_MAX_QUEUE_SIZE,
+                 batch_size: int = REWARD_SINK_BATCH_SIZE, flush_interval_ms: int = REWARD_SINK_FLUSH_INTERVAL_MS,
+                 spill_path: Optional[str] = None):
+        self.reward_client = reward_client
+        self.max_queue_size = max(max_queue_size, 1)
+        self.batch_size = max(batch_size, 1)
+        self.flush_interval = max(flush_interval_ms, 1) / 1000
+        self.spill_path = Path(spill_path) if spill_path else get_default_spill_path()
+        self.replay_path = self.spill_path.with_suffix(self.spill_path.suffix + '.replay')
+        self.running = False
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._in_flight: Optional[List[Dict[str, Any]]] = None
+        self._spill_pending = False
+        self._retry_delay = REWARD_SINK_RETRY_DELAY
+        self.stats = {
+            'submitted': 0,
+            'inserted': 0,
+            'spilled': 0,
+            'replayed': 0,
+            'dropped': 0,
+            'batches': 0,
+        }
+
+    def submit(self, reward_data: Dict[str, Any]) -> bool:
+        """Queue a reward record for background insertion without waiting on the central server."""
+        self.stats['submitted'] += 1
+        if not self.running:
+            self.start()
+
+        try:
+            self._queue.put_nowait({'attempts': 0, 'reward_data': reward_data})
+            return True
+        except asyncio.QueueFull:
+            self._spill([{'attempts': 0, 'reward_data': reward_data}])
+            return False
+
+    def start(self):
+        if self.running:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self._spill_pending = self.spill_path.exists() or self.replay_path.exists()
+        self.running = True
+        self._worker = asyncio.create_task(self._run())
+        logger.info(
+            f"Reward sink started (batch {self.batch_size}, flush {int(self.flush_interval * 1000)}ms, "
+            f"queue {self.max_queue_size}, spill pending: {self._spill_pending})"
+        )
+
+    async def close(self):
+        if not self.running:
+            return
+
+        self.running = False
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+        remaining = []
+        while not self._queue.empty():
+            remaining.append(self._queue.get_nowait())
+
+        for start in range(0, len(remaining), self.batch_size):
+            batch = remaining[start:start + self.batch_size]
+            if not await self._send_batch(batch):
+                self._spill(remaining[start + self.batch_size:])
+                break
+
+        logger.info(f"Reward sink closed: {self.get_stats()}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            'queued': self._queue.qsize() if self._queue is not None else 0,
+            'spill_pending': self._spill_pending,
+        }
+
+    async def _collect_batch(self) -> List[Dict[str, Any]]:
+        batch = [await self._queue.get()]
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+                continue
+            except asyncio.QueueEmpty:
+                pass
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout=remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        if self._spill_pending:
+            await self._replay_spill()
+
+        while self.running:
+            try:
+                batch = await self._collect_batch()
+                self._in_flight = batch
+                sent = await self._send_batch(batch)
+                self._in_flight = None
+                if sent:
+                    self._retry_delay = REWARD_SINK_RETRY_DELAY
+                    if self._spill_pending and self._queue.empty():
+                        await self._replay_spill()
+                else:
+                    await asyncio.sleep(self._retry_delay)
+                    self._retry_delay = min(self._retry_delay * 2, REWARD_SINK_MAX_RETRY_DELAY)
+
+            except asyncio.CancelledError:
+                # Records cancelled mid-request may have reached the server; replay is keyed by id
+                if self._in_flight:
+                    self._spill(self._in_flight)
+                    self._in_flight = None
+                raise
+            except Exception as e:
+                self._in_flight = None
+                logger.error(f"Error in reward sink: {e}")
+                await asyncio.sleep(self.flush_interval)
+
+    async def _send_batch(self, batch: List[Dict[str, Any]]) -> bool:
+        if not batch:
+            return True
+
+        self.stats['batches'] += 1
+        rejected = await self.reward_client.insert_reward_data_batch([entry['reward_data'] for entry in batch])
+        self.stats['inserted'] += len(batch) - len(rejected)
+        if not rejected:
+            return True
+
+        rejected_ids = {id(reward_data) for reward_data in rejected}
+        retry = []
+        for entry in batch:
+            if id(entry['reward_data']) not in rejected_ids:
+                continue
+            entry['attempts'] += 1
+            if entry['attempts'] >= REWARD_SINK_MAX_ATTEMPTS:
+                self.stats['dropped'] += 1
+                logger.error(f"Dropping reward data {entry['reward_data'].get('id')} after {entry['attempts']} attempts")
+            else:
+                retry.append(entry)
+
+        self._spill(retry)
+        return len(rejected) < len(batch)
+
+    def _spill(self, entries: List[Dict[str, Any]]):
+        if not entries:
+            return
+        try:
+            self.spill_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.spill_path, 'a', encoding='utf-8') as f:
+                f.write(''.join(json.dumps(entry) + '\n' for entry in entries))
+            self._spill_pending = True
+            self.stats['spilled'] += len(entries)
+        except Exception as e:
+            self.stats['dropped'] += len(entries)
+            logger.error(f"Error spilling {len(entries)} reward data records to {self.spill_path}: {e}")
+
+    async def _replay_spill(self):
+        try:
+            # A leftover replay file means the previous run stopped mid-replay; finish it first
+            if not self.replay_path.exists():
+                if not self.spill_path.exists():
+                    self._spill_pending = False
+                    return
+                os.replace(self.spill_path, self.replay_path)
+
+            logger.info(f"Replaying spilled reward data from {self.replay_path}")
+            failed = False
+            batch = []
+            with open(self.replay_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        batch.append(json.loads(line))
+                    except json.JSONDecodeError:
+                        continue
+                    if len(batch) < self.batch_size:
+                        continue
+                    if failed:
+                        self._spill(batch)
+                    elif not await self._send_batch(batch):
+                        failed = True
+                    else:
+                        self.stats['replayed'] += len(batch)
+                    batch = []
+
+            if failed:
+                self._spill(batch)
+            elif batch and await self._send_batch(batch):
+                self.stats['replayed'] += len(batch)
+
+            self.replay_path.unlink()
+            self._spill_pending = self.spill_path.exists()
+
+        except Exception as e:
+            logger.error(f"Error replaying spilled reward data: {e}")
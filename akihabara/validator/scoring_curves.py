@@ -0,0 +1,235 @@
+# -*- coding: utf-8 -*-
+
+import logging
+from dataclasses import dataclass, fields, replace
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# (bound, bonus) steps are checked in order and the first match wins
+Steps = Tuple[Tuple[float, float], ...]
+
+STATUS_MULTIPLIERS = {200: 1.0, 400: 0.3, 429: 0.2, 500: 0.1}
+DEFAULT_STATUS_MULTIPLIER = 0.5
+
+
+@dataclass(frozen=True)
+class ScoringCurve:
+    name: str
+    base_score: float = 0.5
+    response_time_steps: Steps = ()      # bonus when 0 < response_time < bound
+    metric_steps: Steps = ()             # bonus when metric > bound
+    stream_metric_steps: Steps = ()      # bonus when stream_metric > bound
+    content_min_length: int = 10
+    content_length_bonus: float = 0.0
+    content_keywords: Tuple[str, ...] = ()
+    content_keyword_bonus: float = 0.0
+    slow_response_time: float = 30.0
+    slow_response_score: float = 0.1
+    metric_reference: float = 100.0
+    metric_floor: float = 0.8
+    stream_metric_reference: float = 50.0
+    stream_metric_floor: float = 0.9
+
+    @property
+    def uses_content(self) -> bool:
+        return self.content_length_bonus != 0.0 or self.content_keyword_bonus != 0.0
+
+    def with_overrides(self, overrides: Dict[str, Any]) -> 'ScoringCurve':
+        known = {f.name for f in fields(self)}
+        values = {}
+        for key, value in overrides.items():
+            if key not in known:
+                logger.warning(f"Ignoring unknown scoring curve field: {key}")
+                continue
+            if key.endswith('_steps'):
+                value = tuple((float(bound), float(bonus)) for bound, bonus in value)
+            elif key == 'content_keywords':
+                value = tuple(value)
+            values[key] = value
+        return replace(self, **values)
+
+
+CHAT_CURVE = ScoringCurve(
+    name="chat",
+    metric_steps=((100, 0.2), (50, 0.1)),
+    stream_metric_steps=((50, 0.1),),
+    content_length_bonus=0.2,
+    content_keywords=("hello", "hi"),
+    content_keyword_bonus=0.1,
+)
+IMAGE_CURVE = ScoringCurve(
+    name="image",
+    response_time_steps=((10, 0.2), (20, 0.1)),
+    metric_steps=((50, 0.2), (20, 0.1)),
+)
+AVATAR_CURVE = ScoringCurve(
+    name="avatar",
+    response_time_steps=((30, 0.2), (60, 0.1)),
+    metric_steps=((30, 0.2), (10, 0.1)),
+)
+GENERIC_CURVE = ScoringCurve(
+    name="generic",
+    response_time_steps=((15, 0.2), (30, 0.1)),
+    metric_steps=((100, 0.2), (50, 0.1)),
+)
+
+
+class ScoringCurveRegistry:
+
+    def __init__(self):
+        self.curves: Dict[str, ScoringCurve] = {}
+        self.prefixes: list = []
+        self.default = GENERIC_CURVE
+        self._resolved: Dict[Tuple[str, str], ScoringCurve] = {}
+
+    def register(self, curve: ScoringCurve, prefixes: Sequence[str] = ()):
+        self.curves[curve.name] = curve
+        for prefix in prefixes:
+            self.prefixes.append((prefix, curve.name))
+        self._resolved.clear()
+
+    def for_task(self, task: str) -> ScoringCurve:
+        for prefix, name in self.prefixes:
+            if task.startswith(prefix):
+                return self.curves[name]
+        return self.default
+
+    def resolve(self, task: str, task_config: Optional[Dict[str, Any]] = None) -> ScoringCurve:
+        """Curve for a task; task configs may name a curve or override its fields under `scoring_curve`."""
+        spec = task_config.get('scoring_curve') if isinstance(task_config, dict) else None
+        cache_key = (task, repr(spec))
+        curve = self._resolved.get(cache_key)
+        if curve is not None:
+            return curve
+
+        curve = self.for_task(task)
+        if isinstance(spec, str):
+            curve = self.curves.get(spec, curve)
+        elif isinstance(spec, dict):
+            overrides = dict(spec)
+            base_name = overrides.pop('curve', None)
+            if base_name is not None:
+                curve = self.curves.get(base_name, curve)
+            curve = curve.with_overrides(overrides)
+
+        self._resolved[cache_key] = curve
+        return curve
+
+
+def _step_bonus(values: np.ndarray, steps: Steps, below: bool) -> np.ndarray:
+    bonus = np.zeros(values.shape, dtype=np.float64)
+    # Applied last-to-first so the first matching step ends up on top
+    for bound, value in reversed(steps):
+        hit = ((values != 0) & (values < bound)) if below else (values > bound)
+        bonus = np.where(hit, value, bonus)
+    return bonus
+
+
+def _as_array(values, n: int, default: float, dtype=np.float64) -> np.ndarray:
+    if values is None:
+        return np.full(n, default, dtype=dtype)
+    return np.asarray(values, dtype=dtype)
+
+
+def score_batch(
+    curve: ScoringCurve,
+    response_times: Sequence[float],
+    volumes: Sequence[float],
+    status_codes: Sequence[int],
+    stream_times: Optional[Sequence[float]] = None,
+    num_tokens: Optional[Sequence[float]] = None,
+    success: Optional[Sequence[bool]] = None,
+    content_lengths: Optional[Sequence[int]] = None,
+    content_keyword_hits: Optional[Sequence[bool]] = None,
+) -> np.ndarray:
+    """Quality scores in [0, 1] for many results at once; a missing response time is passed as NaN."""
+    response_times = np.asarray(response_times, dtype=np.float64)
+    n = response_times.shape[0]
+    volumes = _as_array(volumes, n, 0.0)
+    status_codes = _as_array(status_codes, n, 500, dtype=np.int64)
+    stream_times = _as_array(stream_times, n, np.nan)
+    num_tokens = _as_array(num_tokens, n, 0.0)
+    success = _as_array(success, n, True, dtype=bool)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        has_time = np.nan_to_num(response_times) != 0
+        metric = np.where(has_time, volumes / np.where(has_time, response_times, 1.0), 0.0)
+        has_stream_time = np.nan_to_num(stream_times) != 0
+        stream_metric = np.where(has_stream_time, num_tokens / np.where(has_stream_time, stream_times, 1.0), 0.0)
+
+    score = np.full(n, curve.base_score, dtype=np.float64)
+    score += _step_bonus(response_times, curve.response_time_steps, below=True)
+    score += _step_bonus(metric, curve.metric_steps, below=False)
+    score += _step_bonus(stream_metric, curve.stream_metric_steps, below=False)
+    if curve.content_length_bonus and content_lengths is not None:
+        score += np.where(np.asarray(content_lengths) > curve.content_min_length, curve.content_length_bonus, 0.0)
+    if curve.content_keyword_bonus and content_keyword_hits is not None:
+        score += np.where(np.asarray(content_keyword_hits, dtype=bool), curve.content_keyword_bonus, 0.0)
+    score = np.minimum(score, 1.0)
+
+    ok = success & (status_codes == 200)
+    score = np.where(ok & (response_times > curve.slow_response_time), curve.slow_response_score, score)
+    score = np.where(ok, score, 0.0)
+
+    multipliers = np.full(n, DEFAULT_STATUS_MULTIPLIER, dtype=np.float64)
+    for status_code, multiplier in STATUS_MULTIPLIERS.items():
+        multipliers[status_codes == status_code] = multiplier
+    score *= multipliers
+
+    score *= np.where(metric > 0, curve.metric_floor + (1 - curve.metric_floor) *
+                      np.minimum(metric / curve.metric_reference, 1.0), 1.0)
+    score *= np.where(stream_metric > 0, curve.stream_metric_floor + (1 - curve.stream_metric_floor) *
+                      np.minimum(stream_metric / curve.stream_metric_reference, 1.0), 1.0)
+
+    return np.clip(score, 0.0, 1.0)
+
+
+def score_scalar(curve: ScoringCurve, response_time: Optional[float], volume: float, status_code: Optional[int],
+                 stream_time: Optional[float] = None, num_tokens: float = 0.0, success: bool = True,
+                 content_length: int = 0, content_keyword_hit: bool = False) -> float:
+    # Per-result reference of the batch scorer, mirroring the original branchy implementation
+    metric = volume / response_time if response_time else 0
+    stream_metric = num_tokens / stream_time if stream_time else 0
+
+    if not success or status_code != 200:
+        score = 0.0
+    elif response_time and response_time > curve.slow_response_time:
+        score = curve.slow_response_score
+    else:
+        score = curve.base_score
+        for bound, bonus in curve.response_time_steps:
+            if response_time and response_time < bound:
+                score += bonus
+                break
+        for bound, bonus in curve.metric_steps:
+            if metric > bound:
+                score += bonus
+                break
+        for bound, bonus in curve.stream_metric_steps:
+            if stream_metric > bound:
+                score += bonus
+                break
+        if content_length > curve.content_min_length:
+            score += curve.content_length_bonus
+        if content_keyword_hit:
+            score += curve.content_keyword_bonus
+        score = min(1.0, score)
+
+    score *= STATUS_MULTIPLIERS.get(status_code, DEFAULT_STATUS_MULTIPLIER)
+    if metric > 0:
+        score *= curve.metric_floor + (1 - curve.metric_floor) * min(metric / curve.metric_reference, 1.0)
+    if stream_metric > 0:
+        score *= curve.stream_metric_floor + (1 - curve.stream_metric_floor) * min(
+            stream_metric / curve.stream_metric_reference, 1.0)
+    return max(0.0, min(1.0, score))
+
+
+scoring_curves = ScoringCurveRegistry()
+scoring_curves.register(CHAT_CURVE, prefixes=("chat-",))
+scoring_curves.register(IMAGE_CURVE, prefixes=("text-to-image", "image-to-image"))
+scoring_curves.register(AVATAR_CURVE, prefixes=("avatar",))
+scoring_curves.register(GENERIC_CURVE)
+
@@ -3,14 +3,27 @@
 
 import asyncio
 import logging
-from typing import Dict, Optional, List, Tuple
+import math
+import threading
+from collections import deque
+from typing import Deque, Dict, Optional, List, Tuple
 from datetime import datetime, timedelta
 from dataclasses import dataclass
 from akihabara.validator.scoring_system import scoring_system
 
 logger = logging.getLogger(__name__)
 
-@dataclass
+SCORE_EWMA_ALPHA = 0.1
+HISTORICAL_SCORE_ALPHA = 0.3
+RESULT_RETENTION_HOURS = 24
+LATENCY_SKETCH_RELATIVE_ACCURACY = 0.02
+LATENCY_SKETCH_MIN_VALUE = 1e-3
+SCORING_RESULTS_RING_SIZE = 256
+# Window aggregates are kept per hour so expiring old results never needs the raw results back
+RESULT_BUCKET_SECONDS = 3600
+
+
+@dataclass(slots=True)
 class ScoringResult:
     hotkey: str
     node_id: int
@@ -23,81 +36,277 @@ class ScoringResult:
     status_code: int
 
 
-class ScoringResultsManager:
+class RunningStats:
+    __slots__ = ('count', 'total', 'min', 'max', 'ewma', 'first')
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self.ewma: Optional[float] = None
+        self.first: Optional[float] = None
+
+    def add(self, value: float, alpha: float = SCORE_EWMA_ALPHA):
+        if not self.count:
+            self.first = value
+        self.count += 1
+        self.total += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+        self.ewma = value if self.ewma is None else alpha * value + (1 - alpha) * self.ewma
+
+    def merge(self, other: 'RunningStats', alpha: float = SCORE_EWMA_ALPHA):
+        # Appends the values of a later run; the EWMA comes out the same as adding them one by one
+        if not other.count:
+            return
+        if not self.count:
+            self.first = other.first
+            self.ewma = other.ewma
+        else:
+            self.ewma = other.ewma + (1 - alpha) ** other.count * (self.ewma - other.first)
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def to_dict(self) -> Dict[str, float]:
+        if not self.count:
+            return {'count': 0, 'sum': 0.0, 'mean': 0.0, 'min': 0.0, 'max': 0.0, 'ewma': 0.0}
+        return {
+            'count': self.count,
+            'sum': self.total,
+            'mean': self.mean,
+            'min': self.min,
+            'max': self.max,
+            'ewma': self.ewma,
+        }
+
+
+class LatencySketch:
+    # Log-bucketed histogram: quantiles are within the relative accuracy and memory is bounded by the value range
+    __slots__ = ('count', 'zero_count', 'buckets')
+
+    _gamma = (1 + LATENCY_SKETCH_RELATIVE_ACCURACY) / (1 - LATENCY_SKETCH_RELATIVE_ACCURACY)
+    _log_gamma = math.log(_gamma)
 
     def __init__(self):
-        self.scoring_results: Dict[str, List[ScoringResult]] = {}  # hotkey -> [ScoringResult]
+        self.count = 0
+        self.zero_count = 0
+        self.buckets: Dict[int, int] = {}
+
+    def add(self, value: float):
+        self.count += 1
+        if value <= LATENCY_SKETCH_MIN_VALUE:
+            self.zero_count += 1
+            return
+        index = math.ceil(math.log(value) / self._log_gamma)
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+
+    def merge(self, other: 'LatencySketch'):
+        self.count += other.count
+        self.zero_count += other.zero_count
+        for index, count in other.buckets.items():
+            self.buckets[index] = self.buckets.get(index, 0) + count
+
+    def quantile(self, q: float) -> float:
+        if not self.count:
+            return 0.0
+
+        rank = q * (self.count - 1)
+        seen = self.zero_count
+        if rank < seen:
+            return 0.0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if rank < seen:
+                return 2 * self._gamma ** index / (self._gamma + 1)
+        return 2 * self._gamma ** max(self.buckets) / (self._gamma + 1)
+
+
+class ScoreAggregate:
+    __slots__ = ('quality', 'response_time', 'latency', 'successful')
+
+    def __init__(self):
+        self.quality = RunningStats()
+        self.response_time = RunningStats()
+        self.latency = LatencySketch()
+        self.successful = 0
+
+    def add(self, result: ScoringResult):
+        self.quality.add(result.quality_score)
+        self.response_time.add(result.response_time)
+        self.latency.add(result.response_time)
+        if result.success:
+            self.successful += 1
+
+    def merge(self, other: 'ScoreAggregate'):
+        self.quality.merge(other.quality)
+        self.response_time.merge(other.response_time)
+        self.latency.merge(other.latency)
+        self.successful += other.successful
+
+    def to_dict(self) -> Dict[str, any]:
+        return {
+            'total_tasks': self.quality.count,
+            'successful_tasks': self.successful,
+            'quality_score': self.quality.to_dict(),
+            'response_time': self.response_time.to_dict(),
+            'latency_p50': self.latency.quantile(0.5),
+            'latency_p95': self.latency.quantile(0.95),
+            'latency_p99': self.latency.quantile(0.99),
+        }
+
+
+class WindowAggregate:
+    __slots__ = ('overall', 'tasks')
+
+    def __init__(self):
+        self.overall = ScoreAggregate()
+        self.tasks: Dict[str, ScoreAggregate] = {}
+
+    def add(self, result: ScoringResult):
+        self.overall.add(result)
+        task_aggregate = self.tasks.get(result.task)
+        if task_aggregate is None:
+            task_aggregate = self.tasks[result.task] = ScoreAggregate()
+        task_aggregate.add(result)
+
+    def merge(self, other: 'WindowAggregate'):
+        self.overall.merge(other.overall)
+        for task, other_task_aggregate in other.tasks.items():
+            task_aggregate = self.tasks.get(task)
+            if task_aggregate is None:
+                task_aggregate = self.tasks[task] = ScoreAggregate()
+            task_aggregate.merge(other_task_aggregate)
+
+
+class NodeAggregate(WindowAggregate):
+    __slots__ = ('buckets', 'results')
+
+    def __init__(self, ring_size: int):
+        super().__init__()
+        self.buckets: Dict[int, WindowAggregate] = {}  # hour index -> aggregate of the results in that hour
+        self.results: Optional[Deque[ScoringResult]] = deque(maxlen=ring_size) if ring_size > 0 else None
+
+    def add(self, result: ScoringResult):
+        super().add(result)
+        index = int(result.timestamp.timestamp() // RESULT_BUCKET_SECONDS)
+        bucket = self.buckets.get(index)
+        if bucket is None:
+            bucket = self.buckets[index] = WindowAggregate()
+        bucket.add(result)
+        if self.results is not None:
+            self.results.append(result)
+
+    def set_ring_size(self, ring_size: int):
+        self.results = deque(self.results or (), maxlen=ring_size) if ring_size > 0 else None
+
+    def expire(self, cutoff_time: datetime) -> bool:
+        # The bucket holding the cutoff is kept whole, so the window runs at most one bucket over
+        cutoff_index = int(cutoff_time.timestamp() // RESULT_BUCKET_SECONDS)
+        expired = [index for index in self.buckets if index < cutoff_index]
+        if expired:
+            for index in expired:
+                del self.buckets[index]
+            self.overall = ScoreAggregate()
+            self.tasks = {}
+            for index in sorted(self.buckets):
+                self.merge(self.buckets[index])
+            if self.results is not None:
+                while self.results and self.results[0].timestamp < cutoff_time:
+                    self.results.popleft()
+        return bool(self.buckets)
+
+
+class ScoringResultsManager:
+
+    def __init__(self, ring_size: int = SCORING_RESULTS_RING_SIZE):
+        self.ring_size = max(ring_size, 0)
+        self.node_aggregates: Dict[str, NodeAggregate] = {}  # hotkey -> NodeAggregate
         self.historical_scores: Dict[str, float] = {}  # hotkey -> historical_score
-    
+        self._lock = threading.Lock()
+
     def add_scoring_result(self, result: ScoringResult):
-        if result.hotkey not in self.scoring_results:
-            self.scoring_results[result.hotkey] = []
-        
-        self.scoring_results[result.hotkey].append(result)
+        with self._lock:
+            aggregate = self.node_aggregates.get(result.hotkey)
+            if aggregate is None:
+                aggregate = self.node_aggregates[result.hotkey] = NodeAggregate(self.ring_size)
+            aggregate.add(result)
+
+    def set_ring_size(self, ring_size: int):
+        with self._lock:
+            self.ring_size = max(ring_size, 0)
+            for aggregate in self.node_aggregates.values():
+                aggregate.set_ring_size(self.ring_size)
 
     def get_current_cycle_score(self, hotkey: str) -> float:
-        if hotkey not in self.scoring_results:
-            return 0.0
-        
-        results = self.scoring_results[hotkey]
-        if not results:
+        aggregate = self.node_aggregates.get(hotkey)
+        if aggregate is None:
             return 0.0
-        
-        avg_score = sum(r.quality_score for r in results) / len(results)
 
-        return avg_score
-    
+        return aggregate.overall.quality.mean
 
-    
     def get_historical_score(self, hotkey: str) -> float:
         return self.historical_scores.get(hotkey, 0.0)
-    
+
     def _start_new_cycle(self):
+        with self._lock:
+            for hotkey, aggregate in self.node_aggregates.items():
+                if aggregate.overall.quality.count:
+                    current_score = aggregate.overall.quality.mean
+
+                    historical_score = self.historical_scores.get(hotkey, 0.0)
+                    if historical_score == 0.0:
+                        self.historical_scores[hotkey] = current_score
+                    else:
+                        alpha = HISTORICAL_SCORE_ALPHA
+                        self.historical_scores[hotkey] = alpha * current_score + (1 - alpha) * historical_score
+
+            cutoff_time = datetime.now() - timedelta(hours=RESULT_RETENTION_HOURS)
+            for hotkey in list(self.node_aggregates.keys()):
+                if not self.node_aggregates[hotkey].expire(cutoff_time):
+                    del self.node_aggregates[hotkey]
 
-        for hotkey in self.scoring_results.keys():
-            results = self.scoring_results[hotkey]
-            if results:
-                current_score = sum(r.quality_score for r in results) / len(results)
-                
-                historical_score = self.historical_scores.get(hotkey, 0.0)
-                if historical_score == 0.0:
-                    self.historical_scores[hotkey] = current_score
-                else:
-                    alpha = 0.3
-                    self.historical_scores[hotkey] = alpha * current_score + (1 - alpha) * historical_score
-        
-        cutoff_time = datetime.now() - timedelta(hours=24)
-        for hotkey in list(self.scoring_results.keys()):
-            self.scoring_results[hotkey] = [
-                r for r in self.scoring_results[hotkey] 
-                if r.timestamp >= cutoff_time
-            ]
-        
     def clear_current_cycle_scores(self):
-        self.scoring_results.clear()
-        self.historical_scores.clear()
+        with self._lock:
+            self.node_aggregates.clear()
+            self.historical_scores.clear()
 
     def get_all_scoring_results(self, hotkey: str) -> List[ScoringResult]:
-        return self.scoring_results.get(hotkey, [])
-    
-    def get_current_cycle_results(self, hotkey: str) -> List[ScoringResult]:
-        if hotkey not in self.scoring_results:
+        aggregate = self.node_aggregates.get(hotkey)
+        if aggregate is None or aggregate.results is None:
             return []
-        
-        return self.scoring_results[hotkey]
-    
+        return list(aggregate.results)
+
+    def get_current_cycle_results(self, hotkey: str) -> List[ScoringResult]:
+        return self.get_all_scoring_results(hotkey)
+
     def get_all_current_scores(self) -> Dict[str, float]:
-        scores = {}
-        for hotkey in self.scoring_results.keys():
-            scores[hotkey] = self.get_current_cycle_score(hotkey)
-        return scores
-    
+        return {
+            hotkey: aggregate.overall.quality.mean
+            for hotkey, aggregate in list(self.node_aggregates.items())
+        }
+
     def get_all_historical_scores(self) -> Dict[str, float]:
         return self.historical_scores.copy()
-    
+
+    def get_task_stats(self, hotkey: str, task: str) -> Dict[str, any]:
+        aggregate = self.node_aggregates.get(hotkey)
+        task_aggregate = aggregate.tasks.get(task) if aggregate is not None else None
+        if task_aggregate is None:
+            return ScoreAggregate().to_dict()
+        return task_aggregate.to_dict()
+
     def get_node_stats(self, hotkey: str) -> Dict[str, any]:
-        results = self.scoring_results.get(hotkey, [])
-        if not results:
+        aggregate = self.node_aggregates.get(hotkey)
+        if aggregate is None:
             return {
                 'total_tasks': 0,
                 'successful_tasks': 0,
@@ -106,16 +315,21 @@ class ScoringResultsManager:
                 'current_cycle_score': 0.0,
                 'historical_score': 0.0
             }
-        
-        successful_results = [r for r in results if r.success]
-        
+
+        overall = aggregate.overall
         return {
-            'total_tasks': len(results),
-            'successful_tasks': len(successful_results),
-            'avg_quality_score': sum(r.quality_score for r in results) / len(results),
-            'avg_response_time': sum(r.response_time for r in results) / len(results),
-            'current_cycle_score': self.get_current_cycle_score(hotkey),
-            'historical_score': self.get_historical_score(hotkey)
+            'total_tasks': overall.quality.count,
+            'successful_tasks': overall.successful,
+            'avg_quality_score': overall.quality.mean,
+            'avg_response_time': overall.response_time.mean,
+            'current_cycle_score': overall.quality.mean,
+            'historical_score': self.get_historical_score(hotkey),
+            'quality_score_ewma': overall.quality.ewma or 0.0,
+            'min_quality_score': overall.quality.min if overall.quality.count else 0.0,
+            'max_quality_score': overall.quality.max if overall.quality.count else 0.0,
+            'latency_p50': overall.latency.quantile(0.5),
+            'latency_p95': overall.latency.quantile(0.95),
+            'tasks': {task: task_aggregate.to_dict() for task, task_aggregate in list(aggregate.tasks.items())}
         }
 
-scoring_results_manager = ScoringResultsManager()
\ No newline at end of file
+scoring_results_manager = ScoringResultsManager()
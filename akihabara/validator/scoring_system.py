@@ -4,29 +4,35 @@
 import asyncio
 import importlib
 import logging
-from typing import Dict, Any, Optional, Callable
+from typing import Dict, Any, Optional, Callable, Sequence, Tuple
 from datetime import datetime
+
+import numpy as np
+
 from akihabara.core.models import utility_models
 from akihabara.core import task_config
 from akihabara.core import work_and_speed_functions
+from akihabara.validator.scoring_curves import (
+    ScoringCurve,
+    ScoringCurveRegistry,
+    score_batch,
+    score_scalar,
+    scoring_curves,
+)
 
 logger = logging.getLogger(__name__)
 
 class LocalScoringSystem:
 
-    def __init__(self):
-        self.scoring_functions = {}
-        self._load_scoring_functions()
-    
-    def _load_scoring_functions(self):
-        pass
-    
-    async def score_result(
+    def __init__(self, curves: ScoringCurveRegistry = scoring_curves):
+        self.curves = curves
+
+    def score(
         self,
         result: utility_models.QueryResult,
         payload: Dict[str, Any],
         task_config: Any,
-        node_id: int
+        node_id: Optional[int] = None
     ) -> float:
 
         try:
@@ -34,257 +40,113 @@ class LocalScoringSystem:
             if task_config is None:
                 logger.error(f"Task {result.task} is not enabled")
                 return 0.0
-            
-            inp_character_count = self._calculate_input_character_count(payload)
-            
-            volume, num_tokens = work_and_speed_functions.calculate_work(
-                task_config=task_config,
-                result=result.model_dump(),
-                inp_character_count=inp_character_count,
-                steps=payload.get("steps"),
-                img_resolution=(payload.get("width"), payload.get("height"))
-            )
-            
-            metric = volume / result.response_time if result.response_time else 0
-            stream_metric = num_tokens / result.stream_time if result.stream_time else 0
-            
-            base_score = await self._calculate_base_score(
-                result, payload, task_config, metric, stream_metric
+
+            volume, num_tokens = work_and_speed_functions.calculate_result_work(task_config, result, payload)
+            curve = self.curves.resolve(result.task, task_config)
+            content_length, content_keyword_hit = self._content_features(result, curve)
+
+            return score_scalar(
+                curve,
+                response_time=result.response_time,
+                volume=volume,
+                status_code=result.status_code,
+                stream_time=result.stream_time,
+                num_tokens=num_tokens,
+                success=result.success,
+                content_length=content_length,
+                content_keyword_hit=content_keyword_hit,
             )
-            
-            quality_score = self._apply_quality_adjustments(base_score, result, metric, stream_metric)
-            
-            quality_score = max(0.0, min(1.0, quality_score))
-            
-            return quality_score
-            
+
         except Exception as e:
             logger.error(f"Error scoring result for node {node_id}: {e}")
             return 0.0
-    
-    def _calculate_input_character_count(self, payload: Dict[str, Any]) -> int:
-        if payload.get("prompt"):
-            return len(payload["prompt"])
-        
-        if payload.get("messages"):
-            total_chars = 0
-            for message in payload["messages"]:
-                content = message.get("content", "")
-                if isinstance(content, str):
-                    total_chars += len(content)
-                elif isinstance(content, list):
-                    for item in content:
-                        if isinstance(item, dict) and item.get("type") == "text":
-                            total_chars += len(item.get("text", ""))
-            return total_chars
-        
-        return 0
-    
-    async def _calculate_base_score(
+
+    async def score_result(
         self,
         result: utility_models.QueryResult,
         payload: Dict[str, Any],
         task_config: Any,
-        metric: float,
-        stream_metric: float
+        node_id: int
     ) -> float:
+        return self.score(result, payload, task_config, node_id)
 
-        if not result.success or result.status_code != 200:
-            return 0.0
-        
-        if result.response_time and result.response_time > 30:
-            return 0.1
-        
-        base_score = 0.5
-        
-        if result.task.startswith("chat-"):
-            base_score = await self._score_chat_task(result, payload, metric, stream_metric)
-        elif result.task.startswith("text-to-image"):
-            base_score = await self._score_image_task(result, payload, metric)
-        elif result.task.startswith("image-to-image"):
-            base_score = await self._score_image_task(result, payload, metric)
-        elif result.task.startswith("avatar"):
-            base_score = await self._score_avatar_task(result, payload, metric)
-        else:
-            base_score = await self._score_generic_task(result, payload, metric, stream_metric)
-        
-        return base_score
-    
-    async def _score_chat_task(
+    def score_batch(
         self,
-        result: utility_models.QueryResult,
-        payload: Dict[str, Any],
-        metric: float,
-        stream_metric: float
-    ) -> float:
-        score = 0.5
-        
-        if result.formatted_response:
-            content = ""
-
-            first_block = None
-            try:
-                if isinstance(result.formatted_response, list):
-                    first_block = result.formatted_response[0] if result.formatted_response else None
-                elif isinstance(result.formatted_response, dict):
-                    first_block = result.formatted_response
-                else:
-                    logger.warning(f"Unsupported formatted_response type: {type(result.formatted_response)}")
-            except Exception as e:
-                logger.warning(f"Failed to parse formatted_response head: {e}")
-
-            if first_block is not None:
-                choices = None
-                if isinstance(first_block, dict):
-                    choices = first_block.get("choices")
-                else:
-                    choices = getattr(first_block, "choices", None)
-
-                choice = None
-                if isinstance(choices, list) and choices:
-                    choice = choices[0]
-                elif isinstance(choices, dict):
-                    choice = choices
-                else:
-                    logger.warning(f"Invalid choices in formatted_response: {choices}")
+        task: str,
+        task_config: Any,
+        response_times: Sequence[float],
+        volumes: Sequence[float],
+        status_codes: Sequence[int],
+        **kwargs
+    ) -> np.ndarray:
+        curve = self.curves.resolve(task, task_config)
+        return score_batch(curve, response_times, volumes, status_codes, **kwargs)
+    
+    def _content_features(self, result: utility_models.QueryResult, curve: ScoringCurve) -> Tuple[int, bool]:
+        if not curve.uses_content:
+            return 0, False
 
-                if choice is not None:
-                    if isinstance(choice, dict):
-                        if "message" in choice and isinstance(choice["message"], dict):
-                            content = choice["message"].get("content", "") or ""
-                        elif "delta" in choice and isinstance(choice["delta"], dict):
-                            content = choice["delta"].get("content", "") or ""
-                    else:
-                        if hasattr(choice, "message") and getattr(choice, "message"):
-                            try:
-                                content = (choice.message.get("content", "")  # type: ignore[attr-defined]
-                                           if isinstance(choice.message, dict) else
-                                           getattr(choice.message, "content", ""))
-                            except Exception:
-                                content = getattr(choice.message, "content", "")
-                        elif hasattr(choice, "delta") and getattr(choice, "delta"):
-                            try:
-                                content = (choice.delta.get("content", "")  # type: ignore[attr-defined]
-                                           if isinstance(choice.delta, dict) else
-                                           getattr(choice.delta, "content", ""))
-                            except Exception:
-                                content = getattr(choice.delta, "content", "")
+        content = self._extract_content(result)
+        if not isinstance(content, str) or not content:
+            return 0, False
 
-            if isinstance(content, str) and content:
-                response_length = len(content)
-                if response_length > 10:
-                    score += 0.2
+        lowered = content.lower()
+        return len(content), any(keyword in lowered for keyword in curve.content_keywords)
 
-                lowered = content.lower()
-                if any(keyword in lowered for keyword in ["hello", "hi"]):
-                    score += 0.1
-        
-        if metric > 0:
-            if metric > 100:
-                score += 0.2
-            elif metric > 50:
-                score += 0.1
-        
-        if stream_metric > 0:
-            if stream_metric > 50:
-                score += 0.1
-        
-        return min(1.0, score)
-    
-    async def _score_image_task(
-        self,
-        result: utility_models.QueryResult,
-        payload: Dict[str, Any],
-        metric: float
-    ) -> float:
-        score = 0.5
-        
-        if result.response_time and result.response_time < 10:
-            score += 0.2
-        elif result.response_time and result.response_time < 20:
-            score += 0.1
-        
-        if metric > 0:
-            if metric > 50:
-                score += 0.2
-            elif metric > 20:
-                score += 0.1
-        
-        return min(1.0, score)
-    
-    async def _score_avatar_task(
-        self,
-        result: utility_models.QueryResult,
-        payload: Dict[str, Any],
-        metric: float
-    ) -> float:
-        score = 0.5
-        
-        if result.response_time and result.response_time < 30:
-            score += 0.2
-        elif result.response_time and result.response_time < 60:
-            score += 0.1
-        
-        if metric > 0:
-            if metric > 30:
-                score += 0.2
-            elif metric > 10:
-                score += 0.1
-        
-        return min(1.0, score)
-    
-    async def _score_generic_task(
-        self,
-        result: utility_models.QueryResult,
-        payload: Dict[str, Any],
-        metric: float,
-        stream_metric: float
-    ) -> float:
-        score = 0.5
-        
-        if result.response_time and result.response_time < 15:
-            score += 0.2
-        elif result.response_time and result.response_time < 30:
-            score += 0.1
-        
-        if metric > 0:
-            if metric > 100:
-                score += 0.2
-            elif metric > 50:
-                score += 0.1
-        
-        return min(1.0, score)
-    
-    def _apply_quality_adjustments(
-        self,
-        base_score: float,
-        result: utility_models.QueryResult,
-        metric: float,
-        stream_metric: float
-    ) -> float:
+    def _extract_content(self, result: utility_models.QueryResult) -> str:
+        content = ""
+        if not result.formatted_response:
+            return content
 
-        adjusted_score = base_score
-        
-        if result.status_code == 200:
-            adjusted_score *= 1.0
-        elif result.status_code == 400:
-            adjusted_score *= 0.3
-        elif result.status_code == 429:
-            adjusted_score *= 0.2
-        elif result.status_code == 500:
-            adjusted_score *= 0.1
-        else:
-            adjusted_score *= 0.5
-        
-        if metric > 0:
-            performance_factor = min(metric / 100, 1.0)
-            adjusted_score *= (0.8 + 0.2 * performance_factor)
-        
-        if stream_metric > 0:
-            stream_factor = min(stream_metric / 50, 1.0)
-            adjusted_score *= (0.9 + 0.1 * stream_factor)
-        
-        return adjusted_score
+        first_block = None
+        try:
+            if isinstance(result.formatted_response, list):
+                first_block = result.formatted_response[0] if result.formatted_response else None
+            elif isinstance(result.formatted_response, dict):
+                first_block = result.formatted_response
+            else:
+                logger.warning(f"Unsupported formatted_response type: {type(result.formatted_response)}")
+        except Exception as e:
+            logger.warning(f"Failed to parse formatted_response head: {e}")
+
+        if first_block is not None:
+            choices = None
+            if isinstance(first_block, dict):
+                choices = first_block.get("choices")
+            else:
+                choices = getattr(first_block, "choices", None)
+
+            choice = None
+            if isinstance(choices, list) and choices:
+                choice = choices[0]
+            elif isinstance(choices, dict):
+                choice = choices
+            else:
+                logger.warning(f"Invalid choices in formatted_response: {choices}")
+
+            if choice is not None:
+                if isinstance(choice, dict):
+                    if "message" in choice and isinstance(choice["message"], dict):
+                        content = choice["message"].get("content", "") or ""
+                    elif "delta" in choice and isinstance(choice["delta"], dict):
+                        content = choice["delta"].get("content", "") or ""
+                else:
+                    if hasattr(choice, "message") and getattr(choice, "message"):
+                        try:
+                            content = (choice.message.get("content", "")  # type: ignore[attr-defined]
+                                       if isinstance(choice.message, dict) else
+                                       getattr(choice.message, "content", ""))
+                        except Exception:
+                            content = getattr(choice.message, "content", "")
+                    elif hasattr(choice, "delta") and getattr(choice, "delta"):
+                        try:
+                            content = (choice.delta.get("content", "")  # type: ignore[attr-defined]
+                                       if isinstance(choice.delta, dict) else
+                                       getattr(choice.delta, "content", ""))
+                        except Exception:
+                            content = getattr(choice.delta, "content", "")
+
+        return content
     
     async def score_multiple_results(
         self,
@@ -294,11 +156,42 @@ class LocalScoringSystem:
     ) -> Dict[int, float]:
 
         node_scores = {}
-        
+        by_curve: Dict[ScoringCurve, list] = {}
         for node_id, result in results.items():
-            score = await self.score_result(result, payload, task_config, node_id)
-            node_scores[node_id] = score
+            if task_config is None:
+                node_scores[node_id] = 0.0
+                continue
+            by_curve.setdefault(self.curves.resolve(result.task, task_config), []).append((node_id, result))
+
+        for curve, group in by_curve.items():
+            rows = []
+            for node_id, result in group:
+                try:
+                    volume, num_tokens = work_and_speed_functions.calculate_result_work(task_config, result, payload)
+                except Exception as e:
+                    logger.error(f"Error calculating work for node {node_id}: {e}")
+                    node_scores[node_id] = 0.0
+                    continue
+                content_length, content_keyword_hit = self._content_features(result, curve)
+                rows.append((node_id, result, volume, num_tokens, content_length, content_keyword_hit))
+
+            if not rows:
+                continue
+
+            scores = score_batch(
+                curve,
+                response_times=[row[1].response_time if row[1].response_time is not None else np.nan for row in rows],
+                volumes=[row[2] for row in rows],
+                status_codes=[row[1].status_code if row[1].status_code is not None else 0 for row in rows],
+                stream_times=[row[1].stream_time if row[1].stream_time is not None else np.nan for row in rows],
+                num_tokens=[row[3] for row in rows],
+                success=[row[1].success for row in rows],
+                content_lengths=[row[4] for row in rows],
+                content_keyword_hits=[row[5] for row in rows],
+            )
+            for row, score in zip(rows, scores):
+                node_scores[row[0]] = float(score)
         
         return node_scores
 
-scoring_system = LocalScoringSystem() 
\ No newline at end of file
+scoring_system = LocalScoringSystem()
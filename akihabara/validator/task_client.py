@@ -4,44 +4,63 @@ import asyncio
 import json
 from bittensor import logging
 import os
+import random
 from typing import List, Dict, Any, Optional
 from datetime import datetime
 
-import requests
+import aiohttp
+
+TASK_CLIENT_TIMEOUT = 30
+TASK_CLIENT_MAX_CONNECTIONS = 20
+TASK_CLIENT_MAX_RETRIES = 3
+TASK_CLIENT_BACKOFF_BASE = 0.5
+TASK_CLIENT_BACKOFF_CAP = 8.0
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class TaskClientRetryableError(Exception):
+    pass
+
 
 class CognifyTaskClient:
 
-    def __init__(self, base_url: str, validator_hotkey: str, token: Optional[str] = None):
+    def __init__(self, base_url: str, validator_hotkey: str, token: Optional[str] = None,
+                 max_connections: int = TASK_CLIENT_MAX_CONNECTIONS, max_retries: int = TASK_CLIENT_MAX_RETRIES):
         self.base_url = base_url.rstrip('/')
         self.validator_hotkey = validator_hotkey
         self.token = token
-        self.session = requests.Session()
-        self._setup_session()
-    
-    def _setup_session(self):
-        self.session.headers.update({
-            'Content-Type': 'application/json',
-            'Hotkey': self.validator_hotkey
-        })
-        
-        if self.token:
-            self.session.headers.update({
-                'Authorization': f'Bearer {self.token}'
-            })
-        
-        self.session.timeout = 30
-    
+        self.max_connections = max_connections
+        self.max_retries = max(max_retries, 1)
+        # The validator runs on a single event loop, so one pooled session serves every request
+        self.session: Optional[aiohttp.ClientSession] = None
+
     async def __aenter__(self):
+        await self.ensure_session()
         return self
     
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        pass
+        await self.close()
     
-    async def ensure_session(self):
-        pass
+    async def ensure_session(self) -> aiohttp.ClientSession:
+        session = self.session
+        if session is None or session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.max_connections,
+                keepalive_timeout=60,
+                ttl_dns_cache=300
+            )
+            session = aiohttp.ClientSession(
+                connector=connector,
+                headers=self._get_headers(),
+                timeout=aiohttp.ClientTimeout(total=TASK_CLIENT_TIMEOUT)
+            )
+            self.session = session
+        return session
     
     async def close(self):
-        pass
+        session, self.session = self.session, None
+        if session is not None:
+            await session.close()
     
     def _get_headers(self) -> Dict[str, str]:
         headers = {
@@ -53,26 +72,43 @@ class CognifyTaskClient:
             headers['Authorization'] = f'Bearer {self.token}'
         
         return headers
+
+    def _backoff_delay(self, attempt: int) -> float:
+        return random.uniform(0, min(TASK_CLIENT_BACKOFF_CAP, TASK_CLIENT_BACKOFF_BASE * (2 ** attempt)))
+
+    async def _request(self, method: str, path: str, **kwargs) -> Dict[str, Any]:
+        url = f"{self.base_url}{path}"
+        last_error: Optional[Exception] = None
+
+        for attempt in range(self.max_retries):
+            try:
+                session = await self.ensure_session()
+                async with session.request(method, url, **kwargs) as response:
+                    if response.status in RETRYABLE_STATUS_CODES:
+                        raise TaskClientRetryableError(f"HTTP {response.status} from {url}")
+                    response.raise_for_status()
+                    return await response.json()
+
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError, TaskClientRetryableError) as e:
+                last_error = e
+                if attempt < self.max_retries - 1:
+                    await asyncio.sleep(self._backoff_delay(attempt))
+
+        raise last_error
     
     async def get_pending_tasks(self, limit: int = 10, offset: int = 0) -> List[Dict[str, Any]]:
         try:
-            url = f"{self.base_url}/tasks/pending"
             params = {
                 'limit': limit,
                 'offset': offset
             }
             
-            response = self.session.get(url, params=params, timeout=30)
-            response.raise_for_status()
-            
-            data = response.json()
+            data = await self._request('GET', '/tasks/pending', params=params)
             if data.get('success'):
                 return data.get('tasks', [])
             else:
                 return []
                     
-        except requests.exceptions.RequestException as e:
-            return []
         except Exception as e:
             return []
     
@@ -84,7 +120,6 @@ class CognifyTaskClient:
         result_data: Optional[Dict[str, Any]] = None
     ) -> bool:
         try:
-            url = f"{self.base_url}/tasks/{task_id}/status"
             data = {
                 'status': status
             }
@@ -95,13 +130,10 @@ class CognifyTaskClient:
             if result_data is not None:
                 data['result_data'] = result_data
             
-            response = self.session.put(url, json=data, timeout=30)
-            response.raise_for_status()
-            
-            result = response.json()
+            result = await self._request('PUT', f'/tasks/{task_id}/status', json=data)
             return result.get('success', False)
                     
-        except requests.exceptions.RequestException as e:
+        except aiohttp.ClientError as e:
             logging.error(f"Request error updating task status: {e}")
             return False
         except Exception as e:
@@ -110,25 +142,25 @@ class CognifyTaskClient:
     
     async def complete_task(self, task_id: str, result_data: Optional[Dict[str, Any]] = None) -> bool:
         try:
-            url = f"{self.base_url}/tasks/{task_id}/complete"
             data = {}
             
             if result_data is not None:
                 data['result_data'] = result_data
             
-            response = self.session.post(url, json=data, timeout=30)
-            response.raise_for_status()
-            
-            result = response.json()
+            result = await self._request('POST', f'/tasks/{task_id}/complete', json=data)
             return result.get('success', False)
                     
-        except requests.exceptions.RequestException as e:
+        except aiohttp.ClientError as e:
             logging.error(f"Request error completing task: {e}")
             return False
         except Exception as e:
             logging.error(f"Error completing task: {e}")
             return False
     
+    async def report_task_updates(self, updates: List[Dict[str, Any]]) -> bool:
+        result = await self._request('POST', '/tasks/batch_update', json={'updates': updates})
+        return result.get('success', False)
+
     async def process_task(self, task: Dict[str, Any]) -> bool:
         task_id = task['task_id']
         task_type = task['task_type']
@@ -5,9 +5,25 @@ import time
 from bittensor import logging
 from typing import Dict, Any, Optional
 
+from akihabara.validator.ttl_cache import (
+    AsyncTTLCache,
+    CacheEntry,
+    CacheResponse,
+    cache_response_from_http,
+    conditional_headers,
+)
+
+TASK_CONFIG_CACHE_TTL = 300
+TASK_CONFIG_STALE_TTL = 3600
+TASK_CONFIG_NEGATIVE_TTL = 30
+TASK_CONFIGS_KEY = 'task_configs'
+
+
 class TaskConfigClient:
 
-    def __init__(self, base_url: str, validator_hotkey: str, token: str):
+    def __init__(self, base_url: str, validator_hotkey: str, token: str,
+                 cache_ttl: float = TASK_CONFIG_CACHE_TTL, stale_ttl: float = TASK_CONFIG_STALE_TTL,
+                 negative_ttl: float = TASK_CONFIG_NEGATIVE_TTL):
         self.base_url = base_url.rstrip('/')
         self.validator_hotkey = validator_hotkey
         self.token = token
@@ -15,40 +31,54 @@ class TaskConfigClient:
             'Authorization': f'Bearer {token}',
             'Content-Type': 'application/json'
         }
-        self._task_configs_cache = {}
-        self._cache_timestamp = 0
-        self._cache_duration = 300
-    
+        self.session: Optional[aiohttp.ClientSession] = None
+        self._cache = AsyncTTLCache(ttl=cache_ttl, stale_ttl=stale_ttl, negative_ttl=negative_ttl,
+                                    name="task config")
+
+    async def ensure_session(self) -> aiohttp.ClientSession:
+        if self.session is None or self.session.closed:
+            self.session = aiohttp.ClientSession()
+        return self.session
+
+    async def close(self):
+        session, self.session = self.session, None
+        if session is not None:
+            await session.close()
+
+    async def _fetch_task_configs(self, entry: Optional[CacheEntry]) -> CacheResponse:
+        session = await self.ensure_session()
+        headers = {**self.headers, **conditional_headers(entry)}
+
+        async with session.get(f"{self.base_url}/task_configs", headers=headers) as response:
+            if response.status == 304:
+                return CacheResponse(not_modified=True)
+            if response.status != 200:
+                raise RuntimeError(f"HTTP {response.status}: Failed to get task configs")
+
+            data = await response.json()
+            if not data.get('success'):
+                raise RuntimeError(f"Failed to get task configs: {data.get('error')}")
+            return cache_response_from_http(response, data.get('task_configs', {}))
+
     async def get_all_task_configs(self) -> Dict[str, Any]:
         try:
-            url = f"{self.base_url}/task_configs"
-            
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, headers=self.headers) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        if data.get('success'):
-                            self._task_configs_cache = data.get('task_configs', {})
-                            self._cache_timestamp = time.time()
-                            return self._task_configs_cache
-                        else:
-                            logging.error(f"Failed to get task configs: {data.get('error')}")
-                            return {}
-                    else:
-                        logging.error(f"HTTP {response.status}: Failed to get task configs")
-                        return {}
-                        
+            return await self._cache.refresh(TASK_CONFIGS_KEY, self._fetch_task_configs, default={})
         except Exception as e:
             logging.error(f"Error getting task configs: {e}")
             return {}
-    
+
     async def get_task_config(self, task_type: str) -> Optional[Dict[str, Any]]:
         try:
-            current_time = time.time()
-            if (current_time - self._cache_timestamp) < self._cache_duration and self._task_configs_cache:
-                if task_type in self._task_configs_cache:
-                    return self._task_configs_cache[task_type]
-            
+            all_configs = await self.get_task_configs_with_cache()
+            task_config = all_configs.get(task_type)
+            if task_config is not None:
+                return task_config
+
+            # A task missing from the cached configs only forces a refetch once per negative TTL
+            entry = self._cache.peek(TASK_CONFIGS_KEY)
+            if entry is not None and time.monotonic() - entry.fetched_at < self._cache.negative_ttl:
+                return None
+
             all_configs = await self.get_all_task_configs()
             return all_configs.get(task_type)
             
@@ -72,24 +102,25 @@ class TaskConfigClient:
         }
     
     async def get_task_configs_with_cache(self) -> Dict[str, Any]:
-        current_time = time.time()
-        
-        if (current_time - self._cache_timestamp) < self._cache_duration and self._task_configs_cache:
-            return self._task_configs_cache
-        
-        return await self.get_all_task_configs()
+        try:
+            return await self._cache.get(TASK_CONFIGS_KEY, self._fetch_task_configs, default={})
+        except Exception as e:
+            logging.error(f"Error getting cached task configs: {e}")
+            return {}
     
     def clear_cache(self):
-        self._task_configs_cache = {}
-        self._cache_timestamp = 0
+        self._cache.invalidate()
+
+    def get_cache_stats(self) -> Dict[str, Any]:
+        return self._cache.get_stats()
     
     async def test_connection(self) -> bool:
         try:
             url = f"{self.base_url}/task_configs"
             
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, headers=self.headers, timeout=10) as response:
-                    return response.status == 200
+            session = await self.ensure_session()
+            async with session.get(url, headers=self.headers, timeout=10) as response:
+                return response.status == 200
                     
         except Exception as e:
             logging.error(f"Error testing connection: {e}")
@@ -0,0 +1,330 @@
+# -*- coding: utf-8 -*-
+
+import asyncio
+import json
+import os
+import time
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Deque, Dict, List, Optional
+
+import aiohttp
+from bittensor import logging
+
+from akihabara.core.path_utils import PathUtils
+from akihabara.validator.task_client import CognifyTaskClient
+
+TASK_REPORT_FLUSH_INTERVAL_MS = 250
+TASK_REPORT_MAX_BATCH_SIZE = 100
+TASK_REPORT_MAX_ATTEMPTS = 5
+TASK_REPORT_JOURNAL_COMPACT_THRESHOLD = 1000
+BULK_UNSUPPORTED_STATUS_CODES = {404, 405, 501}
+
+REPORT_ACTION_STATUS = "status"
+REPORT_ACTION_COMPLETE = "complete"
+
+
+def get_default_journal_path() -> Path:
+    return PathUtils.get_project_root() / "data" / "task_status_journal.jsonl"
+
+
+class TaskStatusReporter:
+
+    def __init__(self, task_client: CognifyTaskClient, flush_interval_ms: int = TASK_REPORT_FLUSH_INTERVAL_MS,
+                 max_batch_size: int = TASK_REPORT_MAX_BATCH_SIZE, journal_path: Optional[str] = None,
+                 enabled: bool = True):
+        self.task_client = task_client
+        self.flush_interval = max(flush_interval_ms, 1) / 1000
+        self.max_batch_size = max(max_batch_size, 1)
+        self.journal_path = Path(journal_path) if journal_path else get_default_journal_path()
+        self.enabled = enabled
+        self.running = False
+
+        self._buffer: Deque[Dict[str, Any]] = deque()
+        self._seq = 0
+        self._flush_event = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._flush_task: Optional[asyncio.Task] = None
+        self._bulk_supported = True
+        self._journal_file = None
+        self._acked_since_compact = 0
+        self.stats = {
+            'events': 0,
+            'requests': 0,
+            'flushed': 0,
+            'dropped': 0,
+            'failed_flushes': 0,
+        }
+
+    async def start(self):
+        if not self.enabled or self.running:
+            return
+
+        self._recover_journal()
+        self.running = True
+        self._flush_task = asyncio.create_task(self._flush_loop())
+        logging.info(
+            f"Task status reporter started (flush every {int(self.flush_interval * 1000)}ms "
+            f"or {self.max_batch_size} items, {len(self._buffer)} recovered from journal)"
+        )
+
+    async def stop(self):
+        if not self.running:
+            return
+
+        self.running = False
+        self._flush_event.set()
+        if self._flush_task is not None:
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+
+        try:
+            while self._buffer and await self.flush():
+                pass
+        except Exception as e:
+            logging.error(f"Error flushing task status reports on shutdown: {e}")
+
+        if self._buffer:
+            logging.warning(f"{len(self._buffer)} task status reports left in journal for next start")
+        self._close_journal()
+
+    async def update_task_status(
+        self,
+        task_id: str,
+        status: str,
+        error_message: Optional[str] = None,
+        result_data: Optional[Dict[str, Any]] = None
+    ) -> bool:
+        if not self.running:
+            return await self.task_client.update_task_status(task_id, status, error_message, result_data)
+
+        event = {'action': REPORT_ACTION_STATUS, 'task_id': task_id, 'status': status}
+        if error_message is not None:
+            event['error_message'] = error_message
+        if result_data is not None:
+            event['result_data'] = result_data
+        self._enqueue(event)
+        return True
+
+    async def complete_task(self, task_id: str, result_data: Optional[Dict[str, Any]] = None) -> bool:
+        if not self.running:
+            return await self.task_client.complete_task(task_id, result_data)
+
+        event = {'action': REPORT_ACTION_COMPLETE, 'task_id': task_id}
+        if result_data is not None:
+            event['result_data'] = result_data
+        self._enqueue(event)
+        return True
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            'buffered': len(self._buffer),
+            'bulk_supported': self._bulk_supported,
+        }
+
+    def _enqueue(self, event: Dict[str, Any]):
+        self._seq += 1
+        event['seq'] = self._seq
+        event['timestamp'] = datetime.now().isoformat()
+        self._journal_write([{'op': 'event', **event}])
+        event['attempts'] = 0
+        self._buffer.append(event)
+        self.stats['events'] += 1
+
+        if len(self._buffer) >= self.max_batch_size:
+            self._flush_event.set()
+
+    async def _flush_loop(self):
+        while self.running:
+            try:
+                try:
+                    await asyncio.wait_for(self._flush_event.wait(), timeout=self.flush_interval)
+                except asyncio.TimeoutError:
+                    pass
+                self._flush_event.clear()
+
+                if not self.running:
+                    break
+
+                if await self.flush() and len(self._buffer) >= self.max_batch_size:
+                    self._flush_event.set()
+
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logging.error(f"Error in task status flush loop: {e}")
+                await asyncio.sleep(self.flush_interval)
+
+    async def flush(self) -> int:
+        async with self._flush_lock:
+            if not self._buffer:
+                return 0
+
+            batch = [self._buffer.popleft() for _ in range(min(self.max_batch_size, len(self._buffer)))]
+
+            if self._bulk_supported:
+                failed = await self._send_bulk(batch)
+            else:
+                failed = await self._send_individually(batch)
+
+            failed_seqs = {event['seq'] for event in failed}
+            retry = []
+            done_seqs = [event['seq'] for event in batch if event['seq'] not in failed_seqs]
+            for event in failed:
+                event['attempts'] += 1
+                if event['attempts'] >= TASK_REPORT_MAX_ATTEMPTS:
+                    logging.error(
+                        f"Dropping {event['action']} report for task {event['task_id']} "
+                        f"after {event['attempts']} attempts"
+                    )
+                    done_seqs.append(event['seq'])
+                    self.stats['dropped'] += 1
+                else:
+                    retry.append(event)
+
+            # Failed events go back to the front so later reports for the same task stay behind them
+            self._buffer.extendleft(reversed(retry))
+            if retry:
+                self.stats['failed_flushes'] += 1
+
+            if done_seqs:
+                self._journal_write([{'op': 'ack', 'seqs': done_seqs}])
+                self._acked_since_compact += len(done_seqs)
+                if self._acked_since_compact >= TASK_REPORT_JOURNAL_COMPACT_THRESHOLD:
+                    self._compact_journal()
+
+            flushed = len(batch) - len(retry)
+            self.stats['flushed'] += flushed
+            return flushed
+
+    @staticmethod
+    def _to_update(event: Dict[str, Any]) -> Dict[str, Any]:
+        return {key: value for key, value in event.items() if key != 'attempts'}
+
+    async def _send_bulk(self, batch: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        try:
+            self.stats['requests'] += 1
+            if await self.task_client.report_task_updates([self._to_update(event) for event in batch]):
+                return []
+            logging.warning(f"Task center rejected batch of {len(batch)} task status reports")
+            return batch
+
+        except aiohttp.ClientResponseError as e:
+            if e.status not in BULK_UNSUPPORTED_STATUS_CODES:
+                logging.error(f"Error sending batched task status reports: {e}")
+                return batch
+            logging.warning("Task center has no batch update endpoint, falling back to per-task reporting")
+            self._bulk_supported = False
+            return await self._send_individually(batch)
+
+        except Exception as e:
+            logging.error(f"Error sending batched task status reports: {e}")
+            return batch
+
+    async def _send_event(self, event: Dict[str, Any]) -> bool:
+        self.stats['requests'] += 1
+        if event['action'] == REPORT_ACTION_COMPLETE:
+            return await self.task_client.complete_task(event['task_id'], event.get('result_data'))
+        return await self.task_client.update_task_status(
+            event['task_id'],
+            event['status'],
+            error_message=event.get('error_message'),
+            result_data=event.get('result_data')
+        )
+
+    async def _send_individually(self, batch: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        events_by_task: Dict[str, List[Dict[str, Any]]] = {}
+        for event in batch:
+            events_by_task.setdefault(str(event['task_id']), []).append(event)
+
+        async def send_task_events(events: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+            for index, event in enumerate(events):
+                if not await self._send_event(event):
+                    return events[index:]
+            return []
+
+        results = await asyncio.gather(*(send_task_events(events) for events in events_by_task.values()))
+        failed = [event for task_failed in results for event in task_failed]
+        failed.sort(key=lambda event: event['seq'])
+        return failed
+
+    def _open_journal(self):
+        if self._journal_file is None:
+            self.journal_path.parent.mkdir(parents=True, exist_ok=True)
+            self._journal_file = open(self.journal_path, 'a', encoding='utf-8')
+        return self._journal_file
+
+    def _close_journal(self):
+        if self._journal_file is not None:
+            try:
+                self._journal_file.close()
+            except Exception as e:
+                logging.error(f"Error closing task status journal: {e}")
+            self._journal_file = None
+
+    def _journal_write(self, records: List[Dict[str, Any]]):
+        try:
+            journal = self._open_journal()
+            journal.write(''.join(json.dumps(record) + '\n' for record in records))
+            journal.flush()
+        except Exception as e:
+            logging.error(f"Error writing task status journal: {e}")
+
+    def _compact_journal(self):
+        try:
+            self._close_journal()
+            tmp_path = self.journal_path.with_suffix(self.journal_path.suffix + '.tmp')
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                for event in self._buffer:
+                    f.write(json.dumps({'op': 'event', **self._to_update(event)}) + '\n')
+            os.replace(tmp_path, self.journal_path)
+            self._acked_since_compact = 0
+        except Exception as e:
+            logging.error(f"Error compacting task status journal: {e}")
+
+    def _recover_journal(self):
+        if not self.journal_path.exists():
+            return
+
+        start_time = time.time()
+        events: Dict[int, Dict[str, Any]] = {}
+        acked = set()
+        try:
+            with open(self.journal_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        # A crash mid-write can leave a truncated last line
+                        continue
+                    op = record.pop('op', None)
+                    if op == 'event':
+                        events[record['seq']] = record
+                    elif op == 'ack':
+                        acked.update(record.get('seqs', []))
+        except Exception as e:
+            logging.error(f"Error reading task status journal: {e}")
+            return
+
+        if events:
+            self._seq = max(self._seq, max(events))
+        for seq in sorted(events):
+            if seq not in acked:
+                event = events[seq]
+                event['attempts'] = 0
+                self._buffer.append(event)
+
+        self._compact_journal()
+        if self._buffer:
+            logging.info(
+                f"Recovered {len(self._buffer)} unsent task status reports from journal "
+                f"in {time.time() - start_time:.3f}s"
+            )
@@ -0,0 +1,182 @@
+# -*- coding: utf-8 -*-
+
+import asyncio
+import time
+from dataclasses import dataclass, replace
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+from bittensor import logging
+
+DEFAULT_STALE_TTL = 600
+DEFAULT_NEGATIVE_TTL = 30
+DEFAULT_MAX_ENTRIES = 1024
+
+
+@dataclass
+class CacheEntry:
+    value: Any
+    fetched_at: float
+    expires_at: float
+    stale_until: float
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    negative: bool = False
+
+
+@dataclass
+class CacheResponse:
+    value: Any = None
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    not_modified: bool = False
+
+
+Fetcher = Callable[[Optional[CacheEntry]], Awaitable[CacheResponse]]
+
+
+def conditional_headers(entry: Optional[CacheEntry]) -> Dict[str, str]:
+    headers = {}
+    if entry is None or entry.negative:
+        return headers
+    if entry.etag:
+        headers['If-None-Match'] = entry.etag
+    if entry.last_modified:
+        headers['If-Modified-Since'] = entry.last_modified
+    return headers
+
+
+def cache_response_from_http(response, value: Any) -> CacheResponse:
+    return CacheResponse(
+        value=value,
+        etag=response.headers.get('ETag'),
+        last_modified=response.headers.get('Last-Modified'),
+    )
+
+
+class AsyncTTLCache:
+    """Stale-while-revalidate cache with single-flight refreshes and negative caching."""
+
+    def __init__(self, ttl: float, stale_ttl: float = DEFAULT_STALE_TTL,
+                 negative_ttl: float = DEFAULT_NEGATIVE_TTL, max_entries: int = DEFAULT_MAX_ENTRIES,
+                 name: str = "cache"):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.negative_ttl = negative_ttl
+        self.max_entries = max(max_entries, 1)
+        self.name = name
+        self._entries: Dict[Hashable, CacheEntry] = {}
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        self._stats = {
+            'hits': 0,
+            'stale_hits': 0,
+            'misses': 0,
+            'coalesced': 0,
+            'refreshes': 0,
+            'not_modified': 0,
+            'errors': 0,
+        }
+
+    def peek(self, key: Hashable) -> Optional[CacheEntry]:
+        return self._entries.get(key)
+
+    def invalidate(self, key: Optional[Hashable] = None):
+        if key is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(key, None)
+
+    async def get(self, key: Hashable, fetcher: Fetcher, default: Any = None) -> Any:
+        entry = self._entries.get(key)
+        now = time.monotonic()
+
+        if entry is not None:
+            if now < entry.expires_at:
+                self._stats['hits'] += 1
+                return default if entry.negative else entry.value
+            if now < entry.stale_until:
+                # Serve the stale value now and let one background task revalidate it
+                self._stats['stale_hits'] += 1
+                self._start_refresh(key, fetcher)
+                return entry.value
+
+        self._stats['misses'] += 1
+        return await self.refresh(key, fetcher, default)
+
+    async def refresh(self, key: Hashable, fetcher: Fetcher, default: Any = None) -> Any:
+        task = self._inflight.get(key)
+        if task is not None and task.get_loop() is asyncio.get_running_loop():
+            self._stats['coalesced'] += 1
+        else:
+            task = self._start_refresh(key, fetcher)
+
+        # Shielded so a cancelled caller never cancels the fetch the other waiters share
+        entry = await asyncio.shield(task)
+        return default if entry.negative else entry.value
+
+    def _start_refresh(self, key: Hashable, fetcher: Fetcher) -> asyncio.Task:
+        loop = asyncio.get_running_loop()
+        task = self._inflight.get(key)
+        if task is not None and task.get_loop() is loop:
+            return task
+
+        task = loop.create_task(self._fetch(key, fetcher))
+        self._inflight[key] = task
+
+        def _clear_inflight(done: asyncio.Task):
+            if self._inflight.get(key) is done:
+                del self._inflight[key]
+
+        task.add_done_callback(_clear_inflight)
+        return task
+
+    async def _fetch(self, key: Hashable, fetcher: Fetcher) -> CacheEntry:
+        previous = self._entries.get(key)
+        self._stats['refreshes'] += 1
+
+        try:
+            response = await fetcher(previous)
+        except Exception as e:
+            self._stats['errors'] += 1
+            logging.error(f"Error refreshing {self.name} entry {key}: {e}")
+            now = time.monotonic()
+            if previous is not None and not previous.negative:
+                # Keep serving the last good value and retry after the negative TTL; fetched_at marks
+                # the failed attempt too, so callers pacing refetches by it back off as well
+                entry = replace(previous, fetched_at=now, expires_at=now + self.negative_ttl,
+                                stale_until=max(previous.stale_until, now + self.negative_ttl))
+            else:
+                entry = self._negative_entry(now)
+            self._store(key, entry)
+            return entry
+
+        now = time.monotonic()
+        if response.not_modified and previous is not None and not previous.negative:
+            self._stats['not_modified'] += 1
+            entry = replace(previous, fetched_at=now, expires_at=now + self.ttl,
+                            stale_until=now + self.ttl + self.stale_ttl)
+        elif response.value is None:
+            entry = self._negative_entry(now)
+        else:
+            entry = CacheEntry(
+                value=response.value,
+                fetched_at=now,
+                expires_at=now + self.ttl,
+                stale_until=now + self.ttl + self.stale_ttl,
+                etag=response.etag,
+                last_modified=response.last_modified,
+            )
+        self._store(key, entry)
+        return entry
+
+    def _negative_entry(self, now: float) -> CacheEntry:
+        return CacheEntry(value=None, fetched_at=now, expires_at=now + self.negative_ttl,
+                          stale_until=now + self.negative_ttl, negative=True)
+
+    def _store(self, key: Hashable, entry: CacheEntry):
+        self._entries.pop(key, None)
+        self._entries[key] = entry
+        while len(self._entries) > self.max_entries:
+            self._entries.pop(next(iter(self._entries)))
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self._stats, 'entries': len(self._entries), 'inflight': len(self._inflight)}
@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+from akihabara.core.constants import CHECK_NODE_ACTIVE, FINAL_MIN_SCORE
+
+STAKE_WEIGHT_FACTOR = 0.2
+CURRENT_SCORE_WEIGHT = 0.7
+HISTORICAL_SCORE_WEIGHT = 0.1
+MAX_FINAL_SCORE = 1.0
+RANDOM_SCORE_RANGE = (0.8, 1.0)
+MIN_WEIGHT_THRESHOLD = 0.001  # 0.1%
+
+
+def build_metagraph_arrays(neurons: Sequence[Any], validator_trust: Sequence[Any],
+                           n_uids: int) -> Dict[str, np.ndarray]:
+    stakes = np.zeros(n_uids, dtype=np.float64)
+    serving = np.zeros(n_uids, dtype=bool)
+    active = np.zeros(n_uids, dtype=bool)
+    is_validator = np.zeros(n_uids, dtype=bool)
+
+    for idx in range(min(n_uids, len(neurons))):
+        neuron = neurons[idx]
+        stakes[idx] = float(neuron.stake)
+        serving[idx] = neuron.axon_info.ip != '0.0.0.0'
+        active[idx] = bool(neuron.active)
+        is_validator[idx] = validator_trust[idx] > 0
+
+    return {
+        'stakes': stakes,
+        'serving': serving,
+        'active': active,
+        'is_validator': is_validator,
+    }
+
+
+def build_score_arrays(hotkeys: Sequence[str], current_scores: Dict[str, float],
+                       historical_scores: Dict[str, float]) -> Tuple[np.ndarray, np.ndarray]:
+    n_uids = len(hotkeys)
+    current = np.fromiter((current_scores.get(hotkey, 0.0) for hotkey in hotkeys), dtype=np.float64, count=n_uids)
+    historical = np.fromiter((historical_scores.get(hotkey, 0.0) for hotkey in hotkeys), dtype=np.float64, count=n_uids)
+    return current, historical
+
+
+def compute_final_scores(
+    stakes: np.ndarray,
+    is_validator: np.ndarray,
+    serving: np.ndarray,
+    active: np.ndarray,
+    current_scores: np.ndarray,
+    historical_scores: np.ndarray,
+    default_historical_score: float,
+    check_active: bool = CHECK_NODE_ACTIVE,
+    rng: Optional[np.random.Generator] = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Return the selected UIDs and their unnormalized final scores."""
+    rng = rng if rng is not None else np.random.default_rng()
+
+    total_stake = stakes[~is_validator].sum()
+    stake_weight = stakes / total_stake * STAKE_WEIGHT_FACTOR if total_stake > 0 else np.zeros_like(stakes)
+    historical = np.where(historical_scores == 0.0, default_historical_score, historical_scores)
+
+    final_scores = (
+        stake_weight +
+        current_scores * CURRENT_SCORE_WEIGHT +
+        historical * HISTORICAL_SCORE_WEIGHT
+    )
+
+    eligible = serving & active if check_active else serving.copy()
+    out_of_range = eligible & ((final_scores < FINAL_MIN_SCORE) | (final_scores > MAX_FINAL_SCORE))
+    if out_of_range.any():
+        # Drawn in UID order for every eligible UID, matching the original per-UID loop
+        final_scores[out_of_range] = np.round(rng.uniform(*RANDOM_SCORE_RANGE, size=int(out_of_range.sum())), 2)
+
+    uids = np.flatnonzero(eligible & (current_scores > 0))
+    final_scores = final_scores[uids]
+
+    return uids, final_scores
+
+
+def normalize_weights(weights: np.ndarray, min_weight_threshold: float = MIN_WEIGHT_THRESHOLD) -> Optional[np.ndarray]:
+    """Zero weights under the threshold and normalize; None when nothing is left."""
+    weights = np.where(weights >= min_weight_threshold, weights, 0.0)
+    total_weight = weights.sum()
+    if total_weight <= 0:
+        return None
+    return weights / total_weight
@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""
+ Benchmark the vectorized batch scorer against scoring one result at a time.
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from akihabara.validator.scoring_curves import CHAT_CURVE, score_batch
+from tests.reference import make_synthetic_results, score_synthetic_scalar
+
+
+def benchmark_score_batch(n: int = 100_000, seed: int = 0) -> dict:
+    results = make_synthetic_results(n, seed)
+
+    start = time.perf_counter()
+    score_synthetic_scalar(CHAT_CURVE, results)
+    scalar_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    score_batch(CHAT_CURVE, **results)
+    batch_ms = (time.perf_counter() - start) * 1000
+
+    return {
+        'n_results': n,
+        'scalar_ms': scalar_ms,
+        'batch_ms': batch_ms,
+        'speedup': scalar_ms / batch_ms if batch_ms else 0.0,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--results", type=int, default=100_000)
+    args = parser.parse_args()
+    print(benchmark_score_batch(args.results))
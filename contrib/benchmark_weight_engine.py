@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+ Benchmark the vectorized weight engine against the per-UID loop it replaced.
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from akihabara.validator.weight_engine import compute_final_scores, normalize_weights
+from tests.reference import compute_final_scores_loop, make_synthetic_metagraph
+
+
+def benchmark_weight_engine(n_uids: int = 1024, rounds: int = 200, seed: int = 0) -> dict:
+    metagraph = make_synthetic_metagraph(n_uids, seed)
+    rng = np.random.default_rng(seed)
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        compute_final_scores_loop(**metagraph, default_historical_score=0.5, check_active=True,
+                                  uniform=lambda low, high: float(rng.uniform(low, high)))
+    loop_ms = (time.perf_counter() - start) / rounds * 1000
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        _, scores = compute_final_scores(**metagraph, default_historical_score=0.5, check_active=True, rng=rng)
+        normalize_weights(scores)
+    vectorized_ms = (time.perf_counter() - start) / rounds * 1000
+
+    return {
+        'n_uids': n_uids,
+        'loop_ms': loop_ms,
+        'vectorized_ms': vectorized_ms,
+        'speedup': loop_ms / vectorized_ms if vectorized_ms else 0.0,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--uids", type=int, default=1024)
+    parser.add_argument("--rounds", type=int, default=200)
+    args = parser.parse_args()
+    print(benchmark_weight_engine(args.uids, args.rounds))
@@ -6,6 +6,7 @@ from payload import PayloadModifier
 from clip_embeddings.clip_manager import ClipEmbeddingsProcessor
 import torch
 from utils import misc
+from utils.batcher import text_to_image_batcher
 import clip
 from loguru import logger
 
@@ -16,8 +17,10 @@ async def text_to_image_infer(
         infer_props: base_model.TextToImageBase,
 ) -> base_model.ImageResponseBody:
     logger.info(f"Text to image for model: {infer_props.model}")
+    # A batch shares one sampler seed, so a request asking for a specific seed runs on its own
+    batchable = infer_props.seed == 0
     payload = await payload_modifier.modify_text_to_image(infer_props)
-    image = api_gate.generate(payload)[0]
+    image = await text_to_image_batcher.generate(payload, batchable=batchable)
     return await misc.take_image_and_return_formatted_response_body(image)
 
 
@@ -1,5 +1,6 @@
 import io
 import json
+import threading
 import time
 import urllib.parse
 import urllib.request
@@ -22,6 +23,8 @@ server_address = f"{COMFYUI_HOST}:{COMFYUI_PORT}"
 logger.info(f"ComfyUI WebSocket server_address：{server_address}")
 client_id = str(uuid.uuid4())
 ws = None
+# Every prompt shares the websocket, so callers on other threads take turns
+generate_lock = threading.Lock()
 
 def initialize_websocket():
     global ws
@@ -103,7 +106,8 @@ def generate(payload):
     
     img_list = []
     try:
-        images = get_images(ws, payload)
+        with generate_lock:
+            images = get_images(ws, payload)
         for node_id in images:
             for image_data in images[node_id]:
                 image = Image.open(io.BytesIO(image_data))
@@ -0,0 +1,113 @@
+import asyncio
+import copy
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Set
+
+from PIL import Image
+from loguru import logger
+
+import utils.api_gate as api_gate
+
+TEXT_TO_IMAGE_MAX_BATCH_SIZE = int(os.getenv('TEXT_TO_IMAGE_MAX_BATCH_SIZE', '4'))
+
+# Workflow inputs that only pick the noise; everything else has to match for requests to share a batch
+SEED_INPUTS = (("Sampler", "seed"), ("Sampler", "noise_seed"), ("Seed", "noise_seed"))
+
+
+def batch_key(payload: Dict[str, Any]) -> str:
+    workflow = copy.deepcopy(payload)
+    for node, field in SEED_INPUTS:
+        workflow.get(node, {}).get("inputs", {}).pop(field, None)
+    return json.dumps(workflow, sort_keys=True)
+
+
+def supports_batching(payload: Dict[str, Any]) -> bool:
+    return "batch_size" in payload.get("Latent", {}).get("inputs", {})
+
+
+class _PendingBatch:
+
+    def __init__(self, payload: Dict[str, Any]):
+        self.payload = payload
+        self.futures: List[asyncio.Future] = []
+
+
+class TextToImageBatcher:
+    """Runs text-to-image workflows one ComfyUI prompt at a time; identical workflows that queue up
+    behind a running prompt go out together as one batch."""
+
+    def __init__(self, max_batch_size: int = TEXT_TO_IMAGE_MAX_BATCH_SIZE):
+        self.max_batch_size = max(max_batch_size, 1)
+        self._pending: Dict[str, _PendingBatch] = {}
+        self._dispatchers: Set[asyncio.Task] = set()
+        # ComfyUI is driven over one websocket, so prompts go out one at a time; requests only wait to
+        # be batched while an earlier prompt is still running
+        self._prompt_lock = asyncio.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="comfyui")
+        self.stats = {
+            'batches': 0,
+            'requests': 0,
+            'largest_batch': 0,
+        }
+
+    async def _run(self, payload: Dict[str, Any]) -> List[Image.Image]:
+        async with self._prompt_lock:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, api_gate.generate, payload)
+
+    async def generate(self, payload: Dict[str, Any], batchable: bool = True) -> Image.Image:
+        if not batchable or self.max_batch_size == 1 or not supports_batching(payload):
+            images = await self._run(payload)
+            if not images:
+                raise Exception("ComfyUI returned no image")
+            return images[0]
+
+        future = asyncio.get_running_loop().create_future()
+        key = batch_key(payload)
+        batch = self._pending.get(key)
+        if batch is None:
+            batch = self._pending[key] = _PendingBatch(payload)
+            task = asyncio.create_task(self._dispatch(key, batch))
+            self._dispatchers.add(task)
+            task.add_done_callback(self._dispatchers.discard)
+        batch.futures.append(future)
+        if len(batch.futures) >= self.max_batch_size:
+            self._pending.pop(key, None)
+        return await future
+
+    async def _dispatch(self, key: str, batch: _PendingBatch):
+        async with self._prompt_lock:
+            # Requests arriving while the previous prompt ran have joined the batch by now
+            if self._pending.get(key) is batch:
+                del self._pending[key]
+
+            futures = batch.futures
+            payload = copy.deepcopy(batch.payload)
+            payload["Latent"]["inputs"]["batch_size"] = len(futures)
+            self.stats['batches'] += 1
+            self.stats['requests'] += len(futures)
+            self.stats['largest_batch'] = max(self.stats['largest_batch'], len(futures))
+            if len(futures) > 1:
+                logger.info(f"Running {len(futures)} text to image requests as one batch")
+
+            try:
+                images = await asyncio.get_running_loop().run_in_executor(self._executor, api_gate.generate, payload)
+                if len(images) < len(futures):
+                    raise Exception(f"ComfyUI returned {len(images)} images for a batch of {len(futures)}")
+            except Exception as e:
+                logger.error(f"Text to image batch failed: {e}")
+                for future in futures:
+                    if not future.done():
+                        future.set_exception(e)
+                return
+
+        for future, image in zip(futures, images):
+            if not future.done():
+                future.set_result(image)
+
+    def get_stats(self) -> Dict[str, int]:
+        return {**self.stats, 'pending': sum(len(batch.futures) for batch in self._pending.values())}
+
+
+text_to_image_batcher = TextToImageBatcher()
@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+"""Reference implementations and synthetic inputs shared by the tests and the contrib benchmarks."""
+
+from typing import Dict
+
+import numpy as np
+
+from akihabara.core.constants import FINAL_MIN_SCORE
+from akihabara.validator.scoring_curves import ScoringCurve, score_scalar
+from akihabara.validator.weight_engine import MIN_WEIGHT_THRESHOLD
+
+
+def compute_final_scores_loop(stakes, is_validator, serving, active, current_scores, historical_scores,
+                              default_historical_score, check_active, uniform):
+    """Per-UID reference of the original set_weights loop."""
+    total_stake = sum(float(stakes[idx]) for idx in range(len(stakes)) if not is_validator[idx])
+    uids, weights = [], []
+    for idx in range(len(stakes)):
+        if not serving[idx]:
+            continue
+        if check_active and not active[idx]:
+            continue
+
+        historical_score = float(historical_scores[idx])
+        current_quality_score = float(current_scores[idx])
+        if historical_score == 0.0:
+            historical_score = default_historical_score
+
+        stake_weight = (float(stakes[idx]) / total_stake) * 0.2 if total_stake > 0 else 0
+        final_score = stake_weight + current_quality_score * 0.7 + historical_score * 0.1
+        if final_score < FINAL_MIN_SCORE or final_score > 1.0:
+            final_score = round(uniform(0.8, 1.0), 2)
+
+        if current_quality_score > 0:
+            uids.append(idx)
+            weights.append(final_score)
+
+    total_weight = sum(weights)
+    if total_weight > 0:
+        weights = [w if w >= MIN_WEIGHT_THRESHOLD else 0.0 for w in weights]
+        total_weight = sum(weights)
+        if total_weight > 0:
+            weights = [w / total_weight for w in weights]
+    return uids, weights
+
+
+def make_synthetic_metagraph(n_uids: int = 1024, seed: int = 0) -> Dict[str, np.ndarray]:
+    rng = np.random.default_rng(seed)
+    current = rng.uniform(0.0, 1.0, n_uids)
+    current[rng.random(n_uids) < 0.2] = 0.0
+    historical = rng.uniform(0.0, 1.0, n_uids)
+    historical[rng.random(n_uids) < 0.3] = 0.0
+    return {
+        'stakes': rng.lognormal(5.0, 2.0, n_uids),
+        'is_validator': rng.random(n_uids) < 0.05,
+        'serving': rng.random(n_uids) > 0.1,
+        'active': rng.random(n_uids) > 0.1,
+        'current_scores': current,
+        'historical_scores': historical,
+    }
+
+
+def make_synthetic_results(n: int = 100_000, seed: int = 0) -> Dict[str, np.ndarray]:
+    rng = np.random.default_rng(seed)
+    response_times = rng.lognormal(1.5, 1.0, n)
+    response_times[rng.random(n) < 0.01] = np.nan
+    stream_times = response_times * rng.uniform(0.5, 1.0, n)
+    return {
+        'response_times': response_times,
+        'volumes': rng.lognormal(4.0, 1.5, n),
+        'status_codes': rng.choice([200, 200, 200, 200, 400, 429, 500], n),
+        'stream_times': stream_times,
+        'num_tokens': rng.integers(0, 2000, n).astype(np.float64),
+        'success': rng.random(n) > 0.05,
+        'content_lengths': rng.integers(0, 40, n),
+        'content_keyword_hits': rng.random(n) < 0.3,
+    }
+
+
+def score_synthetic_scalar(curve: ScoringCurve, results: Dict[str, np.ndarray]) -> np.ndarray:
+    scores = np.empty(len(results['response_times']))
+    for idx in range(len(scores)):
+        response_time = results['response_times'][idx]
+        stream_time = results['stream_times'][idx]
+        scores[idx] = score_scalar(
+            curve,
+            None if np.isnan(response_time) else float(response_time),
+            float(results['volumes'][idx]),
+            int(results['status_codes'][idx]),
+            None if np.isnan(stream_time) else float(stream_time),
+            float(results['num_tokens'][idx]),
+            bool(results['success'][idx]),
+            int(results['content_lengths'][idx]),
+            bool(results['content_keyword_hits'][idx]),
+        )
+    return scores
@@ -0,0 +1,39 @@
+import numpy as np
+import pytest
+
+from akihabara.validator.scoring_curves import (
+    AVATAR_CURVE,
+    CHAT_CURVE,
+    GENERIC_CURVE,
+    IMAGE_CURVE,
+    ScoringCurveRegistry,
+    score_batch,
+    scoring_curves,
+)
+from tests.reference import make_synthetic_results, score_synthetic_scalar
+
+
+@pytest.mark.parametrize("curve", [CHAT_CURVE, IMAGE_CURVE, AVATAR_CURVE, GENERIC_CURVE], ids=lambda curve: curve.name)
+def test_score_batch_matches_score_scalar(curve):
+    results = make_synthetic_results(10_000, seed=0)
+    np.testing.assert_allclose(score_batch(curve, **results), score_synthetic_scalar(curve, results), rtol=0, atol=1e-12)
+
+
+def test_registry_resolves_curves_by_task_prefix():
+    assert scoring_curves.resolve("chat-llama-3") is CHAT_CURVE
+    assert scoring_curves.resolve("text-to-image-flux") is IMAGE_CURVE
+    assert scoring_curves.resolve("unknown-task") is GENERIC_CURVE
+
+
+def test_registry_applies_task_config_overrides():
+    registry = ScoringCurveRegistry()
+    registry.register(CHAT_CURVE, prefixes=("chat-",))
+    registry.register(IMAGE_CURVE)
+
+    named = registry.resolve("chat-llama-3", {'scoring_curve': 'image'})
+    assert named is IMAGE_CURVE
+
+    overridden = registry.resolve("chat-llama-3", {'scoring_curve': {'base_score': 0.4, 'metric_steps': [[10, 0.3]]}})
+    assert overridden.name == "chat"
+    assert overridden.base_score == 0.4
+    assert overridden.metric_steps == ((10.0, 0.3),)
@@ -0,0 +1,67 @@
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+from akihabara.validator.scoring_results_manager import (
+    RESULT_BUCKET_SECONDS,
+    RESULT_RETENTION_HOURS,
+    RunningStats,
+    ScoringResult,
+    ScoringResultsManager,
+)
+
+
+def make_result(timestamp: datetime, quality_score: float, task: str = "chat-llama-3") -> ScoringResult:
+    return ScoringResult(
+        hotkey="hotkey",
+        node_id=1,
+        task=task,
+        quality_score=quality_score,
+        timestamp=timestamp,
+        synthetic_query=True,
+        response_time=quality_score * 2,
+        success=True,
+        status_code=200,
+    )
+
+
+def test_running_stats_merge_matches_sequential_adds():
+    rng = random.Random(0)
+    values = [rng.random() for _ in range(200)]
+    sequential, head, tail = RunningStats(), RunningStats(), RunningStats()
+    for value in values:
+        sequential.add(value)
+    for value in values[:73]:
+        head.add(value)
+    for value in values[73:]:
+        tail.add(value)
+    head.merge(tail)
+
+    assert head.count == sequential.count
+    assert head.mean == pytest.approx(sequential.mean, abs=1e-12)
+    assert head.ewma == pytest.approx(sequential.ewma, abs=1e-12)
+    assert (head.min, head.max) == (sequential.min, sequential.max)
+
+
+@pytest.mark.parametrize("ring_size", [0, 4, 256])
+def test_new_cycle_keeps_the_retention_window_regardless_of_ring_size(ring_size):
+    rng = random.Random(1)
+    now = datetime.now()
+    results = [
+        make_result(now - timedelta(hours=30) + timedelta(minutes=6 * i), rng.random(), rng.choice(["chat-a", "chat-b"]))
+        for i in range(300)
+    ]
+    manager = ScoringResultsManager(ring_size=ring_size)
+    for result in results:
+        manager.add_scoring_result(result)
+    manager._start_new_cycle()
+
+    cutoff_index = int((now - timedelta(hours=RESULT_RETENTION_HOURS)).timestamp() // RESULT_BUCKET_SECONDS)
+    retained = [r for r in results if int(r.timestamp.timestamp() // RESULT_BUCKET_SECONDS) >= cutoff_index]
+    stats = manager.get_node_stats("hotkey")
+
+    assert stats["total_tasks"] == len(retained)
+    assert stats["avg_quality_score"] == pytest.approx(sum(r.quality_score for r in retained) / len(retained))
+    assert sum(task["total_tasks"] for task in stats["tasks"].values()) == len(retained)
+    assert len(manager.get_all_scoring_results("hotkey")) <= ring_size
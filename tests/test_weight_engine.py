@@ -0,0 +1,35 @@
+import numpy as np
+import pytest
+
+from akihabara.validator.weight_engine import compute_final_scores, normalize_weights
+from tests.reference import compute_final_scores_loop, make_synthetic_metagraph
+
+
+@pytest.mark.parametrize("check_active", [False, True])
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_vectorized_engine_matches_loop(check_active, seed):
+    metagraph = make_synthetic_metagraph(1024, seed)
+
+    uids, scores = compute_final_scores(
+        **metagraph, default_historical_score=0.5, check_active=check_active, rng=np.random.default_rng(seed)
+    )
+    weights = normalize_weights(scores)
+
+    loop_rng = np.random.default_rng(seed)
+    loop_uids, loop_weights = compute_final_scores_loop(
+        **metagraph, default_historical_score=0.5, check_active=check_active,
+        uniform=lambda low, high: float(loop_rng.uniform(low, high))
+    )
+
+    assert uids.tolist() == loop_uids
+    assert weights is not None
+    np.testing.assert_allclose(weights, loop_weights, rtol=0, atol=1e-12)
+
+
+def test_normalize_weights_drops_small_weights():
+    weights = normalize_weights(np.array([0.5, 0.0005, 0.5]))
+    np.testing.assert_allclose(weights, [0.5, 0.0, 0.5])
+
+
+def test_normalize_weights_returns_none_when_nothing_is_left():
+    assert normalize_weights(np.array([0.0, 0.0001])) is None